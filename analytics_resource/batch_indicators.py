@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+from analytics_resource.incremental_indicators import INDICATOR_COLUMNS
+
+
+def _rolling_mean_std(closes, window):
+    """
+    시간 축(axis=1)으로 rolling 평균 / 모표준편차(ddof=0)를 계산한다. 윈도우에 NaN 이 있으면 NaN.
+    """
+    mean = np.full(closes.shape, np.nan)
+    std = np.full(closes.shape, np.nan)
+    if closes.shape[1] >= window:
+        windows = sliding_window_view(closes, window, axis=1)
+        mean[:, window - 1:] = windows.mean(axis=-1)
+        std[:, window - 1:] = windows.std(axis=-1)
+    return mean, std
+
+
+def _ewm(values, alpha, min_periods):
+    """
+    ta 와 같은 pandas ewm(adjust=False) 지수 이동 평균을 모든 티커에 대해 한번에 계산한다. (티커 = 컬럼)
+    티커별로 앞쪽 NaN 구간은 건너뛰고 첫 유효값부터 누적한다.
+    """
+    return pd.DataFrame(values.T).ewm(alpha=alpha, min_periods=min_periods, adjust=False).mean().to_numpy().T
+
+
+def compute_indicators_batch(closes, bb_window=20, bb_dev=2, rsi_window=14, macd_fast=12, macd_slow=26,
+                             macd_sign=9, sma_window=20, ema_window=12):
+    """
+    여러 티커의 보조 지표를 한번에 계산한다. 결과는 add_indicators(ta) 와 동일하다.
+    :param closes: (tickers x time) 종가 배열, 상장 기간이 짧은 티커는 앞쪽을 NaN 으로 채운다.
+    :return: {컬럼명: (tickers x time) 배열}
+    """
+    closes = np.asarray(closes, dtype=np.float64)
+    if closes.ndim != 2:
+        raise ValueError(f"closes must be 2-D (tickers x time) : {closes.shape}")
+
+    # 볼린저 밴드
+    bb_bbm, bb_std = _rolling_mean_std(closes, bb_window)
+
+    # RSI (첫 캔들의 변화량은 0 으로 처리한다. - ta 와 동일)
+    diff = np.diff(closes, axis=1, prepend=np.nan)
+    diff = np.where(np.isnan(closes), np.nan, np.nan_to_num(diff, nan=0.0))
+    up = np.where(diff > 0, diff, np.where(np.isnan(diff), np.nan, 0.0))
+    down = np.where(diff < 0, -diff, np.where(np.isnan(diff), np.nan, 0.0))
+    ema_up = _ewm(up, alpha=1 / rsi_window, min_periods=rsi_window)
+    ema_down = _ewm(down, alpha=1 / rsi_window, min_periods=rsi_window)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = np.where(ema_down == 0, 100.0, 100 - (100 / (1 + ema_up / ema_down)))
+
+    # MACD
+    macd = _ewm(closes, 2 / (macd_fast + 1), macd_fast) - _ewm(closes, 2 / (macd_slow + 1), macd_slow)
+    macd_signal = _ewm(macd, 2 / (macd_sign + 1), macd_sign)
+
+    # 이동 평균선
+    sma_20 = bb_bbm if sma_window == bb_window else _rolling_mean_std(closes, sma_window)[0]
+
+    return {
+        'bb_bbm': bb_bbm,
+        'bb_bbh': bb_bbm + bb_dev * bb_std,
+        'bb_bbl': bb_bbm - bb_dev * bb_std,
+        'rsi': rsi,
+        'macd': macd,
+        'macd_signal': macd_signal,
+        'macd_diff': macd - macd_signal,
+        'sma_20': sma_20,
+        'sma_12': _ewm(closes, 2 / (ema_window + 1), ema_window),
+    }
+
+
+def add_indicators_vectorized(df):
+    """
+    add_indicators(ta) 와 같은 보조 지표를 compute_indicators_batch 로 계산한다. (티커 1개)
+    :param df: OHLCV DataFrame (close 컬럼 필요)
+    :return: df 에 add_indicators 와 같은 컬럼을 붙인 새 DataFrame (컬럼을 하나씩 추가하는 것보다 빠르다.)
+    """
+    indicators = compute_indicators_batch(df['close'].to_numpy(dtype=np.float64)[np.newaxis, :])
+    columns = pd.DataFrame({column: indicators[column][0] for column in INDICATOR_COLUMNS}, index=df.index)
+    return pd.concat([df, columns], axis=1)
+
+
+def stack_closes(frames):
+    """
+    티커별 OHLCV DataFrame 을 공통 시간축으로 정렬하여 (tickers x time) 종가 배열로 만든다.
+    :param frames: {ticker: OHLCV DataFrame}
+    :return: (tickers, index, closes)
+    """
+    closes = pd.DataFrame({ticker: df['close'] for ticker, df in frames.items()}).sort_index()
+    return list(closes.columns), closes.index, closes.to_numpy().T
+
+
+def latest_indicators(closes, tickers, **kwargs):
+    """
+    티커별 마지막 시점의 종가와 보조 지표를 DataFrame 으로 반환한다. (시장 스크리닝용)
+    :param closes: (tickers x time) 종가 배열
+    :param tickers: closes 의 행 순서와 같은 티커 목록
+    :return: index 가 티커인 DataFrame
+    """
+    indicators = compute_indicators_batch(closes, **kwargs)
+    latest = {'close': np.asarray(closes, dtype=np.float64)[:, -1]}
+    latest.update({column: indicators[column][:, -1] for column in INDICATOR_COLUMNS})
+    return pd.DataFrame(latest, index=pd.Index(tickers, name='ticker'))
@@ -0,0 +1,190 @@
+import logging
+import math
+import os
+import re
+import threading
+import time
+
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pyupbit
+
+from rate_limiter import get_upbit_limiter
+
+logger = logging.getLogger(__name__)
+
+# Upbit 캔들의 index 는 KST 기준 시각이다.
+KST = timezone(timedelta(hours=9))
+
+DEFAULT_STORE_DIR = os.getenv("CANDLE_STORE_DIR", "candles")
+
+# 진행 중인 캔들을 다시 조회하지 않고 재사용할 최대 시간(초)
+DEFAULT_MAX_AGE = 60
+
+# pyupbit.get_ohlcv 는 200개 단위로 나누어 요청한다.
+OHLCV_PAGE_SIZE = 200
+
+
+def request_ohlcv(ticker, interval, count, to=None):
+    """
+    Upbit 시세 조회 요청 수 제한(전역 token bucket)을 지키며 pyupbit.get_ohlcv 를 호출한다.
+    """
+    limiter = get_upbit_limiter('quotation')
+    for _ in range(math.ceil(count / OHLCV_PAGE_SIZE)):
+        limiter.acquire()
+    return pyupbit.get_ohlcv(ticker, interval=interval, count=count, to=to)
+
+
+def interval_to_timedelta(interval):
+    """
+    pyupbit interval 문자열을 캔들 간격으로 변환한다.
+    :param interval: day, week, minute1 ~ minute240
+    :return:
+    """
+    if interval in ("day", "days"):
+        return timedelta(days=1)
+    if interval in ("week", "weeks"):
+        return timedelta(weeks=1)
+    matched = re.fullmatch(r"minutes?(\d+)", interval)
+    if matched:
+        return timedelta(minutes=int(matched.group(1)))
+    raise ValueError(f"Unsupported interval : {interval}")
+
+
+class CandleStore:
+    """
+    (ticker, interval) 별 OHLCV 캔들을 parquet 파일로 저장하고, 마지막 저장 시각 이후의 캔들만 증분 조회한다.
+    """
+    def __init__(self, store_dir=DEFAULT_STORE_DIR, max_age=DEFAULT_MAX_AGE):
+        self.store_dir = store_dir
+        self.max_age = max_age
+        self._frames = {}
+        self._fetched_at = {}
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    def _path(self, ticker, interval):
+        return os.path.join(self.store_dir, f"{ticker}_{interval}.parquet")
+
+    def _lock(self, key):
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _load(self, ticker, interval):
+        key = (ticker, interval)
+        if key not in self._frames:
+            path = self._path(ticker, interval)
+            if os.path.exists(path):
+                self._frames[key] = pd.read_parquet(path)
+                self._fetched_at[key] = os.path.getmtime(path)
+            else:
+                self._frames[key] = None
+                self._fetched_at[key] = 0
+        return self._frames[key]
+
+    def _save(self, ticker, interval, df):
+        os.makedirs(self.store_dir, exist_ok=True)
+        path = self._path(ticker, interval)
+        tmp_path = f"{path}.tmp"
+        df.to_parquet(tmp_path)
+        os.replace(tmp_path, path)
+
+        key = (ticker, interval)
+        self._frames[key] = df
+        self._fetched_at[key] = time.time()
+
+    def _is_fresh(self, ticker, interval, df):
+        key = (ticker, interval)
+        now = datetime.now(KST).replace(tzinfo=None)
+        # 마지막 캔들이 현재 진행 중인 캔들이고 최근에 조회했다면 네트워크 호출 없이 사용한다.
+        return now < df.index[-1] + interval_to_timedelta(interval) and time.time() - self._fetched_at[key] < self.max_age
+
+    def _fetch_new(self, ticker, interval, df):
+        """
+        마지막 저장 캔들(진행 중이었을 수 있음)부터 현재까지의 캔들을 조회한다.
+        """
+        last_ts = df.index[-1]
+        now = datetime.now(KST).replace(tzinfo=None)
+        count = max(int((now - last_ts) / interval_to_timedelta(interval)) + 1, 1)
+        while True:
+            fetched = request_ohlcv(ticker, interval=interval, count=count)
+            if fetched is None:
+                raise ConnectionError(f"Failed to fetch OHLCV : {ticker} {interval}")
+            # 조회 결과가 마지막 저장 캔들과 겹치지 않으면 누락 구간이 있으므로 더 많이 조회한다.
+            if fetched.empty or fetched.index[0] <= last_ts or len(fetched) < count:
+                return fetched
+            count *= 2
+
+    def _fetch_older(self, ticker, interval, df, count):
+        """
+        저장된 첫 캔들 이전의 캔들을 조회한다.
+        """
+        to = (df.index[0] - timedelta(hours=9)).to_pydatetime()  # pyupbit 의 to 는 UTC 기준
+        fetched = request_ohlcv(ticker, interval=interval, count=count, to=to)
+        if fetched is None:
+            raise ConnectionError(f"Failed to fetch OHLCV : {ticker} {interval}")
+        return fetched
+
+    def read(self, ticker="KRW-ETH", interval="day"):
+        """
+        네트워크 호출 없이 저장된 캔들 전체를 반환한다. (백테스트용)
+        :return: 저장된 캔들이 없으면 None
+        """
+        key = (ticker, interval)
+        with self._lock(key):
+            df = self._load(ticker, interval)
+            return None if df is None else df.copy()
+
+    def get_ohlcv(self, ticker="KRW-ETH", interval="day", count=200):
+        """
+        최근 count 개의 캔들을 반환한다. 저장된 데이터가 최신이면 네트워크 호출을 하지 않는다.
+        :param ticker:
+        :param interval:
+        :param count:
+        :return: pyupbit.get_ohlcv 와 동일한 형식의 DataFrame
+        """
+        key = (ticker, interval)
+        with self._lock(key):
+            df = self._load(ticker, interval)
+
+            if df is None or df.empty:
+                fetched = request_ohlcv(ticker, interval=interval, count=count)
+                if fetched is None:
+                    raise ConnectionError(f"Failed to fetch OHLCV : {ticker} {interval}")
+                self._save(ticker, interval, fetched)
+                return fetched.tail(count).copy()
+
+            updated = df
+            if not self._is_fresh(ticker, interval, df):
+                updated = pd.concat([updated, self._fetch_new(ticker, interval, df)])
+                # 진행 중이던 캔들은 새로 조회한 값으로 대체한다.
+                updated = updated[~updated.index.duplicated(keep="last")]
+
+            if len(updated) < count:
+                older = self._fetch_older(ticker, interval, updated, count - len(updated))
+                updated = pd.concat([older[older.index < updated.index[0]], updated])
+
+            if updated is not df:
+                self._save(ticker, interval, updated.sort_index())
+
+            return self._frames[key].tail(count).copy()
+
+
+_default_store = None
+_default_store_guard = threading.Lock()
+
+
+def get_candle_store():
+    global _default_store
+    with _default_store_guard:
+        if _default_store is None:
+            _default_store = CandleStore()
+        return _default_store
+
+
+def get_ohlcv(ticker="KRW-ETH", interval="day", count=200):
+    """
+    기본 캔들 저장소를 통해 OHLCV 데이터를 조회한다.
+    """
+    return get_candle_store().get_ohlcv(ticker=ticker, interval=interval, count=count)
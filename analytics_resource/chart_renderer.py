@@ -0,0 +1,155 @@
+import base64
+import hashlib
+import io
+import logging
+import math
+import threading
+
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw, ImageFont
+
+logger = logging.getLogger(__name__)
+
+# 한국 거래소 관례 : 상승 빨강, 하락 파랑
+UP_COLOR = (214, 46, 46)
+DOWN_COLOR = (30, 96, 210)
+BAND_COLOR = (150, 150, 150)
+MIDDLE_COLOR = (240, 140, 0)
+GRID_COLOR = (232, 232, 232)
+TEXT_COLOR = (60, 60, 60)
+BACKGROUND_COLOR = (255, 255, 255)
+
+CHART_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'bb_bbh', 'bb_bbm', 'bb_bbl']
+DEFAULT_MAX_ENTRIES = 16
+
+
+def _scale(low, high, top, bottom):
+    span = (high - low) or 1.0
+    return lambda value: bottom - (value - low) / span * (bottom - top)
+
+
+def _draw_band(draw, xs, values, to_y, color, width=2):
+    # 지표가 없는(NaN) 구간은 건너뛴다.
+    points = []
+    for x, value in zip(xs, values):
+        if value is None or math.isnan(value):
+            if len(points) > 1:
+                draw.line(points, fill=color, width=width)
+            points = []
+            continue
+        points.append((x, to_y(value)))
+    if len(points) > 1:
+        draw.line(points, fill=color, width=width)
+
+
+def draw_chart(df, width=1024, height=576, title=None):
+    """
+    OHLCV + 볼린저 밴드 DataFrame 으로 캔들 차트 이미지를 그린다. (브라우저 / 네트워크 불필요)
+    :param df: open / high / low / close / volume 과 bb_bbh / bb_bbm / bb_bbl 컬럼 (add_indicators 결과)
+    :return: PIL Image
+    """
+    image = Image.new("RGB", (width, height), BACKGROUND_COLOR)
+    draw = ImageDraw.Draw(image)
+    font = ImageFont.load_default()
+
+    left, right, top = 10, width - 90, 30
+    price_bottom = int(height * 0.78)
+    volume_top, volume_bottom = price_bottom + 10, height - 10
+
+    opens, highs, lows, closes = (df[column].astype(float).tolist() for column in ('open', 'high', 'low', 'close'))
+    volumes = df['volume'].astype(float).tolist() if 'volume' in df else [0.0] * len(df)
+    bands = {column: df[column].astype(float).tolist() if column in df else [math.nan] * len(df)
+             for column in ('bb_bbh', 'bb_bbm', 'bb_bbl')}
+
+    price_values = highs + lows + [value for column in ('bb_bbh', 'bb_bbl') for value in bands[column] if not math.isnan(value)]
+    low, high = min(price_values), max(price_values)
+    margin = (high - low) * 0.03
+    to_y = _scale(low - margin, high + margin, top, price_bottom)
+    to_volume_y = _scale(0, max(volumes) or 1.0, volume_top, volume_bottom)
+
+    # 가격 눈금
+    for step in range(5):
+        price = low + (high - low) * step / 4
+        y = to_y(price)
+        draw.line([(left, y), (right, y)], fill=GRID_COLOR)
+        draw.text((right + 6, y - 6), f"{price:,.0f}", fill=TEXT_COLOR, font=font)
+
+    count = len(df)
+    slot = (right - left) / max(count, 1)
+    body = max(slot * 0.7, 1)
+    xs = [left + slot * (i + 0.5) for i in range(count)]
+
+    _draw_band(draw, xs, bands['bb_bbh'], to_y, BAND_COLOR)
+    _draw_band(draw, xs, bands['bb_bbl'], to_y, BAND_COLOR)
+    _draw_band(draw, xs, bands['bb_bbm'], to_y, MIDDLE_COLOR)
+
+    for x, open_, high_, low_, close, volume in zip(xs, opens, highs, lows, closes, volumes):
+        color = UP_COLOR if close >= open_ else DOWN_COLOR
+        draw.line([(x, to_y(high_)), (x, to_y(low_))], fill=color)
+        body_top, body_bottom = sorted((to_y(open_), to_y(close)))
+        draw.rectangle([x - body / 2, body_top, x + body / 2, max(body_bottom, body_top + 1)], fill=color)
+        draw.rectangle([x - body / 2, to_volume_y(volume), x + body / 2, volume_bottom], fill=color)
+
+    if title:
+        draw.text((left, 8), title, fill=TEXT_COLOR, font=font)
+    return image
+
+
+def candle_hash(df, width, height, title):
+    """
+    캔들 / 지표 값과 이미지 설정으로 캐시 키를 만든다.
+    """
+    columns = [column for column in CHART_COLUMNS if column in df]
+    digest = hashlib.sha256(df[columns].to_numpy(dtype='float64').tobytes())
+    digest.update(str(df.index[-1] if len(df) else "").encode('utf-8'))
+    digest.update(f"{width}x{height}:{title}".encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ChartRenderer:
+    """
+    차트를 PNG 로 한 번만 인코딩하여 base64 로 반환하고, 같은 캔들 데이터는 캐시된 이미지를 재사용한다.
+    """
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._images = OrderedDict()
+        self._lock = threading.Lock()
+
+    def render(self, df, width=1024, height=576, title=None, save_path=None):
+        """
+        :param save_path: 지정하면 인코딩한 PNG 바이트를 그대로 파일로도 저장한다.
+        :return: base64 PNG 문자열
+        """
+        key = candle_hash(df, width, height, title)
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                png = self._images[key]
+            else:
+                png = None
+
+        if png is None:
+            buffered = io.BytesIO()
+            draw_chart(df, width=width, height=height, title=title).save(buffered, format="PNG")
+            png = buffered.getvalue()
+            with self._lock:
+                self._images[key] = png
+                while len(self._images) > self.max_entries:
+                    self._images.popitem(last=False)
+
+        if save_path:
+            with open(save_path, "wb") as f:
+                f.write(png)
+        return base64.b64encode(png).decode('utf-8')
+
+
+_renderer = ChartRenderer()
+
+
+def render_chart(df, width=1024, height=576, title=None, save_path=None):
+    """
+    run_capture 를 대체하는 프로세스 내 차트 렌더링 (전역 캐시 사용)
+    :return: base64 PNG 문자열
+    """
+    return _renderer.render(df, width=width, height=height, title=title, save_path=save_path)
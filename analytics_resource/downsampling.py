@@ -0,0 +1,51 @@
+import numpy as np
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets 로 시계열의 모양(극값)을 유지하면서 threshold 개의 점을 고른다.
+    https://skemman.is/bitstream/1946/15343/3/SS_MSthesis.pdf
+    :param x: 정렬된 x 값 (숫자 또는 datetime64)
+    :param y: y 값
+    :param threshold: 남길 점의 개수
+    :return: 선택된 점의 위치(index) 배열 (첫 점과 마지막 점 포함)
+    """
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[ns]').astype(np.int64)
+    x = x.astype(np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    count = len(x)
+    if threshold >= count or threshold < 3:
+        return np.arange(count)
+
+    # 첫 점과 마지막 점을 제외한 구간을 threshold - 2 개의 bucket 으로 나눈다.
+    edges = np.linspace(1, count - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, count - 1
+
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], max(edges[bucket + 1], edges[bucket] + 1)
+        # 다음 bucket 의 평균점 (마지막 bucket 은 마지막 점)
+        next_start = end
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else count
+        next_end = max(next_end, next_start + 1)
+        average_x = x[next_start:next_end].mean()
+        average_y = y[next_start:next_end].mean()
+
+        # 이전에 선택한 점, 다음 bucket 평균점과 만드는 삼각형 넓이가 가장 큰 점을 고른다.
+        areas = np.abs((x[previous] - average_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (average_y - y[previous]))
+        previous = start + int(np.nanargmax(areas)) if not np.isnan(areas).all() else start
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample(df, x, y, threshold=2000):
+    """
+    DataFrame 의 x / y 컬럼으로 LTTB 를 적용한 행만 반환한다.
+    """
+    if len(df) <= threshold:
+        return df
+    return df.iloc[lttb(df[x].values, df[y].values, threshold)]
@@ -0,0 +1,164 @@
+import logging
+import random
+import threading
+import time
+
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import requests
+
+from requests.adapters import HTTPAdapter
+
+from tracing import Histogram
+
+logger = logging.getLogger(__name__)
+
+# 재시도할 HTTP 상태 코드 (요청 수 제한 / 일시적인 서버 오류)
+RETRY_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass(frozen=True)
+class HostConfig:
+    connect_timeout: float = 3.0
+    read_timeout: float = 10.0
+    retries: int = 2
+    backoff_base: float = 0.5
+    backoff_max: float = 5.0
+    pool_size: int = 4
+
+
+DEFAULT_HOST_CONFIG = HostConfig()
+
+# 호스트별 설정 (없으면 DEFAULT_HOST_CONFIG)
+HOST_CONFIGS = {
+    "api.alternative.me": HostConfig(read_timeout=5.0),
+    # SerpAPI 는 검색 결과 생성에 시간이 걸리고, 호출 quota 가 있으므로 재시도를 줄인다.
+    "serpapi.com": HostConfig(read_timeout=15.0, retries=1),
+}
+
+
+class HostMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.latency = Histogram()
+        self._lock = threading.Lock()
+
+    def record(self, elapsed, error=False, retried=False):
+        self.latency.observe(elapsed)
+        with self._lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.retries += int(retried)
+
+    def to_dict(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'retries': self.retries,
+            'p50': self.latency.percentile(0.50),
+            'p95': self.latency.percentile(0.95),
+            'p99': self.latency.percentile(0.99),
+        }
+
+
+class HttpClient:
+    """
+    호스트별 keep-alive session(connection pool)을 재사용하는 HTTP client
+    - 호스트별 connect / read timeout
+    - 멱등 요청(GET)은 연결 오류 / timeout / 429, 5xx 응답 시 exponential backoff + jitter 로 재시도
+    - 호스트별 지연시간 / 오류 지표
+    """
+    def __init__(self, host_configs=None, default_config=DEFAULT_HOST_CONFIG):
+        self.host_configs = dict(HOST_CONFIGS if host_configs is None else host_configs)
+        self.default_config = default_config
+        self._sessions = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def config(self, host):
+        return self.host_configs.get(host, self.default_config)
+
+    def _session(self, host):
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                config = self.config(host)
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.pool_size, max_retries=0)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self._sessions[host] = session
+                self._metrics[host] = HostMetrics()
+            return session, self._metrics[host]
+
+    @staticmethod
+    def _backoff(config, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), config.backoff_max)
+        # full jitter : 0 ~ min(max, base * 2^attempt)
+        return random.uniform(0, min(config.backoff_max, config.backoff_base * 2 ** attempt))
+
+    def get(self, url, params=None, headers=None):
+        """
+        :return: requests.Response (재시도 후에도 429 / 5xx 이면 마지막 응답)
+        :raises requests.RequestException: 재시도 후에도 연결 오류 / timeout 인 경우
+        """
+        host = urlsplit(url).netloc
+        config = self.config(host)
+        session, metrics = self._session(host)
+
+        for attempt in range(config.retries + 1):
+            started_at = time.perf_counter()
+            response = None
+            try:
+                response = session.get(url, params=params, headers=headers,
+                                       timeout=(config.connect_timeout, config.read_timeout))
+            except (requests.ConnectionError, requests.Timeout) as ex:
+                failure = ex
+            else:
+                failure = None if response.status_code not in RETRY_STATUS_CODES else response.status_code
+            elapsed = time.perf_counter() - started_at
+            retry = failure is not None and attempt < config.retries
+            metrics.record(elapsed, error=failure is not None, retried=retry)
+
+            if failure is None:
+                return response
+            if not retry:
+                if response is not None:
+                    return response
+                raise failure
+            delay = self._backoff(config, attempt, response)
+            logger.warning(f"[Warning] GET {host} failed ({failure}), retry {attempt + 1}/{config.retries} in {delay:.2f}s")
+            time.sleep(delay)
+
+    def get_stats(self):
+        """
+        :return: {host: {requests, errors, retries, p50, p95, p99}}
+        """
+        with self._lock:
+            return {host: metrics.to_dict() for host, metrics in self._metrics.items()}
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+_http_client = None
+_http_client_lock = threading.Lock()
+
+
+def get_http_client():
+    """
+    프로세스 전역 HttpClient (analytics_resource 의 외부 API 호출에서 공유)
+    """
+    global _http_client
+    with _http_client_lock:
+        if _http_client is None:
+            _http_client = HttpClient()
+        return _http_client
@@ -0,0 +1,277 @@
+import copy
+import json
+import math
+import threading
+
+from collections import deque
+
+import pandas as pd
+
+# add_indicators 와 동일한 컬럼 이름 (sma_12 는 EMA-12 값이다.)
+INDICATOR_COLUMNS = ['bb_bbm', 'bb_bbh', 'bb_bbl', 'rsi', 'macd', 'macd_signal', 'macd_diff', 'sma_20', 'sma_12']
+
+# 누적 오차 제거를 위해 윈도우 통계를 재계산하는 주기
+RESYNC_INTERVAL = 1000
+
+
+class RollingWindow:
+    """
+    고정 길이 윈도우의 평균/모표준편차(ddof=0)를 sliding Welford 방식으로 O(1) 갱신한다.
+    """
+    def __init__(self, window):
+        self.window = window
+        self.values = deque(maxlen=window)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.updates = 0
+
+    def update(self, value):
+        if len(self.values) < self.window:
+            self.values.append(value)
+            delta = value - self.mean
+            self.mean += delta / len(self.values)
+            self.m2 += delta * (value - self.mean)
+        else:
+            removed = self.values[0]
+            self.values.append(value)
+            old_mean = self.mean
+            self.mean += (value - removed) / self.window
+            self.m2 += (value - removed) * (value - self.mean + removed - old_mean)
+
+        self.updates += 1
+        if self.updates % RESYNC_INTERVAL == 0:
+            self._resync()
+
+    def _resync(self):
+        self.mean = math.fsum(self.values) / len(self.values)
+        self.m2 = math.fsum((value - self.mean) ** 2 for value in self.values)
+
+    @property
+    def ready(self):
+        return len(self.values) == self.window
+
+    def std(self):
+        return math.sqrt(max(self.m2, 0.0) / self.window)
+
+    def get_state(self):
+        return {'window': self.window, 'values': list(self.values), 'updates': self.updates}
+
+    @classmethod
+    def from_state(cls, state):
+        rolling = cls(state['window'])
+        rolling.values.extend(state['values'])
+        rolling.updates = state['updates']
+        if rolling.values:
+            rolling._resync()
+        return rolling
+
+
+class ExponentialAverage:
+    """
+    pandas ewm(adjust=False, min_periods=min_periods) 와 동일한 지수 이동 평균
+    """
+    def __init__(self, alpha, min_periods):
+        self.alpha = alpha
+        self.min_periods = min_periods
+        self.value = None
+        self.count = 0
+
+    @classmethod
+    def from_span(cls, span):
+        return cls(alpha=2 / (span + 1), min_periods=span)
+
+    def update(self, value):
+        if self.value is None:
+            self.value = value
+        else:
+            self.value = (1 - self.alpha) * self.value + self.alpha * value
+        self.count += 1
+
+    @property
+    def ready(self):
+        return self.count >= self.min_periods
+
+    def current(self):
+        return self.value if self.ready else math.nan
+
+    def get_state(self):
+        return {'alpha': self.alpha, 'min_periods': self.min_periods, 'value': self.value, 'count': self.count}
+
+    @classmethod
+    def from_state(cls, state):
+        average = cls(alpha=state['alpha'], min_periods=state['min_periods'])
+        average.value = state['value']
+        average.count = state['count']
+        return average
+
+
+class IncrementalIndicators:
+    """
+    add_indicators 의 보조 지표(BB, RSI, MACD, SMA-20, EMA-12)를 캔들 하나씩 O(1) 로 갱신하는 지표 엔진
+    - BB / SMA : 윈도우 합계 기반 평균, 표준편차
+    - RSI : Wilder 평균 (alpha = 1 / window)
+    - MACD : fast / slow / signal EMA 상태
+    상태는 get_state / save 로 저장하고 from_state / load 로 복원할 수 있다.
+    """
+    def __init__(self, bb_window=20, bb_dev=2, rsi_window=14, macd_fast=12, macd_slow=26, macd_sign=9,
+                 sma_window=20, ema_window=12):
+        self.bb_dev = bb_dev
+        self.bb = RollingWindow(bb_window)
+        self.sma = RollingWindow(sma_window)
+        self.rsi_up = ExponentialAverage(alpha=1 / rsi_window, min_periods=rsi_window)
+        self.rsi_down = ExponentialAverage(alpha=1 / rsi_window, min_periods=rsi_window)
+        self.macd_fast = ExponentialAverage.from_span(macd_fast)
+        self.macd_slow = ExponentialAverage.from_span(macd_slow)
+        self.macd_sign = ExponentialAverage.from_span(macd_sign)
+        self.ema = ExponentialAverage.from_span(ema_window)
+        self.last_close = None
+
+    def update(self, close):
+        """
+        새 캔들의 종가로 모든 지표를 갱신한다.
+        :param close: 종가
+        :return: {컬럼명: 지표값} (워밍업 구간은 NaN)
+        """
+        close = float(close)
+
+        # 볼린저 밴드
+        self.bb.update(close)
+        if self.bb.ready:
+            bb_std = self.bb.std()
+            bb_bbm = self.bb.mean
+            bb_bbh = bb_bbm + self.bb_dev * bb_std
+            bb_bbl = bb_bbm - self.bb_dev * bb_std
+        else:
+            bb_bbm = bb_bbh = bb_bbl = math.nan
+
+        # RSI (첫 캔들은 변화량 0 으로 처리한다. - ta 와 동일)
+        diff = 0.0 if self.last_close is None else close - self.last_close
+        self.rsi_up.update(diff if diff > 0 else 0.0)
+        self.rsi_down.update(-diff if diff < 0 else 0.0)
+        if self.rsi_down.ready:
+            rsi = 100.0 if self.rsi_down.value == 0 else 100 - (100 / (1 + self.rsi_up.value / self.rsi_down.value))
+        else:
+            rsi = math.nan
+        self.last_close = close
+
+        # MACD (signal 은 MACD 값이 생긴 이후부터 누적한다.)
+        self.macd_fast.update(close)
+        self.macd_slow.update(close)
+        if self.macd_fast.ready and self.macd_slow.ready:
+            macd = self.macd_fast.value - self.macd_slow.value
+            self.macd_sign.update(macd)
+            macd_signal = self.macd_sign.current()
+            macd_diff = macd - macd_signal
+        else:
+            macd = macd_signal = macd_diff = math.nan
+
+        # 이동 평균선
+        self.sma.update(close)
+        sma_20 = self.sma.mean if self.sma.ready else math.nan
+        self.ema.update(close)
+        ema_12 = self.ema.current()
+
+        return {
+            'bb_bbm': bb_bbm,
+            'bb_bbh': bb_bbh,
+            'bb_bbl': bb_bbl,
+            'rsi': rsi,
+            'macd': macd,
+            'macd_signal': macd_signal,
+            'macd_diff': macd_diff,
+            'sma_20': sma_20,
+            'sma_12': ema_12,
+        }
+
+    def update_dataframe(self, df):
+        """
+        DataFrame 의 캔들을 순서대로 반영하고 add_indicators 와 같은 컬럼을 채운다.
+        :param df: 'close' 컬럼을 가진 OHLCV DataFrame (이미 반영된 캔들 이후의 캔들만 전달한다.)
+        :return:
+        """
+        rows = [self.update(close) for close in df['close']]
+        indicators = pd.DataFrame.from_records(rows, columns=INDICATOR_COLUMNS, index=df.index)
+        df[INDICATOR_COLUMNS] = indicators
+        return df
+
+    def get_state(self):
+        return {
+            'bb_dev': self.bb_dev,
+            'bb': self.bb.get_state(),
+            'sma': self.sma.get_state(),
+            'rsi_up': self.rsi_up.get_state(),
+            'rsi_down': self.rsi_down.get_state(),
+            'macd_fast': self.macd_fast.get_state(),
+            'macd_slow': self.macd_slow.get_state(),
+            'macd_sign': self.macd_sign.get_state(),
+            'ema': self.ema.get_state(),
+            'last_close': self.last_close,
+        }
+
+    @classmethod
+    def from_state(cls, state):
+        engine = cls(bb_dev=state['bb_dev'])
+        engine.bb = RollingWindow.from_state(state['bb'])
+        engine.sma = RollingWindow.from_state(state['sma'])
+        for name in ('rsi_up', 'rsi_down', 'macd_fast', 'macd_slow', 'macd_sign', 'ema'):
+            setattr(engine, name, ExponentialAverage.from_state(state[name]))
+        engine.last_close = state['last_close']
+        return engine
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.get_state(), f)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls.from_state(json.load(f))
+
+
+class IndicatorStream:
+    """
+    같은 마켓 / 주기의 최근 캔들 DataFrame 을 매 주기 받아, 이전 주기 이후 새로 마감된 캔들만 IncrementalIndicators 에 반영한다.
+    - 마지막 캔들은 진행 중일 수 있으므로 엔진 상태를 복사하여 계산한다. (마감된 뒤 다음 주기에 반영)
+    - 처음이거나 이전 주기와 이어지지 않으면(캔들 누락) 받은 구간으로 엔진을 다시 만든다. (add_indicators 결과와 같다.)
+    """
+    def __init__(self):
+        self.engine = None
+        self.last_index = None
+        self.rows = pd.DataFrame(columns=INDICATOR_COLUMNS, dtype=float)
+        self._lock = threading.Lock()
+
+    def update_dataframe(self, df):
+        """
+        :param df: 'close' 컬럼을 가진 OHLCV DataFrame (오래된 순서, 마지막 캔들은 진행 중일 수 있음)
+        :return: df 에 add_indicators 와 같은 컬럼을 붙인 새 DataFrame (컬럼을 하나씩 추가하는 것보다 빠르다.)
+        """
+        with self._lock:
+            closed = df.iloc[:-1]
+            if self.engine is None or self.last_index not in closed.index:
+                self.engine = IncrementalIndicators()
+                self.rows = self.rows.iloc[0:0]
+                new = closed
+            else:
+                new = closed.loc[closed.index > self.last_index]
+            if len(new):
+                rows = pd.DataFrame.from_records([self.engine.update(close) for close in new['close']],
+                                                 columns=INDICATOR_COLUMNS, index=new.index)
+                # 다음 주기에 받을 구간 길이만큼만 보관한다.
+                self.rows = pd.concat([self.rows, rows]).iloc[-len(df):] if len(self.rows) else rows
+                self.last_index = new.index[-1]
+
+            current = copy.deepcopy(self.engine).update(df['close'].iloc[-1]) if len(df) else {}
+            indicators = pd.concat([self.rows, pd.DataFrame([current], columns=INDICATOR_COLUMNS, index=df.index[-1:])])
+        return pd.concat([df, indicators.reindex(df.index)], axis=1)
+
+
+_streams = {}
+_streams_guard = threading.Lock()
+
+
+def get_indicator_stream(ticker, interval):
+    """
+    마켓 / 캔들 주기별 프로세스 전역 IndicatorStream
+    """
+    with _streams_guard:
+        return _streams.setdefault((ticker, interval), IndicatorStream())
@@ -1,9 +1,11 @@
-import requests
-
 from ta.momentum import RSIIndicator
 from ta.trend import MACD, SMAIndicator, EMAIndicator
 from ta.volatility import BollingerBands
 
+from analytics_resource.http_client import get_http_client
+
+FEAR_AND_GREED_URL = "https://api.alternative.me/fng/"
+
 def add_indicators(df):
     """
     보조 지표를 계산하여 DF에 삽입한다.
@@ -50,13 +52,12 @@ def add_indicators(df):
 
     return df
 
-def get_fear_and_greed_index():
+def get_fear_and_greed_index(url=FEAR_AND_GREED_URL):
     """
     공포 탐욕 지수를 산정한다.
     :return:
     """
-    url = "https://api.alternative.me/fng/"
-    response = requests.get(url)
+    response = get_http_client().get(url)
     if response.status_code == 200:
         data = response.json()
         return data['data'][0]
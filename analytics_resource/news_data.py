@@ -1,17 +1,40 @@
 import os
 import requests
 
-def get_etherium_news():
+from analytics_resource.http_client import get_http_client
+
+SERPAPI_URL = "https://serpapi.com/search.json"
+
+# 통화별 뉴스 검색어 (없으면 "<통화> crypto")
+NEWS_QUERIES = {
+    'ETH': "ethereum",
+    'BTC': "bitcoin",
+    'XRP': "ripple xrp",
+    'SOL': "solana",
+    'DOGE': "dogecoin",
+    'ADA': "cardano",
+}
+
+def news_query(currency):
+    """
+    :param currency: ETH, BTC, ...
+    :return: google news 검색어
+    """
+    return NEWS_QUERIES.get(currency.upper(), f"{currency.upper()} crypto")
+
+def get_etherium_news(url=SERPAPI_URL):
+    return get_news(news_query("ETH"), url=url)
+
+def get_news(query, url=SERPAPI_URL):
     serpapi_key = os.getenv("SERPAPI_API_KEY")
-    url = "https://serpapi.com/search.json"
     params = {
         "engine": "google_news",
-        "q": "ethereum",
+        "q": query,
         "api_key":serpapi_key
     }
 
     try:
-        response = requests.get(url, params=params)
+        response = get_http_client().get(url, params=params)
         response.raise_for_status() # Raises a HTTPError if the status is 4xx, 5xx
         data = response.json()
 
@@ -0,0 +1,158 @@
+import json
+import logging
+import os
+import threading
+import time
+
+from analytics_resource.indicators import get_fear_and_greed_index
+from analytics_resource.news_data import get_news, news_query
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.getenv("SIGNAL_CACHE_PATH", "cache/signal_cache.json")
+
+# 소스별 TTL(초) : 공포 탐욕 지수는 하루 한번 갱신, 뉴스(SerpAPI)는 호출 quota 가 제한되어 있다.
+FEAR_GREED_TTL = 3600
+NEWS_TTL = 1800
+
+
+class SignalCache:
+    """
+    외부 시그널 소스용 TTL 캐시
+    - TTL 이내 : 캐시 값 반환 (hit)
+    - TTL 초과 : 이전 값을 바로 반환하고 백그라운드에서 갱신 (stale)
+    - 캐시 없음 : 동기 조회 (miss)
+    - 조회 실패 / 빈 응답 : 마지막 정상 값으로 대체 (error)
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._entries = self._load()
+        self.stats = {}
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as ex:
+            logger.warning(f"[Warning] Failed to load signal cache : {ex}")
+            return {}
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _count(self, name, result):
+        source_stats = self.stats.setdefault(name, {'hit': 0, 'stale': 0, 'miss': 0, 'error': 0})
+        source_stats[result] += 1
+
+    def _refresh(self, name, fetch):
+        """
+        fetch 결과가 정상이면 캐시를 갱신하고 반환한다. 실패 시 None.
+        """
+        try:
+            value = fetch()
+        except Exception as ex:
+            logger.warning(f"[Warning] Failed to refresh signal '{name}' : {ex}")
+            value = None
+
+        if not value:
+            with self._lock:
+                self._count(name, 'error')
+            return None
+
+        with self._lock:
+            self._entries[name] = {'value': value, 'fetched_at': time.time()}
+            try:
+                self._save()
+            except OSError as ex:
+                logger.warning(f"[Warning] Failed to save signal cache : {ex}")
+        return value
+
+    def _refresh_in_background(self, name, fetch):
+        try:
+            self._refresh(name, fetch)
+        finally:
+            with self._lock:
+                self._refreshing.discard(name)
+
+    def get(self, name, fetch, ttl):
+        """
+        :param name: 소스 이름 (캐시 키)
+        :param fetch: 인자 없이 호출 가능한 조회 함수
+        :param ttl: 캐시 유효 시간(초)
+        :return: 캐시 또는 조회된 값 (조회 실패 및 이전 값이 없으면 None)
+        """
+        with self._lock:
+            entry = self._entries.get(name)
+            if entry is not None:
+                if time.time() - entry['fetched_at'] < ttl:
+                    self._count(name, 'hit')
+                    return entry['value']
+
+                self._count(name, 'stale')
+                if name not in self._refreshing:
+                    self._refreshing.add(name)
+                    threading.Thread(
+                        target=self._refresh_in_background,
+                        args=(name, fetch),
+                        name=f"signal-refresh-{name}",
+                        daemon=True
+                    ).start()
+                return entry['value']
+
+            self._count(name, 'miss')
+
+        value = self._refresh(name, fetch)
+        if value is None:
+            with self._lock:
+                entry = self._entries.get(name)
+            return None if entry is None else entry['value']
+        return value
+
+    def get_stats(self):
+        with self._lock:
+            return {name: dict(source_stats) for name, source_stats in self.stats.items()}
+
+
+_default_cache = None
+_default_cache_guard = threading.Lock()
+
+
+def get_signal_cache():
+    global _default_cache
+    with _default_cache_guard:
+        if _default_cache is None:
+            _default_cache = SignalCache()
+        return _default_cache
+
+
+def get_cached_fear_and_greed_index():
+    """
+    캐시를 통해 공포 탐욕 지수를 조회한다.
+    """
+    return get_signal_cache().get("fear_greed_index", get_fear_and_greed_index, ttl=FEAR_GREED_TTL)
+
+
+def get_cached_news(currency):
+    """
+    캐시를 통해 통화별 뉴스 헤드라인을 조회한다. (ETH 는 기존 캐시 키 news_headlines 를 그대로 사용)
+    """
+    name = "news_headlines" if currency.upper() == "ETH" else f"news_headlines_{currency.lower()}"
+    query = news_query(currency)
+    return get_signal_cache().get(name, lambda: get_news(query), ttl=NEWS_TTL)
+
+
+def get_cached_etherium_news():
+    """
+    캐시를 통해 이더리움 뉴스 헤드라인을 조회한다.
+    """
+    return get_cached_news("ETH")
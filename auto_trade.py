@@ -1,24 +1,55 @@
-import json
+import argparse
 import logging
 import os
 import pandas as pd
 import pyupbit
+import threading
 import time
 
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
-from openai import OpenAI
-from pydantic import BaseModel
 from ta.utils import dropna
 
-from analytics_resource.indicators import (
-    add_indicators,
-    get_fear_and_greed_index
+from analytics_resource.candle_store import get_ohlcv
+from analytics_resource.batch_indicators import add_indicators_vectorized
+from analytics_resource.incremental_indicators import get_indicator_stream
+from analytics_resource.chart_renderer import render_chart
+from analytics_resource.http_client import get_http_client
+from analytics_resource.signal_cache import (
+    get_cached_fear_and_greed_index,
+    get_cached_news,
+    get_signal_cache
+)
+from data_collector import DataSource, collect_data, print_timings
+from decision_gate import DecisionGate, get_last_decision, position_ratio, take_snapshot
+from exchange_adapter import UpbitExchange
+from market_feed import MarketDataFeed
+from paper_trading import PAPER_RESULT_COLLECTION, PaperExchange
+from llm_client import close_llm_client, get_llm_client
+from mongodb_connector import close_mongodb_client, ensure_trade_collection, get_mongodb_client
+from orchestrator import MarketOrchestrator
+from rate_limiter import get_upbit_limiter
+from scheduler import NonRetryableError, TradingScheduler
+from strategy_retriever import get_strategy_retriever
+from trade_analytics import get_performance_summary
+from trade_journal import close_trade_journal, get_trade_journal
+from tracing import span, tracer
+from trading_decision import build_failure_record, build_trade_record, execute_decision
+from reflection_cache import (
+    ReflectionCache,
+    get_or_generate_reflection,
+    make_reflection_key,
+    market_state_bucket
+)
+from prompt_encoder import (
+    TableSection,
+    TextSection,
+    build_prompt,
+    count_tokens,
+    encode_balances,
+    encode_orderbook,
+    to_json
 )
-from analytics_resource.news_data import get_etherium_news
-from analytics_resource.capture_chart import run_capture
-from analytics_resource.youtube_script import get_combined_transcript
-from mongodb_connector import get_mongodb_client
 
 # Logger 설정
 logging.basicConfig(level=logging.INFO)
@@ -27,16 +58,37 @@ logger = logging.getLogger(__name__)
 # 설정 파일 Load
 load_dotenv()
 
-# Structured Output : https://platform.openai.com/docs/guides/structured-outputs
-# OpenAI Playground : https://platform.openai.com/playground/chat?models=gpt-4o
-class TradingDecision(BaseModel):
-    decision: str
-    percentage: int
-    reason: str
-
-def get_recent_trades(mongodb_client, days=7):
-    seven_days_ago = (datetime.now() - timedelta(days=days)).isoformat()
-    raws = list(mongodb_client.autotradedb.trading_result.find({'timestamp':{'$gte': seven_days_ago}}, {'_id': 0}).sort('timestamp', -1))
+# 프롬프트 데이터 토큰 예산
+REFLECTION_MARKET_TOKEN_BUDGET = 2000
+DECISION_DATA_TOKEN_BUDGET = 3000
+# 시스템 프롬프트에 넣을 매매 기법 구절 토큰 예산 (strategy.txt 전체는 약 1,900 토큰)
+STRATEGY_TOKEN_BUDGET = 600
+
+# LLM 요청 deadline(초) : 넘기면 이번 주기는 실패 처리한다. (동시 요청 수 제한 대기 포함)
+REFLECTION_DEADLINE = 90
+DECISION_DEADLINE = 90
+
+# reflection 캐시 (프로세스 재시작 시에도 유지)
+reflection_cache = ReflectionCache()
+# 지표 변화가 없으면 LLM 호출을 건너뛰는 gate (--no-gate 로 비활성화)
+decision_gate = DecisionGate()
+
+DEFAULT_TICKER = "KRW-ETH"
+
+# 여러 마켓이 같은 원화 잔고를 사용하므로 잔고 조회 ~ 주문은 한 번에 한 마켓씩 실행한다.
+execution_lock = threading.Lock()
+
+def market_collection(result_collection, ticker):
+    """
+    마켓별 거래 기록 collection (KRW-ETH 는 기존 collection, 그 외 마켓은 trading_result_btc 형식)
+    """
+    if ticker == DEFAULT_TICKER:
+        return result_collection
+    return f"{result_collection}_{ticker.split('-')[1].lower()}"
+
+def get_recent_trades(mongodb_client, days=7, collection="trading_result"):
+    seven_days_ago = datetime.now() - timedelta(days=days)
+    raws = list(mongodb_client.autotradedb[collection].find({'timestamp':{'$gte': seven_days_ago}}, {'_id': 0}).sort('timestamp', -1))
     columns = ['timestamp', 'decision', 'percentage', 'reason', 'eth_balance', 'krw_balance', 'eth_avg_buy_price', 'eth_krw_price', 'reflection']
     return pd.DataFrame.from_records(data=raws, columns=columns)
 
@@ -49,10 +101,15 @@ def calculate_performance(trades_df):
 
     return (final_balance - initial_balance) / initial_balance * 100 if initial_balance > 0 else 0
 
-def generate_reflection(openai_client, trades_df, current_market_data):
-    performance = calculate_performance(trades_df)
-    response = openai_client.chat.completions.create(
-        model="gpt-4o",
+def generate_reflection(llm_client, trades_df, current_market_data, performance=None):
+    """
+    :param llm_client: llm_client.LLMClient
+    :param performance: 서버에서 집계한 기간 수익률(%) (없으면 trades_df 로 계산)
+    """
+    if performance is None:
+        performance = calculate_performance(trades_df)
+    response_content = llm_client.complete(
+        deadline=REFLECTION_DEADLINE,
         messages = [
             {
                 "role": "system",
@@ -62,7 +119,7 @@ def generate_reflection(openai_client, trades_df, current_market_data):
                 "role": "user",
                 "content": f"""
                     Recent trading data:
-                    {trades_df.to_json(orient='records')}
+                    {trades_df.to_json(orient='records', date_format='iso')}
                     
                     Current market data:
                     {current_market_data}
@@ -80,252 +137,476 @@ def generate_reflection(openai_client, trades_df, current_market_data):
             }
         ]
     )
-
-    response_content = response.choices[0].message.content
     return response_content
 
-def ai_trade():
-    print(f"##### [START] AutoTrade at {datetime.now().isoformat()} ######")
-
-    mongodb_client = get_mongodb_client()
-
+def create_upbit_client():
     upbit_access_key = os.getenv('UPBIT_ACCESS_KEY')
     upbit_secret_key = os.getenv('UPBIT_SECRET_KEY')
-    upbit_client = pyupbit.Upbit(upbit_access_key, upbit_secret_key)
+    return pyupbit.Upbit(upbit_access_key, upbit_secret_key)
+
+def get_current_orderbook(market_feed, ticker):
+    """
+    실시간 feed 의 최신 호가를 사용하고, 없으면 REST 로 조회한다.
+    """
+    orderbook = market_feed.get_orderbook(ticker) if market_feed else None
+    if orderbook:
+        return orderbook
+    get_upbit_limiter('quotation').acquire()
+    return pyupbit.get_orderbook(ticker)
+
+def get_current_price(market_feed, ticker):
+    """
+    실시간 feed 의 최근 체결가를 사용하고, 없으면 REST 로 조회한다.
+    """
+    price = market_feed.get_current_price(ticker) if market_feed else None
+    if price:
+        return price
+    get_upbit_limiter('quotation').acquire()
+    return pyupbit.get_current_price(ticker)
+
+def shared_data_sources(exchange):
+    """
+    모든 마켓에 공통인 데이터 소스 (MarketOrchestrator 는 주기마다 한 번만 조회한다.)
+    """
+    return [
+        # Get upbit balance
+        DataSource("balances", exchange.get_balances),
+        # 공포 탐욕 지수 가져오기
+        DataSource("fear_greed_index", get_cached_fear_and_greed_index, timeout=5, required=False),
+        # 매매 기법 색인 (strategy.txt, 변경되었을 때만 다시 만든다.)
+        # YouTube 자막은 StrategyRetriever(sources=["strategy.txt", "youtube:3XbtEX3jUv4"]) 로 함께 색인할 수 있다.
+        DataSource("strategy", get_strategy_retriever().load),
+    ]
 
-    ####################################################################################################################
-    # 1. 업비트 데이터 가져오기 (30일 일봉 데이터, 24시간 ohlcv 데이터, 오더북, balance)
-    ####################################################################################################################
-    print(">> Prepare data >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>")
-    print("> Get Upbit data : Balance")
-    # Get upbit balance
-    all_balances = upbit_client.get_balances()
-    # filtered_balances_dict = {balance['currency']:balance for balance in all_balances if balance['currency'] in ['ETH', 'KRW']}
-    filtered_balances = [balance for balance in all_balances if balance['currency'] in ['ETH', 'KRW']]
-
-    print("> Get Upbit orderbook data")
-    # Orderbook(현재 호가) 데이터 조회
-    order_book = pyupbit.get_orderbook("KRW-ETH")
-
-    print("> Get Upbit daily OHLCV")
-    # 30일 기준 일봉 데이터 조회
-    df_daily = pyupbit.get_ohlcv("KRW-ETH", interval="day", count=30)
-    df_daily = dropna(df_daily)
-    df_daily = add_indicators(df=df_daily)
-
-    print("> Get Upbit 24Hours OHLCV")
-    # 1일 기준 시간봉 데이터 조회
-    df_hourly = pyupbit.get_ohlcv("KRW-ETH", interval="minute60", count=24)
-    df_hourly = dropna(df_hourly)
-    df_hourly = add_indicators(df=df_hourly)
-
-    print("> Get fear and greed index")
-    # 공포 탐욕 지수 가져오기
-    fear_greed_index = get_fear_and_greed_index()
-
-    print("> Get news headline")
-    # 뉴스 헤드라인 가져오기
-    news_headlines = get_etherium_news()
-
-    # 차트 이미지 캡처 후 가져오기
-    # chart_image, saved_file_path = run_capture()
-
-    print("> Get Youtube script")
-    # YouTube script 가져오기
-    # youtube_transcript = get_combined_transcript(video_id="3XbtEX3jUv4")
-    with open("strategy.txt", "r", encoding="utf-8") as f:
-        # f.write(youtube_transcript)
-        youtube_transcript = f.read()
-
-    # 최근 거래 내역 가져오기
-    print("> Get recent trades result")
-    recent_trades = get_recent_trades(mongodb_client=mongodb_client)
+def request_ai_decision(llm_client, ticker, currency, collected, df_daily, df_hourly, df_chart, order_book,
+                        filtered_balances, recent_trades, performance_summary):
+    """
+    차트 / 프롬프트를 만들고 LLM 에 reflection 과 매매 판단을 요청한다.
+    :return: (TradingDecision, reflection)
+    """
+    fear_greed_index = collected["fear_greed_index"]
+    news_headlines = collected["news_headlines"] or []
+    # 현재 지표 상태(RSI 극단, 볼린저 밴드 이탈, MACD 교차)와 관련된 매매 기법 구절만 사용한다.
+    with span("strategy_retrieval"):
+        strategy_passages, strategy_signals = get_strategy_retriever().retrieve(
+            frames=[df_daily, df_hourly], token_budget=STRATEGY_TOKEN_BUDGET
+        )
+    print(f"> Strategy passages : {count_tokens(strategy_passages)} tokens (signals : {', '.join(strategy_signals) or 'none'})")
+
+    # 차트 이미지 생성 (캔들 데이터가 같으면 캐시된 이미지 재사용)
+    with span("chart"):
+        chart_image = render_chart(df=df_chart.iloc[-100:], title=f"{ticker} 1h")
 
     # 현재 시장 데이터 수집 (기존 코드에서 가져온 데이터 사용)
-    current_market_data = {
-        "fear_and_greed_index": fear_greed_index,
-        "news_headline": news_headlines,
-        "orderbook": order_book,
-        "daily_ohlcv": df_daily.to_dict(),
-        "hourly_ohlcv": df_hourly.to_dict()
-    }
-
-
+    # 토큰 예산에 맞춘 compact 표 형식으로 변환한다.
+    market_sections = [
+        TextSection("Fear and Greed index", to_json(fear_greed_index)),
+        TextSection("Recent news headlines", to_json(news_headlines)),
+        TextSection("Orderbook", "\n" + encode_orderbook(order_book)),
+        TableSection("Daily OHLCV with indicators (30 days)", df_daily),
+        TableSection("Hourly OHLCV with indicators (24 Hours)", df_hourly),
+    ]
+    current_market_data, market_tokens = build_prompt(sections=market_sections, token_budget=REFLECTION_MARKET_TOKEN_BUDGET)
+    # 기존 JSON 직렬화 대비 절감량은 매 주기 계산하지 않고 benchmark.bench_prompt_tokens 로 확인한다.
+    print(f"> Prompt tokens [reflection market data] : {market_tokens}")
 
-    ####################################################################################################################
-    # 2. AI에게 데이터를 제공하고 판단 받기
-    ####################################################################################################################
-    print(">> AI Decision >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>")
-    client = OpenAI()
+    client = llm_client or get_llm_client()
 
     print("> Make reflection")
-    # 반성 및 개선 내용 생성
-    reflection = generate_reflection(
-        openai_client=client,
-        trades_df=recent_trades,
-        current_market_data=current_market_data
-    )
+    # 반성 및 개선 내용 생성 (거래 내역과 시장 상태가 같으면 캐시된 reflection 재사용)
+    with span("reflection"):
+        reflection, cache_hit = get_or_generate_reflection(
+            cache=reflection_cache,
+            key=make_reflection_key(
+                trades_df=recent_trades,
+                market_bucket=market_state_bucket(df=df_hourly, fear_greed_index=fear_greed_index)
+            ),
+            generate=lambda: generate_reflection(
+                llm_client=client,
+                trades_df=recent_trades,
+                current_market_data=current_market_data,
+                performance=performance_summary['performance'] if performance_summary else None
+            )
+        )
+    print(f"> Reflection cache : {'HIT' if cache_hit else 'MISS'}")
 
     print("> Get AI Decision")
-    messages = [
-        {
-            "role": "system",
-            "content": f"""You are an expert in Cryptocurrency investing. Analyze the provided data including technical indicators and tell me whether to buy, sell, or hold at the moment. Consider the following indicators in your analysis. Translate the reason in the message's content into Korean:
+    # 매 주기 동일한 정적 내용(지시문)을 앞쪽에, 지표 상태에 따라 바뀌는 매매 기법 구절을 뒤쪽에 두어 provider 의 prefix caching 이 적용되도록 한다.
+    system_prompt = f"""You are an expert in Cryptocurrency investing. Analyze the provided data including technical indicators and tell me whether to buy, sell, or hold at the moment. Consider the following indicators in your analysis. Translate the reason in the message's content into Korean:
                     - Technical indicators and market data
                     - The Fear and Greed index and its implications
-                    - Recent news headlines and their potential impact on Ethereum price
+                    - Recent news headlines and their potential impact on {currency} price
                     - Insight from the YouTube video transcript
+                    - Recent trading reflection
+                    - The attached 1-hour candlestick chart with Bollinger Bands
 
-                    Recent trading reflection:
-                    {reflection}
+                    Market data tables are CSV. 't' is the time relative to the last candle (e.g. -3h, -2d).
 
-                    Particularly important is to always refer to the trading method of 'Wonyyotti', a legendary Korean investor, to access the current situation and make trading decision. Wonyyotti's trading method is as follows: 
-                    {youtube_transcript}
+                    Particularly important is to always refer to the trading method of 'Wonyyotti', a legendary Korean investor, to access the current situation and make trading decision. Passages of Wonyyotti's trading method relevant to the current indicators are given at the end of this message.
                     
                     Based on this trading method, analyze the current market situation and make a judgement by synthesizing it with the provided data.
                     
                     Response format:
                     1. A decision (buy, sell, or hold)
                     2. If the decision is 'buy', provide a percentage (1-100) of available KRW to use for buying.
-                    If the decision is 'sell', provide a percentabe (1-100) of held ETH to sell.
+                    If the decision is 'sell', provide a percentabe (1-100) of held {currency} to sell.
                     If the decision is 'hold', set the percentage to 0.
                     3. A reason for your deicision
                     
                     Ensure that the percentage is an integer between 1 and 100 for buy/sell decision, and exactly 0 for hold decisions.
                     Your percentage should reflect the strength of your conviction in the decision based on. the analyzed data.
+
+                    Wonyyotti's trading method (YouTube video transcript passages):
+                    {strategy_passages}
             """
+    decision_data, decision_tokens = build_prompt(
+        sections=[
+            TextSection("Recent trading reflection", reflection),
+            TextSection("Current investment status", "\n" + encode_balances(filtered_balances)),
+        ] + market_sections,
+        token_budget=DECISION_DATA_TOKEN_BUDGET
+    )
+    print(f"> Prompt tokens [decision system] : {count_tokens(system_prompt)}")
+    print(f"> Prompt tokens [decision data] : {decision_tokens}")
+    messages = [
+        {
+            "role": "system",
+            "content": system_prompt
         },
         {
             "role": "user",
             "content": [
                 {
                     "type": "text",
-                    "text": f"""
-                        Current investment status: {json.dumps(filtered_balances)}
-                        Orderbook: {json.dumps(order_book)}
-                        Daily OHLCV with indicators (30 days): {df_daily.to_json()}
-                        Hourly OHLCV with indicators (24 Hours): {df_hourly.to_json()}
-                        Fear and Greed index: {json.dumps(fear_greed_index)}
-                        Recent news headlines : {json.dumps(news_headlines)}
-                    """
+                    "text": decision_data
                 },
-                # {
-                #     "type": "image_url",
-                #     "image_url": {
-                #         "url": f"data:image/png;base64,{chart_image}"
-                #     }
-                # }
+                {
+                    "type": "image_url",
+                    "image_url": {
+                        "url": f"data:image/png;base64,{chart_image}"
+                    }
+                }
             ]
         }
     ]
-    response_format = {
-        "type": "json_schema",
-        "json_schema": {
-            "name": "trading_decision",
-            "strict": True,
-            "schema": {
-                "type": "object",
-                "properties": {
-                    "decision": {
-                        "type": "string",
-                        "enum": ["buy", "sell", "hold"]
-                    },
-                    "percentage": {
-                        "type": "integer"
-                    },
-                    "reason": {
-                        "type": "string"
-                    }
-                },
-                "required": ["decision", "percentage",  "reason"],
-                "additionalProperties": False
-            }
-        }
-    }
-    response = client.chat.completions.create(
-        model="gpt-4o",
-        messages=messages,
-        response_format=response_format,
-        max_tokens=4095
-    )
-    # ai_decision = response.choices[0].message.content
-    trade_decision = TradingDecision.model_validate_json(response.choices[0].message.content)
+    with span("decision"):
+        # 스트리밍으로 받으며 decision / percentage 가 먼저 확인되면 출력한다.
+        trade_decision = client.decide(
+            messages=messages,
+            deadline=DECISION_DEADLINE,
+            on_partial=lambda partial: print(f"> Partial decision : {partial}")
+        )
+    print(f"> LLM stats : {client.get_stats()}")
+    return trade_decision, reflection
+
+def ai_trade(upbit_client=None, llm_client=None, market_feed=None, exchange=None, result_collection="trading_result",
+             ticker=DEFAULT_TICKER, shared=None):
+    """
+    자동매매 1 주기를 실행한다.
+    :param upbit_client: 재사용할 Upbit client (없으면 새로 생성)
+    :param llm_client: LLM 요청에 사용할 LLMClient (없으면 프로세스 전역 client)
+    :param market_feed: 현재가 / 호가를 메모리에서 읽을 MarketDataFeed (없으면 REST 조회)
+    :param exchange: 로컬 잔고 상태를 유지하는 거래소 adapter (없으면 upbit_client 로 UpbitExchange 생성)
+    :param result_collection: 거래 기록을 저장 / 조회할 collection (모의 거래 시 paper_trading_result)
+    :param ticker: 매매할 마켓
+    :param shared: MarketOrchestrator 가 미리 조회한 공통 데이터 (없으면 직접 조회하고 지연시간 지표도 내보낸다.)
+    :return:
+    """
+    print(f"##### [START] AutoTrade {ticker} at {datetime.now().isoformat()} ######")
+    if shared is None:
+        tracer.begin_cycle()
+    cycle_started_at = time.perf_counter()
+
+    mongodb_client = get_mongodb_client()
+
+    exchange = exchange or UpbitExchange(upbit_client or create_upbit_client())
+    currency = ticker.split('-')[1]
+    result_collection = market_collection(result_collection, ticker)
+
+    ####################################################################################################################
+    # 1. 업비트 데이터 가져오기 (30일 일봉 데이터, 24시간 ohlcv 데이터, 오더북, balance)
+    ####################################################################################################################
+    print(">> Prepare data >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>")
+    # 데이터 소스들을 동시에 조회한다. (뉴스, 공포 탐욕 지수는 실패 시 누락 처리)
+    with span("data_fetch"):
+        collected, timings = collect_data(sources=([] if shared is not None else shared_data_sources(exchange)) + [
+            # Orderbook(현재 호가) 데이터 조회
+            DataSource("orderbook", lambda: get_current_orderbook(market_feed, ticker)),
+            # 30일 기준 일봉 데이터 조회
+            DataSource("daily_ohlcv", lambda: get_ohlcv(ticker, interval="day", count=30)),
+            # 1일 기준 시간봉 데이터 조회
+            DataSource("hourly_ohlcv", lambda: get_ohlcv(ticker, interval="minute60", count=24)),
+            # 차트용 시간봉 (볼린저 밴드 20 구간 이후 100시간)
+            DataSource("chart_ohlcv", lambda: get_ohlcv(ticker, interval="minute60", count=120)),
+            # 최근 거래 내역 가져오기
+            DataSource("recent_trades", lambda: get_recent_trades(mongodb_client=mongodb_client, collection=result_collection)),
+            # 마지막 거래 기록 (decision gate 비교 기준 snapshot 포함)
+            # (journal 에서 아직 저장되지 않은 기록이 있으면 그 기록)
+            DataSource("last_decision", lambda: get_trade_journal().last_pending(result_collection)
+                       or get_last_decision(mongodb_client=mongodb_client, collection=result_collection)),
+            # 마켓 통화의 뉴스 헤드라인 (통화별 캐시)
+            DataSource("news_headlines", lambda: get_cached_news(currency), timeout=5, required=False),
+            # 최근 7일 수익률 / 판단 횟수 (서버 집계)
+            DataSource("performance_summary", lambda: get_performance_summary(mongodb_client=mongodb_client, days=7, collection=result_collection), required=False),
+        ])
+    print("> Data collection timings")
+    print_timings(timings)
+    for name, elapsed in timings.items():
+        if name != "total":
+            tracer.observe(f"data_fetch.{name}", elapsed)
+    print(f"> Signal cache stats : {get_signal_cache().get_stats()}")
+    print(f"> HTTP stats : {get_http_client().get_stats()}")
+    if shared is not None:
+        collected = {**shared, **collected}
+
+    all_balances = collected["balances"]
+    # filtered_balances_dict = {balance['currency']:balance for balance in all_balances if balance['currency'] in ['ETH', 'KRW']}
+    filtered_balances = [balance for balance in all_balances if balance['currency'] in [currency, 'KRW']]
+    order_book = collected["orderbook"]
+
+    with span("indicators"):
+        # add_indicators(ta) 와 같은 값을 numpy 로 한번에 계산한다.
+        df_daily = dropna(collected["daily_ohlcv"])
+        df_daily = add_indicators_vectorized(df=df_daily)
+
+        df_hourly = dropna(collected["hourly_ohlcv"])
+        df_hourly = add_indicators_vectorized(df=df_hourly)
+
+        # 차트 / decision gate 용 시간봉 (24시간 구간은 MACD 계산에 필요한 캔들 수보다 짧다.)
+        # 이전 주기 이후 새로 마감된 캔들만 지표 엔진에 반영한다. (첫 주기는 add_indicators 와 같은 값)
+        df_chart = get_indicator_stream(ticker, "minute60").update_dataframe(dropna(collected["chart_ohlcv"]))
+
+    recent_trades = collected["recent_trades"]
+    performance_summary = collected["performance_summary"]
+    if performance_summary:
+        print(f"> Performance (7 days) : {performance_summary['performance']:.2f}% "
+              f"(buy {performance_summary['buy_count']} / sell {performance_summary['sell_count']} / hold {performance_summary['hold_count']})")
+
+    ####################################################################################################################
+    # 2. AI에게 데이터를 제공하고 판단 받기
+    ####################################################################################################################
+    print(">> AI Decision >>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>>")
+    # 마지막 AI 판단 이후 지표 / 호가 / 보유 비중이 임계값 이상 바뀌지 않았으면 LLM 을 호출하지 않는다.
+    with span("decision_gate"):
+        gate_result = decision_gate.check(
+            last_record=collected["last_decision"],
+            snapshot=take_snapshot(df=df_chart, order_book=order_book, exchange=exchange, currency=currency)
+        )
+    if gate_result.skip:
+        trade_decision, reflection = gate_result.decision, gate_result.reflection
+        tracer.observe("decision_gate.saved", gate_result.saved_seconds)
+    else:
+        trade_decision, reflection = request_ai_decision(
+            llm_client=llm_client,
+            ticker=ticker,
+            currency=currency,
+            collected=collected,
+            df_daily=df_daily,
+            df_hourly=df_hourly,
+            df_chart=df_chart,
+            order_book=order_book,
+            filtered_balances=filtered_balances,
+            recent_trades=recent_trades,
+            performance_summary=performance_summary
+        )
+    gate_stats = decision_gate.get_stats()
+    print(f"> Decision gate : {'SKIP' if gate_result.skip else 'CALL (' + ', '.join(gate_result.reasons) + ')'} "
+          f"(skip rate {gate_stats['skip_rate']:.0%} = {gate_stats['skips']}/{gate_stats['checks']}, "
+          f"saved {gate_stats['saved_seconds']:.1f}s)")
 
 
     ####################################################################################################################
     # 3. AI의 판단에 따라 실제로 자동매매 진행하기
     ####################################################################################################################
     print("> Execution trading")
-    # Setup upbit client
-    upbit_access_key = os.getenv('UPBIT_ACCESS_KEY')
-    upbit_secret_key = os.getenv('UPBIT_SECRET_KEY')
-    upbit_client = pyupbit.Upbit(upbit_access_key, upbit_secret_key)
 
     print(f"## AI Decision : {trade_decision.decision.upper()} ###")
     print(f"## Reason : {trade_decision.reason} ###")
 
-    if trade_decision.decision.upper() == 'BUY':
-        my_krw = upbit_client.get_balance("KRW")
-        trading_quantity = my_krw * (trade_decision.percentage / 100) * 0.99
-        if trading_quantity > 5000:  # Upbit 매수 최소 금액 5,000원 확인
-            print(f"> Buy order executed : {trade_decision.percentage}% of available KRW")
-            print(upbit_client.buy_market_order("KRW-ETH", trading_quantity))
-            pass
-        else:
-            print("[Warning] 매수 최소 금액 미충족 (원화 잔액이 5,000원 이하)")
-
-    elif trade_decision.decision.upper() == 'SELL':
-        my_eth = upbit_client.get_balance("ETH")
-        trading_quantity = my_eth * (trade_decision.percentage / 100)
-        current_price = pyupbit.get_orderbook(ticker="KRW-ETH")['orderbook_units'][0]['ask_price']  # 현재 매도 호가 조회
-        if trading_quantity * current_price > 5000:
-            print(f"> Sell order executed : {trade_decision.percentage}% of held ETH")
-            print(upbit_client.sell_market_order("KRW-ETH", upbit_client.get_balance("KRW-ETH")))
-            pass
-        else:
-            print("[Warning] 매도 최소 금액 미충족 (5,000원 미만)")
-
-    elif trade_decision.decision.upper() == 'HOLD':
-        print(f"> HOLD Position")
-
-    # 거래 여부와 상관없이 현재 잔액 조회
-    time.sleep(1) # API 호출 제한을 고려하여 잠시 대기
-    balances = upbit_client.get_balances()
-    eth_balance = next((float(balance['balance']) for balance in balances if balance['currency'] == 'ETH'),0)
-    krw_balance = next((float(balance['balance']) for balance in balances if balance['currency'] == 'KRW'), 0)
-    eth_avg_buy_price = next((float(balance['avg_buy_price']) for balance in balances if balance['currency'] == 'ETH'), 0)
-    current_eth_price = pyupbit.get_current_price('KRW-ETH')
-
-    log_trade = {
-        "timestamp": datetime.now().isoformat(),
-        "decision": trade_decision.decision.upper(),
-        "percentage": trade_decision.percentage,
-        "reason": trade_decision.reason,
-        "eth_balance": eth_balance,
-        "krw_balance": krw_balance,
-        "eth_avg_buy_price": eth_avg_buy_price,
-        "eth_krw_price": current_eth_price,
-        "reflection": reflection
-    }
+    order = execution_error = None
+    with span("execution"), execution_lock:
+        try:
+            order = execute_decision(
+                exchange=exchange,
+                trade_decision=trade_decision,
+                ticker=ticker,
+                get_orderbook=lambda ticker: get_current_orderbook(market_feed, ticker)
+            )
+
+            # 거래 여부와 상관없이 현재 잔액 조회 (주문 체결 내역으로 갱신된 로컬 잔고 사용)
+            log_trade = build_trade_record(
+                trade_decision=trade_decision,
+                exchange=exchange,
+                current_price=get_current_price(market_feed, ticker),
+                reflection=reflection,
+                ticker=ticker
+            )
+            if not gate_result.skip:
+                # 다음 주기는 주문 체결 후의 보유 비중과 비교한다.
+                gate_result.snapshot['position'] = position_ratio(exchange, currency, gate_result.snapshot['price'])
+        except Exception as ex:
+            # 주문이 이미 나갔을 수 있으므로 이 주기는 재시도하지 않고, 실패로 표시한 기록을 남긴다.
+            print("[EX] Execution failed : ", str(ex.args))
+            execution_error = ex
+            log_trade = build_failure_record(
+                trade_decision=trade_decision,
+                exchange=exchange,
+                order_book=order_book,
+                reflection=reflection,
+                ticker=ticker,
+                error=ex,
+                order=order
+            )
+        log_trade['gate'] = gate_result.to_record()
     try:
-        # Setup mongodb client
-        mongodb_client.autotradedb.trading_result.insert_one(log_trade)
-        mongodb_client.close()
+        # 로컬 journal 에 기록하고 MongoDB 저장 / 시간, 일 요약 갱신은 백그라운드에서 수행한다.
+        with span("log_insert"):
+            trade_journal = get_trade_journal()
+            trade_journal.append(collection=result_collection, record=log_trade)
+        print(f"> Trade journal stats : {trade_journal.get_stats()}")
     except Exception as ex:
-        print("[EX] Failed to insert log trade : ", str(ex.args))
+        print("[EX] Failed to append log trade to journal : ", str(ex.args))
+
+    tracer.observe("market_cycle", time.perf_counter() - cycle_started_at)
+    if shared is None:
+        tracer.observe("cycle", time.perf_counter() - cycle_started_at)
+        export_metrics(mongodb_client)
 
     print("##### [END] AutoTrade #####")
     print("\n\n\n")
+    if execution_error is not None:
+        raise OrderExecutionError(f"{ticker} execution failed : {execution_error}") from execution_error
+
+class OrderExecutionError(NonRetryableError):
+    """
+    주문 단계 이후의 실패 (scheduler 가 같은 주기를 다시 실행하지 않는다.)
+    """
+
+def export_metrics(mongodb_client):
+    """
+    단계별 지연시간 기록 (Prometheus textfile + MongoDB metrics collection)
+    """
+    tracer.print_summary()
+    tracer.write_prometheus()
+    tracer.export_to_mongo(mongodb_client)
+
+def load_paper_balances(last_record, tickers, initial_krw=1_000_000):
+    """
+    모의 거래 잔고를 마켓별 모의 거래 기록의 마지막 기록에서 이어 받는다. (실행할 때마다 초기화되지 않도록)
+    :param last_record: collection -> 마지막 거래 기록 (없으면 None)
+    :param tickers: 마켓 목록
+    :param initial_krw: 기록이 없을 때의 원화 잔고
+    :return: pyupbit get_balances 형식의 잔고 목록
+    """
+    balances = {'KRW': {'currency': 'KRW', 'balance': initial_krw, 'locked': 0, 'avg_buy_price': 0}}
+    latest = None
+    for ticker in tickers:
+        record = last_record(market_collection(PAPER_RESULT_COLLECTION, ticker))
+        if record is None:
+            continue
+        currency = ticker.split('-')[1]
+        balances[currency] = {'currency': currency, 'balance': record['eth_balance'], 'locked': 0,
+                              'avg_buy_price': record['eth_avg_buy_price']}
+        # 원화는 모든 마켓이 함께 사용하므로 가장 최근 기록의 잔고를 사용한다.
+        if latest is None or record['timestamp'] > latest['timestamp']:
+            latest = record
+    if latest is not None:
+        balances['KRW']['balance'] = latest['krw_balance']
+    return list(balances.values())
+
+def create_paper_exchange(market_feed=None, tickers=(DEFAULT_TICKER,), initial_krw=1_000_000):
+    """
+    실제 주문 없이 현재 호가로 체결하는 모의 거래소를 만든다.
+    잔고는 이전 모의 거래 기록(journal 에서 저장 대기 중인 기록 포함)에서 이어 받는다.
+    """
+    mongodb_client = get_mongodb_client()
+    trade_journal = get_trade_journal()
+    balances = load_paper_balances(
+        last_record=lambda collection: trade_journal.last_pending(collection)
+                                       or get_last_decision(mongodb_client=mongodb_client, collection=collection),
+        tickers=tickers,
+        initial_krw=initial_krw
+    )
+    print(f"> Paper trading balances : {balances}")
+    return PaperExchange(
+        balances=balances,
+        orderbook_source=lambda ticker: get_current_orderbook(market_feed, ticker)
+    )
 
-# def run_trading():
-#     while True:
-#         try:
-#             ai_trade()
-#             time.sleep(600) # 10분마다 실행
-#         except Exception as ex:
-#             logger.error(f"Auto trading error : {ex}")
-#             time.sleep(300) # 오류 발생 시 5분 후 재시도
+def create_orchestrator(tickers, exchange, llm_client, market_feed=None, result_collection="trading_result"):
+    """
+    여러 마켓의 ai_trade 를 공통 데이터 공유 / worker pool 로 실행하는 orchestrator 를 만든다.
+    """
+    mongodb_client = get_mongodb_client()
+    for ticker in tickers:
+        ensure_trade_collection(mongodb_client, market_collection(result_collection, ticker))
+
+    return MarketOrchestrator(
+        tickers=tickers,
+        trade=lambda ticker, shared: ai_trade(llm_client=llm_client, market_feed=market_feed, exchange=exchange,
+                                              result_collection=result_collection, ticker=ticker, shared=shared),
+        shared_sources=lambda: shared_data_sources(exchange),
+        after_cycle=lambda: export_metrics(mongodb_client)
+    )
+
+def run_trading(interval=600, paper=False, tickers=(DEFAULT_TICKER,)):
+    """
+    wall-clock 기준 interval 초마다 마켓별 ai_trade 를 실행한다. (기본 10분)
+    거래소 adapter(로컬 잔고 포함) / LLM / MongoDB client, 실시간 시세 feed 와 캐시는 주기 간에 재사용한다.
+    :param paper: True 이면 모의 거래(PaperExchange)로 실행한다.
+    :param tickers: 매매할 마켓 목록
+    """
+    llm_client = get_llm_client()
+    get_mongodb_client()
+    # 이전 실행에서 저장하지 못한 거래 기록을 다시 저장한다.
+    get_trade_journal()
+    market_feed = MarketDataFeed(tickers=tickers)
+    market_feed.start(wait=5)
+    exchange = create_paper_exchange(market_feed, tickers) if paper else UpbitExchange(create_upbit_client())
+    result_collection = PAPER_RESULT_COLLECTION if paper else "trading_result"
+    orchestrator = create_orchestrator(tickers, exchange, llm_client, market_feed, result_collection)
+
+    scheduler = TradingScheduler(job=orchestrator.run_cycle, interval=interval)
+    try:
+        scheduler.run_forever()
+    finally:
+        orchestrator.close()
+        market_feed.stop()
+        close_llm_client()
+        close_trade_journal()
+        close_mongodb_client()
 
 if __name__ == "__main__":
-    # run_trading()
-    ai_trade()
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--daemon", action="store_true", help="스케줄러로 주기 실행")
+    parser.add_argument("--interval", type=int, default=600, help="실행 주기(초)")
+    parser.add_argument("--paper", action="store_true", help="실제 주문 없이 모의 거래로 실행")
+    parser.add_argument("--markets", default=DEFAULT_TICKER, help="매매할 마켓 목록 (쉼표 구분, 예: KRW-ETH,KRW-BTC)")
+    parser.add_argument("--no-gate", action="store_true", help="지표 변화와 관계없이 매 주기 AI 판단 요청")
+    args = parser.parse_args()
+    markets = [market.strip() for market in args.markets.split(",") if market.strip()]
+    decision_gate.enabled = not args.no_gate
+
+    if args.daemon:
+        run_trading(interval=args.interval, paper=args.paper, tickers=markets)
+    elif len(markets) > 1:
+        orchestrator = create_orchestrator(
+            tickers=markets,
+            exchange=create_paper_exchange(tickers=markets) if args.paper else UpbitExchange(create_upbit_client()),
+            llm_client=get_llm_client(),
+            result_collection=PAPER_RESULT_COLLECTION if args.paper else "trading_result"
+        )
+        try:
+            orchestrator.run_cycle()
+        finally:
+            orchestrator.close()
+            close_trade_journal()
+    else:
+        try:
+            if args.paper:
+                ai_trade(exchange=create_paper_exchange(tickers=markets), result_collection=PAPER_RESULT_COLLECTION,
+                         ticker=markets[0])
+            else:
+                ai_trade(ticker=markets[0])
+        finally:
+            close_trade_journal()
@@ -0,0 +1,221 @@
+"""
+저장된 캔들로 매매 전략을 오프라인(네트워크 없이) 검증하는 백테스터
+
+    $ python backtester.py --ticker KRW-ETH --interval minute60 --count 8760
+"""
+import argparse
+import itertools
+import math
+import os
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ta.utils import dropna
+
+from analytics_resource.batch_indicators import add_indicators_vectorized
+from analytics_resource.candle_store import CandleStore, DEFAULT_STORE_DIR
+from exchange_adapter import DEFAULT_FEE_RATE
+from trading_decision import TradingDecision, buy_amount, sell_volume
+
+# MACD signal 이 계산되기 시작하는 캔들 수
+DEFAULT_WARMUP = 33
+
+HOLD = TradingDecision(decision="hold", percentage=0, reason="")
+
+
+class RuleBasedPolicy:
+    """
+    RSI / 볼린저 밴드 기반 규칙 정책
+    - RSI < rsi_buy (그리고 use_bb 이면 종가 <= 하단 밴드) : buy_percentage% 매수
+    - RSI > rsi_sell (그리고 use_bb 이면 종가 >= 상단 밴드) : sell_percentage% 매도
+    """
+    def __init__(self, rsi_buy=30, rsi_sell=70, buy_percentage=50, sell_percentage=100, use_bb=True):
+        self.rsi_buy = rsi_buy
+        self.rsi_sell = rsi_sell
+        self.buy_percentage = buy_percentage
+        self.sell_percentage = sell_percentage
+        self.use_bb = use_bb
+        self._buy = TradingDecision(decision="buy", percentage=buy_percentage, reason="rsi oversold")
+        self._sell = TradingDecision(decision="sell", percentage=sell_percentage, reason="rsi overbought")
+
+    def decide(self, candle, portfolio):
+        if math.isnan(candle.rsi):
+            return HOLD
+        if candle.rsi < self.rsi_buy and (not self.use_bb or candle.close <= candle.bb_bbl):
+            return self._buy
+        if candle.rsi > self.rsi_sell and (not self.use_bb or candle.close >= candle.bb_bbh):
+            return self._sell
+        return HOLD
+
+
+class CannedDecisionPolicy:
+    """
+    LLM 대신 미리 준비한 TradingDecision 을 순서대로 반환하는 정책 (LLM stub)
+    """
+    def __init__(self, decisions, repeat=True):
+        self.decisions = [
+            decision if isinstance(decision, TradingDecision) else TradingDecision.model_validate(decision)
+            for decision in decisions
+        ]
+        self.repeat = repeat
+        self._position = 0
+
+    def decide(self, candle, portfolio):
+        if self._position >= len(self.decisions):
+            if not self.repeat or not self.decisions:
+                return HOLD
+            self._position = 0
+        decision = self.decisions[self._position]
+        self._position += 1
+        return decision
+
+
+def load_candles(ticker="KRW-ETH", interval="minute60", count=None, store_dir=DEFAULT_STORE_DIR):
+    """
+    캔들 저장소에서 캔들을 읽고 보조 지표를 추가한다. (네트워크 호출 없음)
+    """
+    df = CandleStore(store_dir=store_dir).read(ticker=ticker, interval=interval)
+    if df is None:
+        raise FileNotFoundError(f"No stored candles : {ticker} {interval} ({store_dir})")
+    if count is not None:
+        df = df.tail(count)
+    return add_indicators_vectorized(df=dropna(df))
+
+
+def _forward_fill(values, initial):
+    """
+    NaN 을 직전 값(처음은 initial)으로 채운다.
+    """
+    values = np.concatenate([[initial], values])
+    index = np.where(np.isnan(values), 0, np.arange(len(values)))
+    return values[np.maximum.accumulate(index)][1:]
+
+
+def run_backtest(df, policy, initial_krw=1_000_000, initial_eth=0.0, fee_rate=DEFAULT_FEE_RATE,
+                 decision_every=1, warmup=DEFAULT_WARMUP, keep_equity=False):
+    """
+    캔들을 순서대로 재생하며 정책의 판단을 ai_trade 와 같은 주문 크기 규칙(최소 5,000원, 0.99 수수료 비율)으로 체결한다.
+    체결가는 해당 캔들의 종가로 가정한다.
+    :param df: 보조 지표가 포함된 OHLCV DataFrame
+    :param policy: decide(candle, portfolio) -> TradingDecision 을 제공하는 객체
+    :param decision_every: 판단 주기(캔들 수)
+    :param warmup: 판단을 시작할 캔들 위치
+    :param keep_equity: 결과에 자산 곡선 포함 여부
+    :return: 성과 요약 dict
+    """
+    closes = df['close'].to_numpy(dtype=np.float64)
+    krw_after = np.full(len(df), np.nan)
+    eth_after = np.full(len(df), np.nan)
+
+    krw, eth = initial_krw, initial_eth
+    decisions = {'BUY': 0, 'SELL': 0, 'HOLD': 0}
+    trades = 0
+    for i, candle in enumerate(df.itertuples()):
+        if i < warmup or (i - warmup) % decision_every != 0:
+            continue
+
+        price = closes[i]
+        decision = policy.decide(candle, {'krw_balance': krw, 'eth_balance': eth, 'price': price})
+        action = decision.decision.upper()
+        decisions[action] = decisions.get(action, 0) + 1
+
+        if action == 'BUY':
+            amount = buy_amount(krw, decision.percentage)
+            if amount > 0:
+                # 매수 수수료는 주문 금액에 더해서 낸다. (Upbit / SimulatedExchange 와 같음)
+                krw -= amount * (1 + fee_rate)
+                eth += amount / price
+                trades += 1
+        elif action == 'SELL':
+            volume = sell_volume(eth, decision.percentage, price)
+            if volume > 0:
+                eth -= volume
+                krw += volume * price * (1 - fee_rate)
+                trades += 1
+        else:
+            continue
+
+        krw_after[i] = krw
+        eth_after[i] = eth
+
+    # 자산 곡선 (KRW + ETH x 종가)
+    equity = _forward_fill(krw_after, initial_krw) + _forward_fill(eth_after, initial_eth) * closes
+    initial_equity = initial_krw + initial_eth * closes[0]
+    drawdown = equity / np.maximum.accumulate(equity) - 1
+
+    result = {
+        'final_equity': float(equity[-1]),
+        'total_return_pct': float((equity[-1] / initial_equity - 1) * 100),
+        'buy_and_hold_pct': float((closes[-1] / closes[0] - 1) * 100),
+        'max_drawdown_pct': float(drawdown.min() * 100),
+        'trades': trades,
+        'decisions': decisions,
+    }
+    if keep_equity:
+        result['equity'] = pd.Series(equity, index=df.index, name='equity')
+    return result
+
+
+def expand_grid(grid):
+    """
+    {'rsi_buy': [25, 30], 'rsi_sell': [70, 75]} -> 파라미터 조합 list
+    """
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[key] for key in keys))]
+
+
+_worker_candles = None
+
+
+def _init_worker(df):
+    global _worker_candles
+    _worker_candles = df
+
+
+def _run_params(args):
+    policy_class, params, options = args
+    result = run_backtest(_worker_candles, policy_class(**params), **options)
+    result['params'] = params
+    return result
+
+
+def run_sweep(df, policy_class, param_grid, max_workers=None, **options):
+    """
+    파라미터 조합별 백테스트를 process pool 에서 병렬 실행한다.
+    :param df: 보조 지표가 포함된 OHLCV DataFrame (worker 마다 한번만 전달)
+    :param policy_class: 파라미터로 생성할 정책 클래스
+    :param param_grid: 파라미터 dict list (expand_grid 참고)
+    :param options: run_backtest 옵션
+    :return: total_return_pct 내림차순 결과 list
+    """
+    tasks = [(policy_class, params, options) for params in param_grid]
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), initializer=_init_worker, initargs=(df,)) as executor:
+        results = list(executor.map(_run_params, tasks))
+    return sorted(results, key=lambda result: result['total_return_pct'], reverse=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ticker", default="KRW-ETH")
+    parser.add_argument("--interval", default="minute60")
+    parser.add_argument("--count", type=int, default=None)
+    parser.add_argument("--store-dir", default=DEFAULT_STORE_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    candles = load_candles(ticker=args.ticker, interval=args.interval, count=args.count, store_dir=args.store_dir)
+    grid = expand_grid({
+        'rsi_buy': [25, 30, 35],
+        'rsi_sell': [65, 70, 75],
+        'buy_percentage': [30, 50, 100],
+        'use_bb': [True, False],
+    })
+    results = run_sweep(candles, RuleBasedPolicy, grid, max_workers=args.workers)
+
+    print(f"## Backtest {args.ticker} {args.interval} : {len(candles)} candles, {len(grid)} parameter sets")
+    for result in results[:10]:
+        print(f"  return {result['total_return_pct']:8.2f}% / mdd {result['max_drawdown_pct']:7.2f}% / "
+              f"trades {result['trades']:4d} / buy&hold {result['buy_and_hold_pct']:.2f}% : {result['params']}")
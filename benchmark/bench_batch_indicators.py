@@ -0,0 +1,46 @@
+"""
+티커별 add_indicators 반복 호출과 compute_indicators_batch 의 정확도 / 속도 비교
+
+    $ python -m benchmark.bench_batch_indicators --tickers 200 --candles 200
+"""
+import argparse
+import time
+
+import numpy as np
+
+from analytics_resource.batch_indicators import compute_indicators_batch, stack_closes
+from analytics_resource.incremental_indicators import INDICATOR_COLUMNS
+from analytics_resource.indicators import add_indicators
+from benchmark.bench_indicators import make_candles
+
+
+def run(tickers, candles):
+    # 상장 기간이 다른 티커를 섞기 위해 일부 티커는 캔들 수를 줄인다.
+    frames = {f"KRW-T{i:03d}": make_candles(candles, seed=i).iloc[(i % 5) * 10:] for i in range(tickers)}
+
+    started_at = time.perf_counter()
+    expected = {ticker: add_indicators(df=df.copy()) for ticker, df in frames.items()}
+    ta_elapsed = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    names, index, closes = stack_closes(frames)
+    actual = compute_indicators_batch(closes)
+    batch_elapsed = time.perf_counter() - started_at
+
+    for row, ticker in enumerate(names):
+        aligned = expected[ticker].reindex(index)
+        for column in INDICATOR_COLUMNS:
+            np.testing.assert_allclose(actual[column][row], aligned[column], rtol=1e-9, atol=1e-9, equal_nan=True)
+
+    print(f"## {tickers} tickers x {candles} candles")
+    print(f"  ta (per ticker)      {ta_elapsed * 1000:10.1f} ms")
+    print(f"  batch (vectorized)   {batch_elapsed * 1000:10.1f} ms")
+    print(f"  speedup              {ta_elapsed / batch_elapsed:10.1f} x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickers", type=int, default=200)
+    parser.add_argument("--candles", type=int, default=200)
+    args = parser.parse_args()
+    run(tickers=args.tickers, candles=args.candles)
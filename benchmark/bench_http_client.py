@@ -0,0 +1,107 @@
+"""
+로컬 HTTP 서버(외부 API 대체)로 HttpClient 의 connection 재사용 / 재시도 / timeout 을 확인한다.
+
+    $ python -m benchmark.bench_http_client --requests 200
+"""
+import argparse
+import itertools
+import json
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from analytics_resource.http_client import HostConfig, HttpClient
+from analytics_resource.indicators import get_fear_and_greed_index
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """
+    /fng/   : alternative.me 공포 탐욕 지수 응답
+    /flaky  : 3번 중 2번은 503
+    /slow   : 응답 전 1초 대기 (read timeout 확인용)
+    """
+    protocol_version = "HTTP/1.1"
+    # keep-alive 연결에서 헤더 / 본문을 나누어 보낼 때 Nagle + delayed ACK 로 40ms 씩 지연되지 않도록 한다.
+    disable_nagle_algorithm = True
+    flaky_counter = itertools.count()
+    connections = set()
+
+    def do_GET(self):
+        StandInHandler.connections.add(self.client_address)
+        if self.path.startswith("/flaky") and next(self.flaky_counter) % 3 != 2:
+            return self._send(503, {"error": "unavailable"})
+        if self.path.startswith("/slow"):
+            time.sleep(1)
+        self._send(200, {"data": [{"value": "40", "value_classification": "Fear", "timestamp": "0"}]})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except BrokenPipeError:
+            pass  # client 가 timeout 으로 먼저 연결을 끊은 경우
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandInHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def run(count):
+    server, base_url = start_server()
+    host = base_url.split("//")[1]
+    client = HttpClient(host_configs={host: HostConfig(read_timeout=0.5, retries=2, backoff_base=0.01)})
+
+    # 1. 매 요청 새 연결(requests.get) vs keep-alive session
+    StandInHandler.connections.clear()
+    started_at = time.perf_counter()
+    for _ in range(count):
+        requests.get(f"{base_url}/fng/", timeout=5)
+    bare_elapsed = time.perf_counter() - started_at
+    bare_connections = len(StandInHandler.connections)
+
+    StandInHandler.connections.clear()
+    started_at = time.perf_counter()
+    for _ in range(count):
+        client.get(f"{base_url}/fng/")
+    pooled_elapsed = time.perf_counter() - started_at
+    pooled_connections = len(StandInHandler.connections)
+
+    print(f"## {count} GET requests")
+    print(f"  requests.get         {bare_elapsed * 1000:10.1f} ms  ({bare_connections} connections)")
+    print(f"  HttpClient (pooled)  {pooled_elapsed * 1000:10.1f} ms  ({pooled_connections} connections)")
+
+    # 2. 503 재시도 / read timeout
+    flaky = client.get(f"{base_url}/flaky")
+    print(f"  flaky endpoint       status {flaky.status_code} after retries")
+    started_at = time.perf_counter()
+    try:
+        client.get(f"{base_url}/slow")
+        print("  slow endpoint        unexpected success")
+    except requests.Timeout:
+        print(f"  slow endpoint        timed out after {time.perf_counter() - started_at:.2f}s (3 attempts)")
+
+    # 3. 실제 수집 함수를 로컬 서버로 호출
+    print(f"  fear and greed       {get_fear_and_greed_index(url=f'{base_url}/fng/')}")
+    print(f"  host stats           {client.get_stats()}")
+
+    client.close()
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    args = parser.parse_args()
+    run(count=args.requests)
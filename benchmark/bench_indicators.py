@@ -0,0 +1,98 @@
+"""
+ta 기반 add_indicators 와 IncrementalIndicators 의 정확도 / 속도 비교
+
+    $ python -m benchmark.bench_indicators --candles 100000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from numpy.lib.stride_tricks import sliding_window_view
+
+from analytics_resource.incremental_indicators import INDICATOR_COLUMNS, IncrementalIndicators
+from analytics_resource.indicators import add_indicators
+
+
+def make_candles(count, seed=42):
+    """
+    랜덤 워크 기반 가상 캔들을 생성한다.
+    """
+    rng = np.random.default_rng(seed)
+    close = 4_000_000 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    index = pd.date_range("2015-01-01", periods=count, freq="h")
+    return pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+                         'volume': 1.0, 'value': close}, index=index)
+
+
+def verify(actual, expected, close):
+    """
+    ta 결과와 비교한다.
+    pandas rolling std 는 긴 시계열에서 누적 오차가 생기므로 볼린저 밴드 폭은 정확한 슬라이딩 표준편차와 비교한다.
+    """
+    band_columns = ('bb_bbh', 'bb_bbl')
+    for column in INDICATOR_COLUMNS:
+        if column not in band_columns:
+            np.testing.assert_allclose(actual[column], expected[column], rtol=1e-9, equal_nan=True)
+
+    exact_std = np.full(len(close), np.nan)
+    exact_std[19:] = sliding_window_view(close, 20).std(axis=1)
+    np.testing.assert_allclose((actual['bb_bbh'] - actual['bb_bbm']) / 2, exact_std, rtol=1e-8, equal_nan=True)
+    np.testing.assert_allclose((actual['bb_bbm'] - actual['bb_bbl']) / 2, exact_std, rtol=1e-8, equal_nan=True)
+
+    ta_std = (expected['bb_bbh'] - expected['bb_bbm']) / 2
+    engine_std = (actual['bb_bbh'] - actual['bb_bbm']) / 2
+    print(f"  bb std rel err       ta {np.nanmax(np.abs(ta_std - exact_std) / exact_std):.3e} / "
+          f"incremental {np.nanmax(np.abs(engine_std - exact_std) / exact_std):.3e}")
+
+
+def run(candles, window, appends):
+    df = make_candles(candles)
+
+    # 1. 전체 구간 정확도 / 처리 시간
+    started_at = time.perf_counter()
+    expected = add_indicators(df=df.copy())
+    ta_elapsed = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    actual = IncrementalIndicators().update_dataframe(df.copy())
+    incremental_elapsed = time.perf_counter() - started_at
+
+    print(f"## Full history ({candles:,} candles)")
+    print(f"  ta (one-shot)        {ta_elapsed * 1000:10.1f} ms")
+    print(f"  incremental (stream) {incremental_elapsed * 1000:10.1f} ms")
+    verify(actual, expected, df['close'].values)
+
+    # ai_trade 에서 사용하는 길이의 구간은 ta 결과와 그대로 일치해야 한다.
+    recent = df.iloc[-window:]
+    np.testing.assert_allclose(IncrementalIndicators().update_dataframe(recent.copy())[INDICATOR_COLUMNS],
+                               add_indicators(df=recent.copy())[INDICATOR_COLUMNS], rtol=1e-9, equal_nan=True)
+
+    # 2. 캔들 하나 추가 시 비용 (ai_trade 처럼 window 구간을 매번 재계산 vs O(1) 갱신)
+    engine = IncrementalIndicators()
+    engine.update_dataframe(df.iloc[:candles - appends].copy())
+
+    started_at = time.perf_counter()
+    for end in range(candles - appends, candles):
+        add_indicators(df=df.iloc[end - window + 1:end + 1].copy())
+    ta_per_append = (time.perf_counter() - started_at) / appends
+
+    started_at = time.perf_counter()
+    for close in df['close'].iloc[candles - appends:]:
+        engine.update(close)
+    incremental_per_append = (time.perf_counter() - started_at) / appends
+
+    print(f"## Per append (window={window}, {appends} appends)")
+    print(f"  ta (recompute)       {ta_per_append * 1e6:10.1f} us")
+    print(f"  incremental (O(1))   {incremental_per_append * 1e6:10.1f} us")
+    print(f"  speedup              {ta_per_append / incremental_per_append:10.1f} x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--candles", type=int, default=100_000)
+    parser.add_argument("--window", type=int, default=720)
+    parser.add_argument("--appends", type=int, default=200)
+    args = parser.parse_args()
+    run(candles=args.candles, window=args.window, appends=args.appends)
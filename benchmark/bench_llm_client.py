@@ -0,0 +1,75 @@
+"""
+로컬 LLM 서버로 판단(decision) 단계의 처리량 / 꼬리 지연시간을 측정한다.
+
+    $ python -m benchmark.bench_llm_client --prompts 200 --concurrency 32 --latency 0.2
+"""
+import argparse
+import time
+
+from openai import OpenAI
+
+from llm_client import LLMClient
+from llm_server import LocalLLMServer
+from trading_decision import TRADING_DECISION_RESPONSE_FORMAT, TradingDecision
+
+
+def make_messages(index):
+    return [
+        {"role": "system", "content": "You are an expert in Cryptocurrency investing."},
+        {"role": "user", "content": f"market {index} : close,rsi\n4000000,{30 + index % 40}"},
+    ]
+
+
+def run(prompts, concurrency, latency, sequential):
+    server = LocalLLMServer(latency=latency, jitter=latency / 4, seed=42)
+    base_url = server.start()
+
+    # 1. 기존 방식 : 요청마다 새 OpenAI client, 순차 호출
+    started_at = time.perf_counter()
+    for index in range(sequential):
+        response = OpenAI(base_url=base_url, api_key="local").chat.completions.create(
+            model="gpt-4o", messages=make_messages(index), response_format=TRADING_DECISION_RESPONSE_FORMAT
+        )
+        TradingDecision.model_validate_json(response.choices[0].message.content)
+    sequential_elapsed = time.perf_counter() - started_at
+
+    # 2. 공유 connection pool + 동시 요청 제한
+    client = LLMClient(base_url=base_url, api_key="local", max_concurrency=concurrency).start()
+    started_at = time.perf_counter()
+    results = client.decide_batch([make_messages(index) for index in range(prompts)], deadline=latency * 20)
+    batch_elapsed = time.perf_counter() - started_at
+    failures = [result for result in results if isinstance(result, Exception)]
+    stats = client.get_stats()
+
+    # 3. 스트리밍 : decision 이 확인되는 시점 vs 전체 응답
+    partial_at = []
+    started_at = time.perf_counter()
+    client.decide(make_messages(0), on_partial=lambda partial: partial_at.append(time.perf_counter() - started_at))
+    stream_elapsed = time.perf_counter() - started_at
+
+    # 4. deadline 초과
+    try:
+        client.decide(make_messages(0), deadline=latency / 2)
+        deadline_result = "unexpected success"
+    except TimeoutError as ex:
+        deadline_result = str(ex)
+
+    print(f"## Decision stage (server latency {latency * 1000:.0f} ms)")
+    print(f"  sequential (new client)   {sequential / sequential_elapsed:8.1f} req/s  ({sequential} requests)")
+    print(f"  batch (concurrency {concurrency:>3})   {prompts / batch_elapsed:8.1f} req/s  ({prompts} requests, {len(failures)} failed)")
+    print(f"  latency p50/p95/p99 (+queue) {stats['p50'] * 1000:.0f} / {stats['p95'] * 1000:.0f} / {stats['p99'] * 1000:.0f} ms")
+    print(f"  stream first decision     {partial_at[0] * 1000 if partial_at else float('nan'):8.0f} ms (complete {stream_elapsed * 1000:.0f} ms)")
+    print(f"  deadline                  {deadline_result}")
+
+    client.close()
+    server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--prompts", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--sequential", type=int, default=10)
+    args = parser.parse_args()
+    run(prompts=args.prompts, concurrency=args.concurrency, latency=args.latency, sequential=args.sequential)
@@ -0,0 +1,46 @@
+"""
+모의 거래 엔진 부하 테스트 : 판단(canned TradingDecision) -> 주문 체결(호가 소진) -> 거래 기록 생성
+
+    $ python -m benchmark.bench_paper_trading --orders 20000
+"""
+import argparse
+import time
+
+from backtester import CannedDecisionPolicy
+from paper_trading import PaperExchange, SyntheticOrderbook
+from trading_decision import build_trade_record, execute_decision
+
+
+def run(orders):
+    orderbook = SyntheticOrderbook(seed=42)
+    exchange = PaperExchange(
+        balances=[{'currency': 'KRW', 'balance': 100_000_000, 'locked': 0, 'avg_buy_price': 0}],
+        orderbook_source=orderbook
+    )
+    policy = CannedDecisionPolicy([
+        {'decision': 'buy', 'percentage': 30, 'reason': 'load test'},
+        {'decision': 'hold', 'percentage': 0, 'reason': 'load test'},
+        {'decision': 'sell', 'percentage': 50, 'reason': 'load test'},
+    ])
+    records = []
+
+    started_at = time.perf_counter()
+    for _ in range(orders):
+        decision = policy.decide(None, None)
+        execute_decision(exchange, decision, "KRW-ETH", orderbook, verbose=False)
+        records.append(build_trade_record(decision, exchange, orderbook.price, reflection=""))
+    elapsed = time.perf_counter() - started_at
+
+    slippages = [order['slippage_bps'] for order in exchange.orders]
+    print(f"## Paper trading ({orders:,} decisions, {len(exchange.orders):,} orders)")
+    print(f"  elapsed              {elapsed * 1000:10.1f} ms")
+    print(f"  throughput           {len(exchange.orders) / elapsed:10.0f} orders/s")
+    print(f"  avg slippage         {sum(slippages) / max(len(slippages), 1):10.2f} bps")
+    print(f"  final record         {records[-1]}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=20000)
+    args = parser.parse_args()
+    run(orders=args.orders)
@@ -0,0 +1,96 @@
+"""
+프롬프트 토큰 수 비교 : 기존 JSON 직렬화(to_dict / to_json / json.dumps) payload 와 compact 인코딩
+(매매 주기에서는 compact 프롬프트의 토큰 수만 출력한다.)
+
+    $ python -m benchmark.bench_prompt_tokens --news 20
+"""
+import argparse
+import json
+
+from analytics_resource.indicators import add_indicators
+from auto_trade import DECISION_DATA_TOKEN_BUDGET, REFLECTION_MARKET_TOKEN_BUDGET
+from benchmark.fixtures import make_candles, make_orderbook
+from prompt_encoder import (
+    TableSection,
+    TextSection,
+    build_prompt,
+    encode_balances,
+    encode_orderbook,
+    report_savings,
+    to_json
+)
+
+
+def legacy_market_payload(fear_greed_index, news_headlines, order_book, df_daily, df_hourly):
+    """
+    기존 reflection 용 시장 데이터 (str(dict))
+    """
+    return str({
+        "fear_and_greed_index": fear_greed_index,
+        "news_headline": news_headlines,
+        "orderbook": order_book,
+        "daily_ohlcv": df_daily.to_dict(),
+        "hourly_ohlcv": df_hourly.to_dict()
+    })
+
+
+def legacy_decision_payload(reflection, balances, fear_greed_index, news_headlines, order_book, df_daily, df_hourly):
+    """
+    기존 AI 판단 요청 데이터 (json.dumps / DataFrame.to_json)
+    """
+    return f"""
+                        Recent trading reflection: {reflection}
+                        Current investment status: {json.dumps(balances)}
+                        Orderbook: {json.dumps(order_book)}
+                        Daily OHLCV with indicators (30 days): {df_daily.to_json()}
+                        Hourly OHLCV with indicators (24 Hours): {df_hourly.to_json()}
+                        Fear and Greed index: {json.dumps(fear_greed_index)}
+                        Recent news headlines : {json.dumps(news_headlines)}
+                    """
+
+
+def run(news):
+    df_daily = add_indicators(df=make_candles(30, seed=1).copy())
+    df_hourly = add_indicators(df=make_candles(24, seed=2).copy())
+    order_book = make_orderbook()("KRW-ETH")
+    fear_greed_index = {"value": "50", "value_classification": "Neutral", "timestamp": "1735689600"}
+    news_headlines = [{"title": f"Ethereum market update {i}", "date": "2025-01-01"} for i in range(news)]
+    balances = [{'currency': 'KRW', 'balance': '1000000.0', 'locked': '0', 'avg_buy_price': '0'},
+                {'currency': 'ETH', 'balance': '0.25', 'locked': '0', 'avg_buy_price': '4000000'}]
+    reflection = "최근 매수 판단은 RSI 과매도 구간에서 유효했으나 변동성이 큰 구간에서는 비중을 줄이는 것이 좋다."
+
+    market_sections = [
+        TextSection("Fear and Greed index", to_json(fear_greed_index)),
+        TextSection("Recent news headlines", to_json(news_headlines)),
+        TextSection("Orderbook", "\n" + encode_orderbook(order_book)),
+        TableSection("Daily OHLCV with indicators (30 days)", df_daily),
+        TableSection("Hourly OHLCV with indicators (24 Hours)", df_hourly),
+    ]
+    market_data, _ = build_prompt(sections=market_sections, token_budget=REFLECTION_MARKET_TOKEN_BUDGET)
+    decision_data, _ = build_prompt(
+        sections=[
+            TextSection("Recent trading reflection", reflection),
+            TextSection("Current investment status", "\n" + encode_balances(balances)),
+        ] + market_sections,
+        token_budget=DECISION_DATA_TOKEN_BUDGET
+    )
+
+    print("## Prompt tokens (compact vs legacy)")
+    report_savings(
+        name="reflection market data",
+        legacy_payload=legacy_market_payload(fear_greed_index, news_headlines, order_book, df_daily, df_hourly),
+        prompt=market_data
+    )
+    report_savings(
+        name="decision data",
+        legacy_payload=legacy_decision_payload(reflection, balances, fear_greed_index, news_headlines, order_book,
+                                               df_daily, df_hourly),
+        prompt=decision_data
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--news", type=int, default=20, help="뉴스 헤드라인 수")
+    args = parser.parse_args()
+    run(news=args.news)
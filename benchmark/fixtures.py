@@ -0,0 +1,129 @@
+"""
+네트워크 없이 벤치마크를 실행하기 위한 고정 데이터 / 대체 객체
+- 가상 캔들, 가상 호가, 거래 기록
+- pymongo 의 find / sort / limit / insert 만 흉내 내는 in-memory MongoDB client
+"""
+import random
+
+from datetime import datetime, timedelta
+
+from benchmark.bench_indicators import make_candles
+from paper_trading import SyntheticOrderbook
+
+__all__ = ['make_candles', 'make_orderbook', 'make_trade_history', 'InMemoryMongoClient']
+
+
+def make_orderbook(seed=42, depth=15):
+    """
+    pyupbit.get_orderbook 형식의 가상 호가 source (ticker -> 호가)
+    """
+    return SyntheticOrderbook(depth=depth, seed=seed)
+
+
+def make_trade_history(count, end=None, interval=timedelta(minutes=10), seed=42):
+    """
+    trading_result collection 형식의 거래 기록을 오래된 순서로 생성한다.
+    """
+    rng = random.Random(seed)
+    end = end or datetime.now()
+    price = 4_000_000.0
+    krw, eth = 1_000_000.0, 0.0
+    records = []
+    for i in range(count):
+        price *= 1 + rng.gauss(0, 0.005)
+        decision = rng.choice(('buy', 'sell', 'hold'))
+        percentage = 0 if decision == 'hold' else rng.randint(1, 100)
+        if decision == 'buy':
+            funds = krw * percentage / 100
+            krw, eth = krw - funds, eth + funds / price
+        elif decision == 'sell':
+            volume = eth * percentage / 100
+            krw, eth = krw + volume * price, eth - volume
+        records.append({
+            'timestamp': end - interval * (count - 1 - i),
+            'decision': decision,
+            'percentage': percentage,
+            'reason': "벤치마크용 거래 기록",
+            'eth_balance': eth,
+            'krw_balance': krw,
+            'eth_avg_buy_price': price,
+            'eth_krw_price': price,
+            'reflection': "",
+        })
+    return records
+
+
+def _matches(document, query):
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict):
+            for operator, operand in condition.items():
+                if value is None:
+                    return False
+                if operator == '$gte' and not value >= operand:
+                    return False
+                if operator == '$gt' and not value > operand:
+                    return False
+                if operator == '$lte' and not value <= operand:
+                    return False
+                if operator == '$lt' and not value < operand:
+                    return False
+        elif value != condition:
+            return False
+    return True
+
+
+class InMemoryCursor:
+    def __init__(self, documents):
+        self._documents = documents
+
+    def sort(self, key, direction=1):
+        self._documents.sort(key=lambda document: document.get(key), reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        if count:
+            self._documents = self._documents[:count]
+        return self
+
+    def __iter__(self):
+        return iter(self._documents)
+
+
+class InMemoryCollection:
+    def __init__(self):
+        self.documents = []
+
+    def insert_one(self, document):
+        self.documents.append(dict(document))
+
+    def insert_many(self, documents, ordered=True):
+        self.documents.extend(dict(document) for document in documents)
+
+    def find(self, query=None, projection=None):
+        documents = [document for document in self.documents if _matches(document, query or {})]
+        if projection:
+            excluded = {field for field, include in projection.items() if not include}
+            documents = [{key: value for key, value in document.items() if key not in excluded}
+                         for document in documents]
+        return InMemoryCursor(documents)
+
+    def count_documents(self, query):
+        return sum(1 for document in self.documents if _matches(document, query))
+
+
+class InMemoryDatabase(dict):
+    def __missing__(self, name):
+        collection = self[name] = InMemoryCollection()
+        return collection
+
+
+class InMemoryMongoClient:
+    """
+    mongodb_client.autotradedb[collection] 접근만 지원하는 MongoDB 대체 client
+    """
+    def __init__(self):
+        self.autotradedb = InMemoryDatabase()
+
+    def close(self):
+        pass
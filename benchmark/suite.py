@@ -0,0 +1,202 @@
+"""
+매매 주기 hot path 오프라인 벤치마크 (네트워크 / MongoDB 불필요)
+결과는 JSON 으로 저장하며, 기준(baseline) 결과와 비교하여 느려진 항목이 있으면 exit code 1 로 종료한다.
+기준 결과는 장비마다 다르므로 저장소에 포함하지 않는다. (benchmark/results/ 는 로컬 전용, 변경 전 코드로 먼저 저장한다.)
+
+    $ python -m benchmark.suite --save-baseline benchmark/results/baseline.json
+    $ python -m benchmark.suite --baseline benchmark/results/baseline.json --tolerance 1.3
+"""
+import argparse
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from datetime import datetime
+
+from analytics_resource.batch_indicators import add_indicators_vectorized
+from analytics_resource.incremental_indicators import IndicatorStream
+from analytics_resource.indicators import add_indicators
+from auto_trade import calculate_performance, get_recent_trades
+from benchmark.fixtures import InMemoryMongoClient, make_candles, make_orderbook, make_trade_history
+from paper_trading import PaperExchange
+from prompt_encoder import TableSection, TextSection, build_prompt, encode_orderbook, to_json
+from strategy_retriever import BM25Index, StrategyRetriever
+from trading_decision import TradingDecision, execute_decision
+
+DEFAULT_RESULT_PATH = "benchmark/results/latest.json"
+
+INDICATOR_WINDOWS = (30, 200, 1000, 5000)
+TRADE_HISTORY_SIZES = (1_000, 10_000, 50_000)
+
+
+def measure(fn, repeat=5, min_time=0.05):
+    """
+    timeit 과 같이 한 번의 측정이 min_time 이상이 되도록 반복 횟수를 정한 뒤 repeat 번 측정한다.
+    :return: 1회 호출 시간(초) 목록, 측정당 호출 횟수
+    """
+    number = 1
+    while True:
+        started_at = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - started_at
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 2 if elapsed <= 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    samples = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started_at) / number)
+    return samples, number
+
+
+def build_cases():
+    """
+    :return: [(이름, 측정할 함수)]
+    """
+    cases = []
+
+    # 1. add_indicators : ai_trade 의 30일 / 24시간 구간부터 긴 구간까지
+    candles = make_candles(max(INDICATOR_WINDOWS))
+    for window in INDICATOR_WINDOWS:
+        frame = candles.iloc[-window:]
+        cases.append((f"indicators.add_indicators[window={window}]", lambda frame=frame: add_indicators(df=frame.copy())))
+        cases.append((f"indicators.vectorized[window={window}]", lambda frame=frame: add_indicators_vectorized(df=frame)))
+
+    # ai_trade 의 차트용 시간봉 120개 : 다음 주기에는 새로 마감된 캔들만 지표 엔진에 반영한다.
+    stream = IndicatorStream()
+    stream.update_dataframe(candles.iloc[-121:-1])
+    chart = candles.iloc[-120:]
+    cases.append(("indicators.stream[window=120]", lambda: stream.update_dataframe(chart)))
+
+    # 2. 최근 거래 조회 / 성과 계산 (10분 주기 거래 기록)
+    for size in TRADE_HISTORY_SIZES:
+        mongodb_client = InMemoryMongoClient()
+        mongodb_client.autotradedb["trading_result"].insert_many(make_trade_history(size))
+        cases.append((f"trades.get_recent_trades[history={size}]",
+                      lambda client=mongodb_client: get_recent_trades(mongodb_client=client)))
+
+        everything = InMemoryMongoClient()
+        everything.autotradedb["trading_result"].insert_many(make_trade_history(size))
+        trades_df = get_recent_trades(mongodb_client=everything, days=size)
+        cases.append((f"trades.calculate_performance[trades={size}]",
+                      lambda df=trades_df: calculate_performance(df)))
+
+    # 3. 프롬프트 직렬화 : 기존 to_json / to_dict 와 compact 인코딩
+    df_daily = add_indicators(df=make_candles(30, seed=1).copy())
+    df_hourly = add_indicators(df=make_candles(24, seed=2).copy())
+    order_book = make_orderbook()("KRW-ETH")
+    cases.append(("prompt.to_json[daily+hourly]", lambda: (df_daily.to_json(), df_hourly.to_json())))
+    cases.append(("prompt.to_dict[daily+hourly]", lambda: str({"daily_ohlcv": df_daily.to_dict(),
+                                                              "hourly_ohlcv": df_hourly.to_dict()})))
+    cases.append(("prompt.build_prompt[daily+hourly]", lambda: build_prompt(sections=[
+        TextSection("Fear and Greed index", to_json({"value": "50", "value_classification": "Neutral"})),
+        TextSection("Orderbook", "\n" + encode_orderbook(order_book)),
+        TableSection("Daily OHLCV with indicators (30 days)", df_daily),
+        TableSection("Hourly OHLCV with indicators (24 Hours)", df_hourly),
+    ], token_budget=3000)))
+
+    # 매매 기법 문서 : 전체 포함 대신 지표 상태에 맞는 구절 검색
+    with open("strategy.txt", "r", encoding="utf-8") as f:
+        strategy = f.read()
+    retriever = StrategyRetriever(path=os.path.join(tempfile.mkdtemp(), "strategy_index.json"))
+    cases.append(("prompt.strategy_index_build", lambda: BM25Index.build({"strategy.txt": strategy})))
+    cases.append(("prompt.strategy_retrieve[daily+hourly]",
+                  lambda: retriever.retrieve(frames=[df_daily, df_hourly], token_budget=600)))
+
+    # 4. 판단 파싱 / 모의 체결
+    response = json.dumps({"decision": "buy", "percentage": 30, "reason": "RSI 과매도 구간에서 반등 신호가 나타남"},
+                          ensure_ascii=False)
+    cases.append(("decision.parse", lambda: TradingDecision.model_validate_json(response)))
+
+    orderbook = make_orderbook()
+    exchange = PaperExchange(
+        balances=[{'currency': 'KRW', 'balance': 100_000_000, 'locked': 0, 'avg_buy_price': 0}],
+        orderbook_source=orderbook
+    )
+    decisions = itertools.cycle([TradingDecision(decision='buy', percentage=30, reason=""),
+                                 TradingDecision(decision='sell', percentage=50, reason="")])
+    cases.append(("decision.execute[paper]",
+                  lambda: execute_decision(exchange, next(decisions), "KRW-ETH", orderbook, verbose=False)))
+    return cases
+
+
+def run(pattern=None, repeat=5, min_time=0.05):
+    results = {}
+    for name, fn in build_cases():
+        if pattern and pattern not in name:
+            continue
+        samples, number = measure(fn, repeat=repeat, min_time=min_time)
+        results[name] = {
+            'median': statistics.median(samples),
+            'min': min(samples),
+            'max': max(samples),
+            'number': number,
+            'repeat': repeat,
+        }
+        print(f"  {name:<48} {results[name]['median'] * 1e6:12.1f} us  (min {results[name]['min'] * 1e6:.1f})")
+    return {
+        'created_at': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+
+
+def save(report, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+
+def compare(report, baseline, tolerance):
+    """
+    median 이 기준 결과의 tolerance 배를 넘는 항목을 찾는다.
+    :return: 느려진 항목 이름 목록
+    """
+    regressions = []
+    print(f"## Compare with baseline ({baseline['created_at']}, tolerance {tolerance:.2f}x)")
+    for name, result in report['results'].items():
+        expected = baseline['results'].get(name)
+        if expected is None:
+            print(f"  {name:<48} {'new':>10}")
+            continue
+        ratio = result['median'] / expected['median']
+        flag = "REGRESSION" if ratio > tolerance else ""
+        print(f"  {name:<48} {ratio:9.2f}x {flag}")
+        if ratio > tolerance:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--filter", default=None, help="이름에 이 문자열이 포함된 항목만 실행")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.05, help="측정 1회의 최소 시간(초)")
+    parser.add_argument("--output", default=DEFAULT_RESULT_PATH, help="결과 저장 경로")
+    parser.add_argument("--save-baseline", default=None, help="결과를 기준 결과로 저장할 경로")
+    parser.add_argument("--baseline", default=None, help="비교할 기준 결과 경로")
+    parser.add_argument("--tolerance", type=float, default=1.3, help="허용하는 기준 대비 배율")
+    args = parser.parse_args()
+
+    print("## Hot path benchmarks (per call)")
+    report = run(pattern=args.filter, repeat=args.repeat, min_time=args.min_time)
+    save(report, args.output)
+    if args.save_baseline:
+        save(report, args.save_baseline)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            if compare(report, json.load(f), args.tolerance):
+                sys.exit(1)
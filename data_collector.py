@@ -0,0 +1,92 @@
+import logging
+import time
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+
+logger = logging.getLogger(__name__)
+
+# 소스별 기본 타임아웃(초)
+DEFAULT_SOURCE_TIMEOUT = 10
+
+
+class DataSource:
+    """
+    데이터 수집 단계에서 실행할 데이터 소스 정의
+    - fetch : 인자 없이 호출 가능한 수집 함수
+    - timeout : 소스별 최대 대기 시간(초)
+    - required : True 이면 실패 시 수집 단계 전체를 실패로 처리, False 이면 누락(None)으로 처리
+    """
+    def __init__(self, name, fetch, timeout=DEFAULT_SOURCE_TIMEOUT, required=True):
+        self.name = name
+        self.fetch = fetch
+        self.timeout = timeout
+        self.required = required
+
+
+class DataCollectionError(Exception):
+    pass
+
+
+def _timed_fetch(fetch):
+    started_at = time.perf_counter()
+    try:
+        return fetch(), None, time.perf_counter() - started_at
+    except Exception as ex:
+        return None, ex, time.perf_counter() - started_at
+
+
+def collect_data(sources, max_workers=8):
+    """
+    데이터 소스들을 bounded thread pool 에서 동시에 조회한다.
+    순차 실행 시 모든 소스의 지연시간 합만큼 걸리던 수집 단계를 가장 느린 소스의 지연시간 수준으로 줄인다.
+    :param sources: DataSource list
+    :param max_workers: thread pool 크기
+    :return: (results, timings) - results 는 {name: data}, 누락된 선택 소스는 None
+             timings 는 {name: seconds, 'total': seconds}
+    """
+    results = {}
+    timings = {}
+    errors = {}
+
+    stage_started_at = time.perf_counter()
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="data-collector")
+    try:
+        futures = {source.name: executor.submit(_timed_fetch, source.fetch) for source in sources}
+
+        for source in sources:
+            # 모든 소스가 동시에 시작되므로 타임아웃은 단계 시작 시점 기준으로 계산한다.
+            remaining = source.timeout - (time.perf_counter() - stage_started_at)
+            try:
+                results[source.name], error, timings[source.name] = futures[source.name].result(timeout=max(remaining, 0))
+                if error is not None:
+                    errors[source.name] = str(error)
+            except FutureTimeoutError:
+                timings[source.name] = time.perf_counter() - stage_started_at
+                errors[source.name] = f"timeout after {source.timeout}s"
+                results[source.name] = None
+    finally:
+        # 타임아웃된 소스를 기다리지 않는다.
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    timings['total'] = time.perf_counter() - stage_started_at
+
+    for source in sources:
+        if source.name in errors:
+            if source.required:
+                raise DataCollectionError(f"Required source '{source.name}' failed : {errors[source.name]}")
+            logger.warning(f"[Warning] Optional source '{source.name}' is missing : {errors[source.name]}")
+
+    return results, timings
+
+
+def print_timings(timings):
+    """
+    소스별 / 전체 수집 시간을 출력한다.
+    :param timings:
+    :return:
+    """
+    serial_time = sum(seconds for name, seconds in timings.items() if name != 'total')
+    for name, seconds in timings.items():
+        if name != 'total':
+            print(f"  - {name:<20} {seconds * 1000:8.1f} ms")
+    print(f"  = total(concurrent) {timings['total'] * 1000:8.1f} ms / sum(serial) {serial_time * 1000:8.1f} ms")
@@ -0,0 +1,179 @@
+import logging
+import math
+import threading
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from strategy_retriever import RSI_OVERBOUGHT, RSI_OVERSOLD
+from tracing import tracer
+from trading_decision import TradingDecision
+
+logger = logging.getLogger(__name__)
+
+# 판단을 건너뛰었을 때 절약한 것으로 보는 LLM 단계 (tracer span 이름)
+LLM_STAGES = ("reflection", "decision")
+
+
+@dataclass(frozen=True)
+class GateThresholds:
+    # 직전 AI 판단 대비 변화가 하나라도 임계값 이상이면 LLM 을 호출한다.
+    price_change: float = 0.005  # 호가 중간 가격 변화율
+    rsi_change: float = 5.0  # RSI 변화량 (과매수 / 과매도 구간 진입, 이탈은 항상 호출)
+    position_change: float = 0.02  # 평가 금액 중 코인 비중 변화량
+    max_age: timedelta = timedelta(hours=1)  # 이 시간이 지나면 변화가 없어도 호출
+
+
+DEFAULT_THRESHOLDS = GateThresholds()
+
+
+@dataclass
+class GateResult:
+    skip: bool
+    reasons: list
+    snapshot: dict
+    decided_at: datetime
+    decision: TradingDecision = None
+    reflection: str = None
+    saved_seconds: float = 0.0
+
+    def to_record(self):
+        """
+        거래 기록의 gate 필드 (다음 주기는 마지막 AI 판단의 snapshot 과 비교한다.)
+        """
+        return {'skipped': self.skip, 'reasons': self.reasons, 'snapshot': self.snapshot, 'decided_at': self.decided_at}
+
+
+def _zone(value, low, high):
+    if value >= high:
+        return 1
+    if value <= low:
+        return -1
+    return 0
+
+
+def position_ratio(exchange, currency, price):
+    """
+    평가 금액(KRW + 코인) 중 코인 비중
+    """
+    coin_value = exchange.get_balance(currency) * price
+    equity = exchange.get_balance("KRW") + coin_value
+    return coin_value / equity if equity > 0 else 0.0
+
+
+def take_snapshot(df, order_book, exchange, currency):
+    """
+    보조 지표가 포함된 OHLCV DataFrame 의 마지막 캔들, 현재 호가, 보유 비중
+    """
+    last = df.iloc[-1]
+    best = order_book['orderbook_units'][0]
+    price = (best['ask_price'] + best['bid_price']) / 2
+    return {
+        'price': price,
+        'rsi': float(last['rsi']),
+        'macd_diff': float(last['macd_diff']),
+        'bb_zone': _zone(last['close'], last['bb_bbl'], last['bb_bbh']),
+        'position': position_ratio(exchange, currency, price),
+    }
+
+
+def get_last_decision(mongodb_client, collection="trading_result"):
+    """
+    :return: 가장 최근 거래 기록 (없으면 None)
+    """
+    cursor = mongodb_client.autotradedb[collection].find({}, {'_id': 0}).sort('timestamp', -1).limit(1)
+    return next(iter(cursor), None)
+
+
+class DecisionGate:
+    """
+    현재 지표 / 호가 / 보유 비중을 마지막 AI 판단 시점의 snapshot 과 비교하여,
+    임계값을 넘는 변화가 없으면 LLM 호출(reflection, decision) 없이 HOLD 한다.
+    직전 판단이 BUY / SELL 이어도 같은 주문을 반복하지 않도록 HOLD 로 대체하고, reflection 은 재사용한다.
+    """
+    def __init__(self, thresholds=DEFAULT_THRESHOLDS, enabled=True):
+        self.thresholds = thresholds
+        self.enabled = enabled
+        self.checks = 0
+        self.skips = 0
+        self.saved_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def changes(self, previous, current):
+        """
+        :return: 임계값을 넘은 변화 목록 (비어 있으면 변화 없음)
+        """
+        thresholds = self.thresholds
+        reasons = []
+        if any(value is None or (isinstance(value, float) and math.isnan(value))
+               for snapshot in (previous, current) for value in snapshot.values()):
+            return ["missing indicator"]
+        if abs(current['price'] / previous['price'] - 1) >= thresholds.price_change:
+            reasons.append("price")
+        if (abs(current['rsi'] - previous['rsi']) >= thresholds.rsi_change
+                or _zone(current['rsi'], RSI_OVERSOLD, RSI_OVERBOUGHT) != _zone(previous['rsi'], RSI_OVERSOLD, RSI_OVERBOUGHT)):
+            reasons.append("rsi")
+        if (current['macd_diff'] >= 0) != (previous['macd_diff'] >= 0):
+            reasons.append("macd cross")
+        if current['bb_zone'] != previous['bb_zone']:
+            reasons.append("bollinger band")
+        if abs(current['position'] - previous['position']) >= thresholds.position_change:
+            reasons.append("position")
+        return reasons
+
+    @staticmethod
+    def _expected_llm_seconds():
+        """
+        LLM 을 호출한 주기의 reflection / decision 평균 지연시간 (아직 기록이 없으면 0)
+        """
+        histograms = [tracer.histograms.get(stage) for stage in LLM_STAGES]
+        return sum(histogram.sum / histogram.count for histogram in histograms if histogram and histogram.count)
+
+    def check(self, last_record, snapshot, now=None):
+        """
+        :param last_record: get_last_decision 결과
+        :param snapshot: take_snapshot 결과
+        :return: GateResult (skip 이면 decision / reflection 을 그대로 사용한다.)
+        """
+        now = now or datetime.now()
+        gate = (last_record or {}).get('gate')
+        if not self.enabled:
+            reasons = ["disabled"]
+        elif not gate or not gate.get('snapshot'):
+            reasons = ["no previous snapshot"]
+        elif now - gate['decided_at'] >= self.thresholds.max_age:
+            reasons = ["max age"]
+        else:
+            reasons = self.changes(gate['snapshot'], snapshot)
+
+        with self._lock:
+            self.checks += 1
+            if reasons:
+                return GateResult(skip=False, reasons=reasons, snapshot=snapshot, decided_at=now)
+            saved = self._expected_llm_seconds()
+            self.skips += 1
+            self.saved_seconds += saved
+
+        return GateResult(
+            skip=True,
+            reasons=[],
+            # 비교 기준은 마지막 AI 판단 시점으로 유지한다. (작은 변화가 누적되어도 감지)
+            snapshot=gate['snapshot'],
+            decided_at=gate['decided_at'],
+            decision=TradingDecision(
+                decision='hold',
+                percentage=0,
+                reason="직전 AI 판단 이후 지표 / 호가 / 보유 비중 변화가 임계값 미만이므로 AI 판단 없이 HOLD 합니다."
+            ),
+            reflection=last_record.get('reflection'),
+            saved_seconds=saved
+        )
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'checks': self.checks,
+                'skips': self.skips,
+                'skip_rate': self.skips / self.checks if self.checks else 0.0,
+                'saved_seconds': self.saved_seconds,
+            }
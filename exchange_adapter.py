@@ -0,0 +1,275 @@
+import itertools
+import logging
+import threading
+import time
+
+from rate_limiter import get_upbit_limiter
+
+logger = logging.getLogger(__name__)
+
+# 로컬 잔고를 거래소와 다시 맞추는 최대 주기(초)
+DEFAULT_RECONCILE_INTERVAL = 300
+# 주문 체결 확인 최대 대기 시간(초)
+DEFAULT_FILL_TIMEOUT = 3
+# Upbit KRW 마켓 거래 수수료 (매수는 주문 금액에 더해서, 매도는 체결 금액에서 뺀다.)
+DEFAULT_FEE_RATE = 0.0005
+
+
+class Portfolio:
+    """
+    통화별 잔고 (pyupbit get_balances 형식: currency, balance, locked, avg_buy_price)
+    """
+    def __init__(self, balances=None):
+        self.balances = {}
+        if balances:
+            self.load(balances)
+
+    def load(self, balances):
+        self.balances = {
+            balance['currency']: {
+                'currency': balance['currency'],
+                'balance': float(balance.get('balance', 0)),
+                'locked': float(balance.get('locked', 0)),
+                'avg_buy_price': float(balance.get('avg_buy_price', 0)),
+                'unit_currency': balance.get('unit_currency', 'KRW'),
+            }
+            for balance in balances
+        }
+
+    def balance(self, currency):
+        return self.balances.get(currency, {}).get('balance', 0.0)
+
+    def avg_buy_price(self, currency):
+        return self.balances.get(currency, {}).get('avg_buy_price', 0.0)
+
+    def _entry(self, currency):
+        return self.balances.setdefault(currency, {
+            'currency': currency, 'balance': 0.0, 'locked': 0.0, 'avg_buy_price': 0.0, 'unit_currency': 'KRW'
+        })
+
+    def apply_fill(self, side, ticker, volume, funds, fee):
+        """
+        체결 결과를 잔고에 반영한다.
+        :param side: bid(매수) / ask(매도)
+        :param ticker: KRW-ETH
+        :param volume: 체결 수량
+        :param funds: 체결 금액(원)
+        :param fee: 수수료(원)
+        """
+        quote, base = ticker.split('-')
+        quote_entry = self._entry(quote)
+        base_entry = self._entry(base)
+        if side == 'bid':
+            held = base_entry['balance']
+            if held + volume > 0:
+                base_entry['avg_buy_price'] = (held * base_entry['avg_buy_price'] + funds) / (held + volume)
+            base_entry['balance'] = held + volume
+            quote_entry['balance'] -= funds + fee
+        else:
+            base_entry['balance'] = max(base_entry['balance'] - volume, 0.0)
+            quote_entry['balance'] += funds - fee
+
+    def to_list(self):
+        return [
+            {key: (str(value) if isinstance(value, float) else value) for key, value in balance.items()}
+            for balance in self.balances.values()
+        ]
+
+
+class Exchange:
+    """
+    로컬 Portfolio 를 유지하는 거래소 adapter 공통 로직
+    - 잔고 조회는 로컬 상태를 사용하고, 상태가 오래되었거나(reconcile_interval) 체결 확인에 실패한 경우에만 거래소와 다시 맞춘다.
+    - 주문 후 고정 대기 없이 주문 응답 / 체결 내역으로 로컬 잔고를 갱신한다.
+    """
+    def __init__(self, reconcile_interval=DEFAULT_RECONCILE_INTERVAL):
+        self.reconcile_interval = reconcile_interval
+        self.portfolio = Portfolio()
+        self._reconciled_at = None
+        self._dirty = True
+        self._lock = threading.RLock()
+
+    def _fetch_balances(self):
+        raise NotImplementedError
+
+    def _place_order(self, side, ticker, amount):
+        raise NotImplementedError
+
+    def _wait_for_fills(self, order):
+        raise NotImplementedError
+
+    def reconcile(self):
+        """
+        거래소 잔고로 로컬 상태를 다시 맞춘다.
+        """
+        with self._lock:
+            self.portfolio.load(self._fetch_balances())
+            self._reconciled_at = time.monotonic()
+            self._dirty = False
+
+    def _ensure_fresh(self):
+        if self._dirty or self._reconciled_at is None or time.monotonic() - self._reconciled_at > self.reconcile_interval:
+            self.reconcile()
+
+    def get_balances(self):
+        with self._lock:
+            self._ensure_fresh()
+            return self.portfolio.to_list()
+
+    def get_balance(self, currency):
+        with self._lock:
+            self._ensure_fresh()
+            return self.portfolio.balance(currency)
+
+    def get_avg_buy_price(self, currency):
+        with self._lock:
+            self._ensure_fresh()
+            return self.portfolio.avg_buy_price(currency)
+
+    def _execute(self, side, ticker, amount):
+        with self._lock:
+            order = self._place_order(side, ticker, amount)
+            if not order or 'uuid' not in order:
+                # 주문 실패 응답 : 잔고 변화가 없을 수 있으나 다음 조회 시 거래소와 맞춘다.
+                self._dirty = True
+                return order
+
+            fills = self._wait_for_fills(order)
+            if fills is None:
+                logger.warning(f"[Warning] Order fills are not confirmed, reconcile on next read : {order['uuid']}")
+                self._dirty = True
+            else:
+                volume, funds, fee = fills
+                self.portfolio.apply_fill(side, ticker, volume, funds, fee)
+            return order
+
+    def buy_market_order(self, ticker, price):
+        """
+        :param price: 매수에 사용할 원화 금액
+        """
+        return self._execute('bid', ticker, price)
+
+    def sell_market_order(self, ticker, volume):
+        """
+        :param volume: 매도할 수량
+        """
+        return self._execute('ask', ticker, volume)
+
+
+class UpbitExchange(Exchange):
+    """
+    pyupbit.Upbit client 기반 adapter (Upbit 요청 수 제한 준수)
+    """
+    def __init__(self, upbit_client, reconcile_interval=DEFAULT_RECONCILE_INTERVAL, fill_timeout=DEFAULT_FILL_TIMEOUT):
+        super().__init__(reconcile_interval=reconcile_interval)
+        self.upbit_client = upbit_client
+        self.fill_timeout = fill_timeout
+        self._exchange_limiter = get_upbit_limiter('exchange')
+        self._order_limiter = get_upbit_limiter('order')
+
+    def _fetch_balances(self):
+        self._exchange_limiter.acquire()
+        balances = self.upbit_client.get_balances()
+        if not isinstance(balances, list):
+            raise RuntimeError(f"Failed to fetch balances : {balances}")
+        return balances
+
+    def _place_order(self, side, ticker, amount):
+        self._order_limiter.acquire()
+        if side == 'bid':
+            return self.upbit_client.buy_market_order(ticker, amount)
+        return self.upbit_client.sell_market_order(ticker, amount)
+
+    def _wait_for_fills(self, order):
+        """
+        주문이 종료(done / cancel)될 때까지 짧은 간격(점점 늘림)으로 주문 상태를 조회한다.
+        :return: (체결 수량, 체결 금액, 수수료) 또는 확인 실패 시 None
+        """
+        deadline = time.monotonic() + self.fill_timeout
+        delay = 0.05
+        while time.monotonic() < deadline:
+            self._exchange_limiter.acquire()
+            detail = self.upbit_client.get_order(order['uuid'])
+            if isinstance(detail, dict) and detail.get('state') in ('done', 'cancel'):
+                trades = detail.get('trades', [])
+                volume = sum(float(trade['volume']) for trade in trades)
+                funds = sum(float(trade['funds']) for trade in trades)
+                return volume, funds, float(detail.get('paid_fee', 0))
+            time.sleep(min(delay, max(deadline - time.monotonic(), 0)))
+            delay = min(delay * 2, 0.5)
+        return None
+
+
+class SimulatedExchange(Exchange):
+    """
+    네트워크 없이 즉시 체결되는 결정적(deterministic) 거래소 (오프라인 테스트용)
+    체결 모델(_fill)은 하위 클래스에서 바꿀 수 있다. (예: paper_trading.PaperExchange 의 호가 소진 체결)
+    수수료는 Upbit 와 같이 매수 시 주문 금액에 더해서 받는다. (원화 잔고가 주문 금액 + 수수료보다 적으면 잔고만큼만 주문)
+    """
+    order_prefix = "sim"
+
+    def __init__(self, balances, price_source, fee_rate=DEFAULT_FEE_RATE, reconcile_interval=float('inf')):
+        super().__init__(reconcile_interval=reconcile_interval)
+        self.price_source = price_source
+        self.fee_rate = fee_rate
+        self.orders = []
+        self._initial_balances = balances
+        self._order_ids = itertools.count(1)
+        self.portfolio.load(balances)
+        self._reconciled_at = time.monotonic()
+        self._dirty = False
+
+    def _fetch_balances(self):
+        # 시뮬레이션에서는 로컬 상태가 곧 거래소 상태이다.
+        return self.portfolio.to_list() if self.portfolio.balances else self._initial_balances
+
+    def _fill(self, side, ticker, amount):
+        """
+        price_source 의 가격으로 전량 체결한다.
+        :param amount: 매수 시 체결 금액(수수료 제외), 매도 시 수량 (잔고 이내)
+        :return: {'trades': [{'price', 'volume', 'funds'}], 'volume', 'funds', 'fee', 'remaining', ...}
+                 (그 밖의 항목은 주문 응답에 그대로 추가된다.)
+        """
+        price = float(self.price_source(ticker))
+        if side == 'bid':
+            funds = amount
+            volume = funds / price
+        else:
+            volume = amount
+            funds = volume * price
+        return {
+            'trades': [{'price': price, 'volume': volume, 'funds': funds}],
+            'volume': volume,
+            'funds': funds,
+            'fee': funds * self.fee_rate,
+            'remaining': 0.0,
+        }
+
+    def _place_order(self, side, ticker, amount):
+        quote, base = ticker.split('-')
+        if side == 'bid':
+            amount = min(amount, self.portfolio.balance(quote) / (1 + self.fee_rate))
+        else:
+            amount = min(amount, self.portfolio.balance(base))
+        if amount <= 0:
+            return {'error': {'name': 'insufficient_funds', 'message': 'Insufficient balance'}}
+        fill = self._fill(side, ticker, amount)
+        order = {
+            'uuid': f"{self.order_prefix}-{next(self._order_ids)}",
+            'side': side,
+            'ord_type': 'price' if side == 'bid' else 'market',
+            'market': ticker,
+            # 일부만 체결되면 Upbit 시장가 주문처럼 남은 수량은 취소된다.
+            'state': 'done' if fill['remaining'] <= 0 else 'cancel',
+            'executed_volume': fill['volume'],
+            'paid_fee': fill['fee'],
+            'trades': [{'market': ticker, 'side': side, **trade} for trade in fill['trades']],
+        }
+        order.update({key: value for key, value in fill.items()
+                      if key not in ('trades', 'volume', 'funds', 'fee', 'remaining')})
+        self.orders.append(order)
+        return order
+
+    def _wait_for_fills(self, order):
+        funds = sum(trade['funds'] for trade in order['trades'])
+        return order['executed_volume'], funds, order['paid_fee']
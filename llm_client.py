@@ -0,0 +1,214 @@
+import asyncio
+import logging
+import re
+import threading
+import time
+
+from openai import AsyncOpenAI
+
+from tracing import Histogram
+from trading_decision import TRADING_DECISION_RESPONSE_FORMAT, TradingDecision
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "gpt-4o"
+DEFAULT_MAX_CONCURRENCY = 8
+# 요청 1건의 HTTP timeout(초) / 재시도 횟수 (openai client 의 backoff 사용)
+DEFAULT_REQUEST_TIMEOUT = 60
+DEFAULT_MAX_RETRIES = 2
+
+_DECISION_PATTERN = re.compile(r'"decision"\s*:\s*"(buy|sell|hold)"')
+_PERCENTAGE_PATTERN = re.compile(r'"percentage"\s*:\s*(\d+)\s*[,}]')
+
+
+def parse_partial_decision(text):
+    """
+    생성 중인 TradingDecision JSON 에서 완성된 decision / percentage 값을 먼저 읽는다.
+    :return: {'decision': ..., 'percentage': ...} 중 확인된 항목
+    """
+    partial = {}
+    decision = _DECISION_PATTERN.search(text)
+    if decision:
+        partial['decision'] = decision.group(1)
+    percentage = _PERCENTAGE_PATTERN.search(text)
+    if percentage:
+        partial['percentage'] = int(percentage.group(1))
+    return partial
+
+
+class LLMClient:
+    """
+    하나의 AsyncOpenAI client(HTTP connection pool)를 백그라운드 thread 의 asyncio loop 에서 공유한다.
+    - 동시 요청 수 제한(max_concurrency), 요청별 deadline
+    - 여러 마켓 / 프롬프트의 판단을 한 번에 요청 (decide_batch)
+    - TradingDecision 스트리밍 (decision / percentage 가 확인되는 즉시 on_partial 호출)
+    동기 코드(ai_trade, MarketOrchestrator 의 worker thread)에서 그대로 호출할 수 있다.
+    """
+    def __init__(self, model=DEFAULT_MODEL, base_url=None, api_key=None, max_concurrency=DEFAULT_MAX_CONCURRENCY,
+                 request_timeout=DEFAULT_REQUEST_TIMEOUT, max_retries=DEFAULT_MAX_RETRIES):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self._client_options = {'base_url': base_url, 'api_key': api_key,
+                                'timeout': request_timeout, 'max_retries': max_retries}
+        self._client = None
+        self._semaphore = None
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self.latency = Histogram()
+        self.requests = 0
+        self.errors = 0
+        self.timeouts = 0
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return self
+            self._loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(self._loop)
+                # client / semaphore 는 사용할 loop 안에서 만든다.
+                self._client = AsyncOpenAI(**{key: value for key, value in self._client_options.items()
+                                              if value is not None})
+                self._semaphore = asyncio.Semaphore(self.max_concurrency)
+                ready.set()
+                self._loop.run_forever()
+
+            self._thread = threading.Thread(target=run_loop, name="llm-client", daemon=True)
+            self._thread.start()
+            ready.wait()
+            return self
+
+    def close(self, timeout=5):
+        with self._lock:
+            if self._thread is None:
+                return
+            asyncio.run_coroutine_threadsafe(self._client.close(), self._loop).result(timeout)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout)
+            self._loop.close()
+            self._thread = None
+
+    def _run(self, coroutine, deadline):
+        """
+        백그라운드 loop 에서 실행하고 결과를 기다린다. deadline(초)을 넘기면 요청을 취소하고 TimeoutError.
+        """
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(self._with_deadline(coroutine, deadline), self._loop)
+        return future.result()
+
+    async def _with_deadline(self, coroutine, deadline):
+        """
+        동시 요청 수 제한 대기 시간을 포함하여 deadline 을 적용한다.
+        """
+        async def limited():
+            async with self._semaphore:
+                return await coroutine
+
+        started_at = time.perf_counter()
+        try:
+            return await asyncio.wait_for(limited(), deadline) if deadline else await limited()
+        except asyncio.TimeoutError:
+            coroutine.close()  # 대기 중 취소되어 시작하지 못한 요청
+            self.timeouts += 1
+            self.errors += 1
+            raise TimeoutError(f"LLM request exceeded deadline ({deadline}s)")
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.requests += 1
+            self.latency.observe(time.perf_counter() - started_at)
+
+    async def _complete(self, messages, **options):
+        response = await self._client.chat.completions.create(model=self.model, messages=messages, **options)
+        return response.choices[0].message.content
+
+    async def _stream_decision(self, messages, on_partial=None, max_tokens=4095):
+        stream = await self._client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            response_format=TRADING_DECISION_RESPONSE_FORMAT,
+            max_tokens=max_tokens,
+            stream=True
+        )
+        content = []
+        reported = {}
+        async for chunk in stream:
+            if not chunk.choices or not chunk.choices[0].delta.content:
+                continue
+            content.append(chunk.choices[0].delta.content)
+            if on_partial:
+                partial = parse_partial_decision("".join(content))
+                if partial != reported:
+                    reported = partial
+                    on_partial(dict(partial))
+        return TradingDecision.model_validate_json("".join(content))
+
+    async def _decide(self, messages, max_tokens=4095):
+        content = await self._complete(messages, response_format=TRADING_DECISION_RESPONSE_FORMAT, max_tokens=max_tokens)
+        return TradingDecision.model_validate_json(content)
+
+    def complete(self, messages, deadline=None, **options):
+        """
+        :return: 응답 본문
+        """
+        return self._run(self._complete(messages, **options), deadline)
+
+    def decide(self, messages, deadline=None, on_partial=None):
+        """
+        structured output 으로 TradingDecision 을 받는다.
+        :param on_partial: 지정하면 스트리밍으로 받으며, decision / percentage 가 확인될 때마다 호출된다.
+        """
+        if on_partial:
+            return self._run(self._stream_decision(messages, on_partial=on_partial), deadline)
+        return self._run(self._decide(messages), deadline)
+
+    def decide_batch(self, messages_list, deadline=None):
+        """
+        여러 프롬프트의 판단을 동시에 요청한다. (동시 요청 수는 max_concurrency 로 제한)
+        :param deadline: 요청별 deadline(초)
+        :return: 입력 순서대로 TradingDecision 또는 예외
+        """
+        self.start()
+
+        async def gather():
+            return await asyncio.gather(*(self._with_deadline(self._decide(messages), deadline)
+                                          for messages in messages_list), return_exceptions=True)
+
+        return asyncio.run_coroutine_threadsafe(gather(), self._loop).result()
+
+    def get_stats(self):
+        return {
+            'requests': self.requests,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'p50': self.latency.percentile(0.50),
+            'p95': self.latency.percentile(0.95),
+            'p99': self.latency.percentile(0.99),
+        }
+
+
+_llm_client = None
+_llm_client_lock = threading.Lock()
+
+
+def get_llm_client():
+    """
+    프로세스 전역 LLMClient (OPENAI_API_KEY / OPENAI_BASE_URL 환경 변수 사용)
+    """
+    global _llm_client
+    with _llm_client_lock:
+        if _llm_client is None:
+            _llm_client = LLMClient().start()
+        return _llm_client
+
+
+def close_llm_client():
+    global _llm_client
+    with _llm_client_lock:
+        if _llm_client is not None:
+            _llm_client.close()
+            _llm_client = None
@@ -0,0 +1,161 @@
+"""
+부하 테스트용 로컬 LLM 서버 (OpenAI Chat Completions 호환, 실제 모델 호출 없음)
+
+    $ python llm_server.py --port 8080 --latency 0.5
+    -> OPENAI_BASE_URL=http://127.0.0.1:8080/v1 OPENAI_API_KEY=local python auto_trade.py
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+import uuid
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DECISIONS = ("buy", "sell", "hold")
+
+
+class LocalLLMServer:
+    """
+    /v1/chat/completions 요청에 지연시간(latency + 지수분포 jitter) 후 응답한다.
+    - response_format 이 있으면 프롬프트 hash 로 정한 TradingDecision JSON, 없으면 고정 문장
+    - stream=true 이면 SSE(chunked) 로 chunk_size 글자씩 나누어 전송
+    """
+    def __init__(self, host="127.0.0.1", port=0, latency=0.5, jitter=0.1, chunk_size=8, chunk_interval=0.01, seed=None):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.jitter = jitter
+        self.chunk_size = chunk_size
+        self.chunk_interval = chunk_interval
+        self.requests_served = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def _delay(self):
+        with self._lock:
+            self.requests_served += 1
+            return self.latency + (self._random.expovariate(1 / self.jitter) if self.jitter else 0)
+
+    @staticmethod
+    def _content(request):
+        if not request.get("response_format"):
+            return "최근 거래는 추세를 잘 따랐으나 변동성이 큰 구간에서 비중 조절이 필요합니다."
+        digest = int(hashlib.sha256(json.dumps(request.get("messages"), sort_keys=True).encode("utf-8")).hexdigest(), 16)
+        decision = DECISIONS[digest % 3]
+        return json.dumps({
+            "decision": decision,
+            "percentage": 0 if decision == "hold" else digest % 100 + 1,
+            "reason": "로컬 테스트 서버의 판단입니다.",
+        }, ensure_ascii=False)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    return self._send_json(404, {"error": {"message": "not found"}})
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                time.sleep(server._delay())
+                content = server._content(request)
+                try:
+                    if request.get("stream"):
+                        return self._stream(request, content)
+                    self._send_completion(request, content)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # client 가 deadline 초과로 먼저 연결을 끊은 경우
+
+            def _send_completion(self, request, content):
+                self._send_json(200, {
+                    "id": f"chatcmpl-{uuid.uuid4().hex}",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": request.get("model", "local"),
+                    "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                                 "finish_reason": "stop"}],
+                    "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+                })
+
+            def _send_json(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _write_chunk(self, data):
+                self.wfile.write(f"{len(data):x}\r\n".encode("ascii") + data + b"\r\n")
+
+            def _stream(self, request, content):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+                pieces = [content[i:i + server.chunk_size] for i in range(0, len(content), server.chunk_size)]
+                for index, piece in enumerate(pieces + [None]):
+                    chunk = {
+                        "id": completion_id,
+                        "object": "chat.completion.chunk",
+                        "created": int(time.time()),
+                        "model": request.get("model", "local"),
+                        "choices": [{"index": 0, "delta": {"content": piece} if piece else {},
+                                     "finish_reason": None if piece else "stop"}],
+                    }
+                    self._write_chunk(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    if piece and server.chunk_interval:
+                        time.sleep(server.chunk_interval)
+                self._write_chunk(b"data: [DONE]\n\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/v1"
+
+    def start(self):
+        """
+        백그라운드 thread 에서 서버를 시작하고 base url 을 반환한다.
+        """
+        self._server = ThreadingHTTPServer((self.host, self.port), self._handler_class())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="local-llm-server", daemon=True)
+        self._thread.start()
+        return self.url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join(5)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--jitter", type=float, default=0.1)
+    args = parser.parse_args()
+
+    server = LocalLLMServer(host=args.host, port=args.port, latency=args.latency, jitter=args.jitter)
+    print(f"Local LLM server : {server.start()}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
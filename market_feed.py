@@ -0,0 +1,179 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+import uuid
+
+import websockets
+
+logger = logging.getLogger(__name__)
+
+UPBIT_WEBSOCKET_URL = "wss://api.upbit.com/websocket/v1"
+
+# 종목별 최근 체결 / 호가 스냅샷 보관 개수
+DEFAULT_TRADE_CAPACITY = 1024
+DEFAULT_ORDERBOOK_CAPACITY = 64
+
+# 이 시간(초)보다 오래된 데이터는 사용하지 않는다. (REST 조회로 대체)
+DEFAULT_MAX_AGE = 5
+
+
+class RingBuffer:
+    """
+    고정 크기 ring buffer. 가득 차면 가장 오래된 항목을 덮어쓴다.
+    """
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._items = [None] * capacity
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def append(self, item):
+        with self._lock:
+            self._items[self._next] = item
+            self._next = (self._next + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def latest(self):
+        with self._lock:
+            if self._size == 0:
+                return None
+            return self._items[self._next - 1]
+
+    def snapshot(self, count=None):
+        """
+        오래된 순서로 최근 count 개 항목을 반환한다.
+        """
+        with self._lock:
+            count = self._size if count is None else min(count, self._size)
+            start = self._next - count
+            return [self._items[i % self.capacity] for i in range(start, self._next)]
+
+    def __len__(self):
+        return self._size
+
+
+class MarketDataFeed:
+    """
+    Upbit WebSocket 에서 orderbook / trade 를 구독하여 종목별 ring buffer 에 보관한다.
+    백그라운드 thread 의 asyncio loop 에서 수신하며, 연결이 끊기면 backoff 후 재연결한다.
+    매매 코드는 REST 호출 없이 메모리에서 현재가와 호가 스냅샷을 읽는다.
+    """
+    def __init__(self, tickers, url=UPBIT_WEBSOCKET_URL, trade_capacity=DEFAULT_TRADE_CAPACITY,
+                 orderbook_capacity=DEFAULT_ORDERBOOK_CAPACITY, max_age=DEFAULT_MAX_AGE):
+        self.tickers = list(tickers)
+        self.url = url
+        self.max_age = max_age
+        self.trades = {ticker: RingBuffer(trade_capacity) for ticker in self.tickers}
+        self.orderbooks = {ticker: RingBuffer(orderbook_capacity) for ticker in self.tickers}
+        self._loop = None
+        self._thread = None
+        self._stopping = False
+        self._connected = threading.Event()
+
+    def _subscription(self):
+        return json.dumps([
+            {"ticket": str(uuid.uuid4())},
+            {"type": "orderbook", "codes": self.tickers},
+            {"type": "trade", "codes": self.tickers},
+            {"format": "DEFAULT"},
+        ])
+
+    def _handle(self, raw):
+        message = json.loads(raw)
+        ticker = message.get("code")
+        received_at = time.time()
+        if message.get("type") == "orderbook" and ticker in self.orderbooks:
+            # REST(pyupbit.get_orderbook) 응답과 같은 형식으로 보관한다.
+            self.orderbooks[ticker].append({
+                "market": ticker,
+                "timestamp": message.get("timestamp"),
+                "total_ask_size": message.get("total_ask_size"),
+                "total_bid_size": message.get("total_bid_size"),
+                "orderbook_units": message.get("orderbook_units", []),
+                "received_at": received_at,
+            })
+        elif message.get("type") == "trade" and ticker in self.trades:
+            self.trades[ticker].append({
+                "trade_price": message.get("trade_price"),
+                "trade_volume": message.get("trade_volume"),
+                "ask_bid": message.get("ask_bid"),
+                "trade_timestamp": message.get("trade_timestamp"),
+                "received_at": received_at,
+            })
+
+    async def _run(self):
+        backoff = 1
+        while not self._stopping:
+            try:
+                async with websockets.connect(self.url, ping_interval=20, max_size=2 ** 22) as connection:
+                    await connection.send(self._subscription())
+                    self._connected.set()
+                    backoff = 1
+                    async for raw in connection:
+                        self._handle(raw)
+            except asyncio.CancelledError:
+                break
+            except Exception as ex:
+                logger.warning(f"[Warning] Market feed disconnected : {ex}")
+            self._connected.clear()
+            if not self._stopping:
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 30)
+
+    def start(self, wait=None):
+        """
+        백그라운드 thread 에서 구독을 시작한다.
+        :param wait: 연결될 때까지 기다릴 최대 시간(초)
+        :return: 연결 여부
+        """
+        if self._thread is not None:
+            return self._connected.is_set()
+        self._stopping = False
+        self._loop = asyncio.new_event_loop()
+        self._task = self._loop.create_task(self._run())
+
+        def run_loop():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._task)
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run_loop, name="market-feed", daemon=True)
+        self._thread.start()
+        return self._connected.wait(wait) if wait else self._connected.is_set()
+
+    def stop(self, timeout=5):
+        if self._thread is None:
+            return
+        self._stopping = True
+        self._loop.call_soon_threadsafe(self._task.cancel)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _fresh(self, item):
+        return item is not None and time.time() - item["received_at"] <= self.max_age
+
+    def get_orderbook(self, ticker):
+        """
+        최신 호가 스냅샷 (pyupbit.get_orderbook 형식). 없거나 오래되었으면 None.
+        """
+        orderbook = self.orderbooks[ticker].latest() if ticker in self.orderbooks else None
+        return orderbook if self._fresh(orderbook) else None
+
+    def get_current_price(self, ticker):
+        """
+        최근 체결가. 없거나 오래되었으면 최신 호가의 중간값, 그것도 없으면 None.
+        """
+        trade = self.trades[ticker].latest() if ticker in self.trades else None
+        if self._fresh(trade):
+            return trade["trade_price"]
+        orderbook = self.get_orderbook(ticker)
+        if orderbook and orderbook["orderbook_units"]:
+            best = orderbook["orderbook_units"][0]
+            return (best["ask_price"] + best["bid_price"]) / 2
+        return None
+
+    def get_recent_trades(self, ticker, count=None):
+        return self.trades[ticker].snapshot(count)
@@ -0,0 +1,127 @@
+"""
+테스트 / 부하 테스트용 로컬 시세 feed 서버 (Upbit WebSocket 형식의 가상 orderbook / trade 전송)
+
+    $ python market_feed_server.py --port 8765 --rate 100
+    -> MarketDataFeed(["KRW-ETH"], url="ws://127.0.0.1:8765")
+"""
+import argparse
+import asyncio
+import json
+import random
+import threading
+import time
+
+import websockets
+
+
+class LocalFeedServer:
+    """
+    구독 요청의 codes 에 대해 랜덤 워크 가격으로 orderbook / trade 메시지를 초당 rate 건씩 전송한다.
+    """
+    def __init__(self, host="127.0.0.1", port=0, rate=100, initial_price=5_000_000, tick=1000, depth=15, seed=None):
+        self.host = host
+        self.port = port
+        self.rate = rate
+        self.tick = tick
+        self.depth = depth
+        self.prices = {}
+        self.initial_price = initial_price
+        self.messages_sent = 0
+        self._random = random.Random(seed)
+        self._loop = None
+        self._thread = None
+        self._server = None
+        self._ready = threading.Event()
+
+    def _next_price(self, code):
+        price = self.prices.get(code, self.initial_price)
+        price = max(price + self._random.choice((-1, 0, 1)) * self.tick, self.tick)
+        self.prices[code] = price
+        return price
+
+    def _orderbook(self, code, price):
+        units = [{
+            "ask_price": price + self.tick * (level + 1),
+            "bid_price": price - self.tick * level,
+            "ask_size": round(self._random.uniform(0.01, 5), 8),
+            "bid_size": round(self._random.uniform(0.01, 5), 8),
+        } for level in range(self.depth)]
+        return {
+            "type": "orderbook",
+            "code": code,
+            "timestamp": int(time.time() * 1000),
+            "total_ask_size": sum(unit["ask_size"] for unit in units),
+            "total_bid_size": sum(unit["bid_size"] for unit in units),
+            "orderbook_units": units,
+            "stream_type": "REALTIME",
+        }
+
+    def _trade(self, code, price):
+        return {
+            "type": "trade",
+            "code": code,
+            "trade_price": price,
+            "trade_volume": round(self._random.uniform(0.001, 1), 8),
+            "ask_bid": self._random.choice(("ASK", "BID")),
+            "trade_timestamp": int(time.time() * 1000),
+            "stream_type": "REALTIME",
+        }
+
+    async def _handler(self, connection):
+        subscription = json.loads(await connection.recv())
+        codes = [code for item in subscription for code in item.get("codes", [])]
+        codes = list(dict.fromkeys(codes))
+        interval = 1 / self.rate if self.rate else 0
+        try:
+            while True:
+                for code in codes:
+                    price = self._next_price(code)
+                    # Upbit 와 동일하게 binary frame 으로 전송한다.
+                    await connection.send(json.dumps(self._orderbook(code, price)).encode("utf-8"))
+                    await connection.send(json.dumps(self._trade(code, price)).encode("utf-8"))
+                    self.messages_sent += 2
+                await asyncio.sleep(interval)
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _serve(self):
+        self._server = await websockets.serve(self._handler, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        await self._server.wait_closed()
+
+    @property
+    def url(self):
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self):
+        """
+        백그라운드 thread 에서 서버를 시작하고 url 을 반환한다.
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_until_complete, args=(self._serve(),),
+                                        name="local-feed-server", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self.url
+
+    def stop(self):
+        if self._server is not None:
+            self._loop.call_soon_threadsafe(self._server.close)
+            self._thread.join(5)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--rate", type=int, default=100)
+    args = parser.parse_args()
+
+    server = LocalFeedServer(host=args.host, port=args.port, rate=args.rate)
+    print(f"Local feed server : {server.start()}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
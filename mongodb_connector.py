@@ -1,9 +1,53 @@
 import os
+import threading
+import time
 
+from datetime import datetime
 from dotenv import load_dotenv
-from pymongo import MongoClient
+from pymongo import DESCENDING, MongoClient, UpdateOne
 
-def get_mongodb_client():
+# 프로세스 전역에서 재사용하는 MongoClient (connection pool 포함)
+_mongodb_client = None
+_mongodb_client_lock = threading.Lock()
+# index 생성 / datetime 필드 변환 (client 당 한 번, 실패 시 backoff 후 재시도)
+_schema_setup_lock = threading.Lock()
+_indexes_ensured = False
+_schema_migrated = False
+_schema_failures = 0
+_schema_next_attempt = 0.0
+
+# collection 별 시작 시 생성할 index : (db, collection, keys, options)
+MONGODB_INDEXES = [
+    ('autotradedb', 'trading_result', [('timestamp', DESCENDING)], {'name': 'timestamp_desc'}),
+    ('autotradedb', 'paper_trading_result', [('timestamp', DESCENDING)], {'name': 'timestamp_desc'}),
+    # trade_rollups 시간 / 일 요약
+    ('autotradedb', 'trading_result_hourly', [('period_start', DESCENDING)], {'name': 'period_start_desc', 'unique': True}),
+    ('autotradedb', 'trading_result_daily', [('period_start', DESCENDING)], {'name': 'period_start_desc', 'unique': True}),
+    ('autotradedb', 'paper_trading_result_hourly', [('period_start', DESCENDING)], {'name': 'period_start_desc', 'unique': True}),
+    ('autotradedb', 'paper_trading_result_daily', [('period_start', DESCENDING)], {'name': 'period_start_desc', 'unique': True}),
+]
+
+# ISO 문자열로 저장되어 있던 datetime 필드 : (db, collection, field)
+MONGODB_DATETIME_FIELDS = [
+    ('autotradedb', 'trading_result', 'timestamp'),
+    ('autotradedb', 'paper_trading_result', 'timestamp'),
+]
+MIGRATION_BATCH_SIZE = 1000
+# index 생성 / 변환 실패 후 재시도 간격(초) : 실패할 때마다 2배, 최대 SCHEMA_RETRY_MAX
+SCHEMA_RETRY_BASE = 30
+SCHEMA_RETRY_MAX = 600
+
+def _get_pool_options():
+    return {
+        'maxPoolSize': int(os.getenv('MONGODB_MAX_POOL_SIZE', 10)),
+        'minPoolSize': int(os.getenv('MONGODB_MIN_POOL_SIZE', 1)),
+        'maxIdleTimeMS': int(os.getenv('MONGODB_MAX_IDLE_TIME_MS', 600000)),
+        'connectTimeoutMS': int(os.getenv('MONGODB_CONNECT_TIMEOUT_MS', 5000)),
+        'socketTimeoutMS': int(os.getenv('MONGODB_SOCKET_TIMEOUT_MS', 10000)),
+        'serverSelectionTimeoutMS': int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', 5000)),
+    }
+
+def create_mongodb_client():
     mongodb_client = None
     try:
         load_dotenv()
@@ -28,8 +72,148 @@ def get_mongodb_client():
         else:
             if None not in (product_db_user, product_db_password, product_db_host, db_port, db_name, db_options):
                 mongodb_dsn = f"mongodb://{product_db_user}:{product_db_password}@{product_db_host}:{db_port}/?{db_options}"
-        mongodb_client = MongoClient(mongodb_dsn)
+        mongodb_client = MongoClient(mongodb_dsn, **_get_pool_options())
     except Exception as ex:
-        print("[EX] get_mongodb_client : ", str(ex.args))
+        print("[EX] create_mongodb_client : ", str(ex.args))
 
     return mongodb_client
+
+def ensure_indexes(mongodb_client):
+    """
+    조회에 사용하는 index 를 생성한다. (이미 있으면 변경 없음)
+    :param mongodb_client:
+    :return: 모든 index 생성 성공 여부
+    """
+    succeeded = True
+    for db_name, collection_name, keys, options in MONGODB_INDEXES:
+        try:
+            mongodb_client[db_name][collection_name].create_index(keys, **options)
+        except Exception as ex:
+            print(f"[EX] ensure_indexes({db_name}.{collection_name}) : ", str(ex.args))
+            succeeded = False
+    return succeeded
+
+def ensure_trade_collection(mongodb_client, collection, db_name='autotradedb'):
+    """
+    마켓별 거래 기록 collection 과 rollup collection 의 index 를 생성한다. (MONGODB_INDEXES 와 같은 구성)
+    :return: 성공 여부
+    """
+    try:
+        mongodb_client[db_name][collection].create_index([('timestamp', DESCENDING)], name='timestamp_desc')
+        for suffix in ('hourly', 'daily'):
+            mongodb_client[db_name][f"{collection}_{suffix}"].create_index(
+                [('period_start', DESCENDING)], name='period_start_desc', unique=True)
+        return True
+    except Exception as ex:
+        print(f"[EX] ensure_trade_collection({db_name}.{collection}) : ", str(ex.args))
+        return False
+
+def migrate_datetime_fields(mongodb_client, fields=None, batch_size=MIGRATION_BATCH_SIZE):
+    """
+    datetime.isoformat() 문자열로 저장된 필드를 BSON datetime 으로 변환한다. (변환할 문서가 없으면 변경 없음)
+    문자열과 datetime 은 범위 조건으로 함께 비교되지 않으므로, 날짜 범위 조회 / aggregation 전에 변환되어 있어야 한다.
+    :param mongodb_client:
+    :param fields: (db, collection, field) 목록 (기본 MONGODB_DATETIME_FIELDS)
+    :param batch_size: bulk_write 1회당 문서 수
+    :return: 모든 변환 성공 여부 (형식이 잘못되어 건너뛴 문서는 실패로 보지 않는다.)
+    """
+    succeeded = True
+    for db_name, collection_name, field in fields or MONGODB_DATETIME_FIELDS:
+        collection = mongodb_client[db_name][collection_name]
+        try:
+            migrated = 0
+            skipped = 0
+            batch = []
+            for document in collection.find({field: {'$type': 'string'}}, {field: 1}):
+                try:
+                    value = datetime.fromisoformat(document[field])
+                except ValueError as ex:
+                    # 형식이 잘못된 문서는 그대로 두고 나머지 변환을 계속한다.
+                    print(f"[EX] migrate_datetime_fields({db_name}.{collection_name}.{field}) skip {document['_id']} : ", str(ex.args))
+                    skipped += 1
+                    continue
+                batch.append(UpdateOne({'_id': document['_id']}, {'$set': {field: value}}))
+                if len(batch) >= batch_size:
+                    migrated += collection.bulk_write(batch, ordered=False).modified_count
+                    batch = []
+            if batch:
+                migrated += collection.bulk_write(batch, ordered=False).modified_count
+            if migrated or skipped:
+                print(f"> Migrated {db_name}.{collection_name}.{field} to datetime : {migrated} documents ({skipped} skipped)")
+        except Exception as ex:
+            print(f"[EX] migrate_datetime_fields({db_name}.{collection_name}.{field}) : ", str(ex.args))
+            succeeded = False
+    return succeeded
+
+def check_mongodb_health(mongodb_client):
+    """
+    ping 명령으로 MongoDB 연결 상태를 확인한다.
+    :param mongodb_client:
+    :return: 정상 여부
+    """
+    if mongodb_client is None:
+        return False
+    try:
+        mongodb_client.admin.command('ping')
+        return True
+    except Exception as ex:
+        print("[EX] check_mongodb_health : ", str(ex.args))
+        return False
+
+def _setup_schema(mongodb_client):
+    """
+    index 생성과 datetime 필드 변환을 수행한다. (완료된 작업은 다시 하지 않는다.)
+    다른 thread 가 수행 중이거나 실패 후 재시도 대기 중이면 기다리지 않고 바로 반환하므로,
+    MongoDB 장애 중에도 get_mongodb_client 호출이 index 생성 timeout 만큼 지연되지 않는다.
+    """
+    global _indexes_ensured, _schema_migrated, _schema_failures, _schema_next_attempt
+    if (_indexes_ensured and _schema_migrated) or time.monotonic() < _schema_next_attempt:
+        return
+    if not _schema_setup_lock.acquire(blocking=False):
+        return
+    try:
+        # 연결되지 않으면 index 마다 server selection timeout 을 기다리지 않도록 먼저 확인한다.
+        if check_mongodb_health(mongodb_client):
+            if not _indexes_ensured:
+                _indexes_ensured = ensure_indexes(mongodb_client)
+            if not _schema_migrated:
+                _schema_migrated = migrate_datetime_fields(mongodb_client)
+        if _indexes_ensured and _schema_migrated:
+            _schema_failures = 0
+            return
+        delay = min(SCHEMA_RETRY_BASE * 2 ** _schema_failures, SCHEMA_RETRY_MAX)
+        _schema_failures += 1
+        _schema_next_attempt = time.monotonic() + delay
+        print(f"[Warning] MongoDB index / migration setup is incomplete, retry in {delay}s")
+    finally:
+        _schema_setup_lock.release()
+
+def get_mongodb_client():
+    """
+    프로세스 전역 MongoClient 를 반환한다. 최초 호출 시 client 생성, index 관리 및 datetime 필드 변환을 수행한다.
+    (index 생성 / 변환에 실패했다면 backoff 후 다음 호출에서 다시 시도한다.)
+    client 의 connection pool 은 재사용되므로 호출한 쪽에서 close 하지 않는다.
+    :return:
+    """
+    global _mongodb_client
+    with _mongodb_client_lock:
+        if _mongodb_client is None:
+            _mongodb_client = create_mongodb_client()
+        mongodb_client = _mongodb_client
+    if mongodb_client is not None:
+        _setup_schema(mongodb_client)
+    return mongodb_client
+
+def close_mongodb_client():
+    """
+    프로세스 종료 시 전역 MongoClient 를 정리한다.
+    """
+    global _mongodb_client, _indexes_ensured, _schema_migrated, _schema_failures, _schema_next_attempt
+    with _mongodb_client_lock:
+        if _mongodb_client is not None:
+            _mongodb_client.close()
+            _mongodb_client = None
+            _indexes_ensured = False
+            _schema_migrated = False
+            _schema_failures = 0
+            _schema_next_attempt = 0.0
@@ -5,11 +5,13 @@ import pyupbit
 from dotenv import load_dotenv
 from openai import OpenAI
 
+from analytics_resource.candle_store import get_ohlcv
+
 load_dotenv()
 
 def trade_mvp():
     #1. 업비트 차트 데이터 가져오기 (30일 일봉 데이터)
-    df = pyupbit.get_ohlcv("KRW-ETH", count=30, interval="day")
+    df = get_ohlcv("KRW-ETH", count=30, interval="day")
 
     #2. AI에게 데이터를 제공하고 판단 받기
     client = OpenAI()
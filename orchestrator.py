@@ -0,0 +1,81 @@
+import logging
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+from data_collector import collect_data, print_timings
+from scheduler import NonRetryableError
+from tracing import span, tracer
+
+logger = logging.getLogger(__name__)
+
+
+class MarketOrchestrator:
+    """
+    여러 마켓의 매매 주기를 한 프로세스에서 실행한다.
+    - 모든 마켓에 공통인 데이터(잔고, 공포 탐욕 지수, 매매 기법)는 주기마다 한 번만 조회한다.
+    - 마켓별 작업(캔들 / 호가 / 통화별 뉴스 조회, LLM 판단, 주문)은 worker pool 에서 동시에 실행한다.
+    - Upbit 요청은 rate_limiter 의 전역 token bucket 을 함께 사용하므로 마켓 수와 관계없이 요청 수 제한을 지킨다.
+    """
+    def __init__(self, tickers, trade, shared_sources, max_workers=None, after_cycle=None):
+        """
+        :param tickers: 마켓 목록 (예: ["KRW-ETH", "KRW-BTC"])
+        :param trade: (ticker, shared) -> None, 마켓 1개의 매매 주기 (auto_trade.ai_trade)
+        :param shared_sources: () -> [DataSource], 공통 데이터 소스 목록
+        :param max_workers: 동시에 실행할 마켓 수 (기본 마켓 수, 최대 8)
+        :param after_cycle: 매 주기 종료 후 호출 (예: 지연시간 지표 내보내기)
+        """
+        self.tickers = list(tickers)
+        self.trade = trade
+        self.shared_sources = shared_sources
+        self.after_cycle = after_cycle
+        self._executor = ThreadPoolExecutor(max_workers=max_workers or min(len(self.tickers), 8),
+                                            thread_name_prefix="market")
+
+    def fetch_shared(self):
+        with span("shared_fetch"):
+            shared, timings = collect_data(sources=self.shared_sources())
+        print("> Shared data collection timings")
+        print_timings(timings)
+        return shared
+
+    def _trade_market(self, ticker, shared):
+        # 동시에 실행되는 마켓의 단계별 지연시간이 섞이지 않도록 마켓별로 기록한다.
+        with tracer.market(ticker):
+            self.trade(ticker, shared)
+
+    def run_cycle(self):
+        """
+        공통 데이터를 조회한 뒤 모든 마켓의 매매 주기를 실행한다. 한 마켓의 실패는 다른 마켓에 영향을 주지 않는다.
+        :return: {ticker: 예외 또는 None}
+        """
+        tracer.begin_cycle()
+        started_at = time.perf_counter()
+
+        shared = self.fetch_shared()
+        futures = {ticker: self._executor.submit(self._trade_market, ticker, shared) for ticker in self.tickers}
+        errors = {}
+        for ticker, future in futures.items():
+            try:
+                future.result()
+                errors[ticker] = None
+            except Exception as ex:
+                logger.error(f"[Error] Trade cycle failed : {ticker} : {ex}")
+                errors[ticker] = ex
+
+        elapsed = time.perf_counter() - started_at
+        tracer.observe("cycle", elapsed)
+        failed = [ticker for ticker, error in errors.items() if error is not None]
+        print(f"> {len(self.tickers)} markets in {elapsed:.2f}s (failed : {failed or 'none'})")
+        if self.after_cycle:
+            self.after_cycle()
+        if len(failed) == len(self.tickers):
+            # 모든 마켓이 실패하면 scheduler 의 재시도 대상이 되도록 예외를 전달한다.
+            # 단, 주문 이후 단계에서 실패한 마켓이 있으면 재시도 시 주문이 중복될 수 있으므로 재시도하지 않는다.
+            if any(isinstance(errors[ticker], NonRetryableError) for ticker in failed):
+                raise NonRetryableError(f"All markets failed (order placed) : {failed}")
+            raise RuntimeError(f"All markets failed : {failed}")
+        return errors
+
+    def close(self):
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,123 @@
+import json
+import random
+
+from exchange_adapter import DEFAULT_FEE_RATE, SimulatedExchange
+
+# 모의 거래 결과를 저장할 collection (실거래 trading_result 와 같은 스키마)
+PAPER_RESULT_COLLECTION = "paper_trading_result"
+
+
+def fill_market_order(order_book, side, amount, fee_rate=DEFAULT_FEE_RATE):
+    """
+    orderbook_units 를 최우선 호가부터 차례로 소진하며 시장가 주문을 체결한다.
+    :param order_book: pyupbit.get_orderbook 형식의 호가
+    :param side: bid(매수, amount = 사용할 원화) / ask(매도, amount = 매도 수량)
+    :param amount:
+    :param fee_rate:
+    :return: {'trades', 'volume', 'funds', 'fee', 'avg_price', 'slippage_bps', 'remaining'}
+    """
+    trades = []
+    volume = funds = 0.0
+    remaining = amount
+    units = order_book['orderbook_units']
+    for unit in units:
+        if remaining <= 0:
+            break
+        if side == 'bid':
+            price, size = unit['ask_price'], unit['ask_size']
+            take_funds = min(remaining, price * size)
+            take_volume = take_funds / price
+            remaining -= take_funds
+        else:
+            price, size = unit['bid_price'], unit['bid_size']
+            take_volume = min(remaining, size)
+            take_funds = take_volume * price
+            remaining -= take_volume
+        if take_volume <= 0:
+            continue
+        volume += take_volume
+        funds += take_funds
+        trades.append({'price': price, 'volume': take_volume, 'funds': take_funds})
+
+    best_price = units[0]['ask_price' if side == 'bid' else 'bid_price'] if units else 0
+    avg_price = funds / volume if volume > 0 else 0
+    slippage = (avg_price - best_price) / best_price if best_price and volume > 0 else 0
+    return {
+        'trades': trades,
+        'volume': volume,
+        'funds': funds,
+        'fee': funds * fee_rate,
+        'avg_price': avg_price,
+        'slippage_bps': (slippage if side == 'bid' else -slippage) * 10000,
+        'remaining': max(remaining, 0.0),
+    }
+
+
+class PaperExchange(SimulatedExchange):
+    """
+    기록된 / 가상의 호가로 시장가 주문을 체결하는 모의 거래소 (실제 주문 없음)
+    잔고(KRW / ETH 원장)는 로컬 Portfolio 로만 관리하며, 체결만 호가 소진(fill_market_order) 방식으로 바꾼다.
+    주문 응답에는 평균 체결가(avg_price)와 slippage_bps 가 추가된다.
+    """
+    order_prefix = "paper"
+
+    def __init__(self, balances, orderbook_source, fee_rate=DEFAULT_FEE_RATE):
+        super().__init__(balances, price_source=None, fee_rate=fee_rate)
+        self.orderbook_source = orderbook_source
+
+    def _fill(self, side, ticker, amount):
+        return fill_market_order(self.orderbook_source(ticker), side, amount, self.fee_rate)
+
+
+class OrderbookReplay:
+    """
+    기록된 호가 스냅샷(JSON lines)을 순서대로 재생한다. 마지막 이후에는 처음으로 돌아간다.
+    """
+    def __init__(self, snapshots):
+        self.snapshots = list(snapshots)
+        self._position = 0
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.loads(line) for line in f if line.strip())
+
+    def __call__(self, ticker):
+        snapshot = self.snapshots[self._position % len(self.snapshots)]
+        self._position += 1
+        return snapshot
+
+
+def record_orderbook(order_book, path):
+    """
+    호가 스냅샷을 JSON lines 파일에 추가한다. (OrderbookReplay 로 재생)
+    """
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(order_book) + "\n")
+
+
+class SyntheticOrderbook:
+    """
+    랜덤 워크 중간가 주변으로 depth 단계의 가상 호가를 만든다.
+    """
+    def __init__(self, initial_price=5_000_000, tick=1000, depth=15, max_size=5.0, seed=None):
+        self.price = initial_price
+        self.tick = tick
+        self.depth = depth
+        self.max_size = max_size
+        self._random = random.Random(seed)
+
+    def __call__(self, ticker):
+        self.price = max(self.price + self._random.choice((-1, 0, 1)) * self.tick, self.tick)
+        units = [{
+            'ask_price': self.price + self.tick * (level + 1),
+            'bid_price': self.price - self.tick * level,
+            'ask_size': self._random.uniform(0.01, self.max_size),
+            'bid_size': self._random.uniform(0.01, self.max_size),
+        } for level in range(self.depth)]
+        return {
+            'market': ticker,
+            'total_ask_size': sum(unit['ask_size'] for unit in units),
+            'total_bid_size': sum(unit['bid_size'] for unit in units),
+            'orderbook_units': units,
+        }
@@ -0,0 +1,215 @@
+import copy
+import json
+import logging
+import math
+
+logger = logging.getLogger(__name__)
+
+# 프롬프트에 포함할 OHLCV / 보조 지표 컬럼 (앞쪽일수록 중요, 예산 초과 시 뒤쪽 optional 컬럼부터 제거)
+OHLCV_REQUIRED_COLUMNS = ['open', 'high', 'low', 'close', 'rsi', 'macd', 'macd_signal']
+OHLCV_OPTIONAL_COLUMNS = ['volume', 'bb_bbh', 'bb_bbl', 'sma_20', 'bb_bbm', 'macd_diff', 'sma_12', 'value']
+
+# 유효 숫자 자리수
+DEFAULT_PRECISION = 6
+
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding(model):
+    """
+    tiktoken 이 설치되어 있고 인코딩 파일을 가져올 수 있으면 사용한다. (optional dependency)
+    """
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.encoding_for_model(model)
+        except Exception as ex:
+            logger.info(f"tiktoken is not available, using estimated token count : {ex}")
+            _encoding = None
+    return _encoding
+
+
+def count_tokens(text, model="gpt-4o"):
+    """
+    텍스트의 토큰 수를 계산한다. tiktoken 이 없으면 보수적으로 추정한다. (ASCII 4자당 1토큰, 그 외 문자당 1토큰)
+    :param text:
+    :param model:
+    :return:
+    """
+    encoding = _get_encoding(model)
+    if encoding is not None:
+        return len(encoding.encode(text))
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
+
+
+def format_number(value, precision=DEFAULT_PRECISION):
+    """
+    유효 숫자 precision 자리로 반올림하여 지수 표기 없이 문자열로 만든다.
+    """
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ""
+    value = float(value)
+    if value == 0:
+        return "0"
+    decimals = max(precision - 1 - math.floor(math.log10(abs(value))), 0)
+    text = f"{round(value, decimals):.{decimals}f}"
+    return text.rstrip("0").rstrip(".") if "." in text else text
+
+
+def _time_unit(index):
+    """
+    캔들 간격에 맞는 상대 시간 단위를 선택한다.
+    """
+    spacing = (index[1:] - index[:-1]).min().total_seconds() if len(index) > 1 else 86400
+    if spacing >= 86400:
+        return "d", 86400
+    if spacing >= 3600:
+        return "h", 3600
+    return "m", 60
+
+
+def encode_ohlcv(df, columns, precision=DEFAULT_PRECISION):
+    """
+    OHLCV DataFrame 을 고정 컬럼 CSV 표로 변환한다. 시간은 마지막 캔들 기준 상대 시간(-1d, -3h)으로 표기한다.
+    :param df: DatetimeIndex 를 가진 DataFrame
+    :param columns: 출력할 컬럼 목록
+    :param precision: 유효 숫자 자리수
+    :return:
+    """
+    if df is None or df.empty:
+        return "(no data)"
+    columns = [column for column in columns if column in df.columns]
+    last_ts = df.index[-1]
+    unit, unit_seconds = _time_unit(df.index)
+    lines = [f"last={last_ts:%Y-%m-%d %H:%M} KST", ",".join(["t"] + columns)]
+    for ts, row in zip(df.index, df[columns].itertuples(index=False)):
+        offset = round((last_ts - ts).total_seconds() / unit_seconds)
+        label = "0" if offset == 0 else f"-{offset}{unit}"
+        lines.append(",".join([label] + [format_number(value, precision) for value in row]))
+    return "\n".join(lines)
+
+
+def encode_orderbook(order_book, depth=5, precision=DEFAULT_PRECISION):
+    """
+    Orderbook 을 총 잔량과 상위 depth 개 호가 표로 요약한다.
+    """
+    if not order_book:
+        return "(no data)"
+    lines = [
+        f"total_ask_size={format_number(order_book.get('total_ask_size'), precision)},"
+        f"total_bid_size={format_number(order_book.get('total_bid_size'), precision)}",
+        "ask_price,ask_size,bid_price,bid_size"
+    ]
+    for unit in order_book.get('orderbook_units', [])[:depth]:
+        lines.append(",".join(format_number(unit[key], precision) for key in ('ask_price', 'ask_size', 'bid_price', 'bid_size')))
+    return "\n".join(lines)
+
+
+def encode_balances(balances, precision=DEFAULT_PRECISION):
+    """
+    잔고 목록을 currency,balance,locked,avg_buy_price 표로 변환한다.
+    """
+    lines = ["currency,balance,locked,avg_buy_price"]
+    for balance in balances or []:
+        lines.append(",".join([balance['currency']] + [format_number(balance.get(key, 0), precision) for key in ('balance', 'locked', 'avg_buy_price')]))
+    return "\n".join(lines)
+
+
+class TableSection:
+    """
+    예산 초과 시 오래된 행과 optional 컬럼을 줄일 수 있는 표 형태 프롬프트 섹션
+    """
+    def __init__(self, title, df, required_columns=OHLCV_REQUIRED_COLUMNS, optional_columns=OHLCV_OPTIONAL_COLUMNS,
+                 min_rows=5, precision=DEFAULT_PRECISION):
+        self.title = title
+        self.df = df
+        self.required_columns = list(required_columns)
+        self.optional_columns = list(optional_columns)
+        self.rows = 0 if df is None else len(df)
+        self.min_rows = min(min_rows, self.rows)
+        self.precision = precision
+
+    def render(self):
+        df = None if self.df is None else self.df.tail(self.rows)
+        return f"{self.title}:\n{encode_ohlcv(df, self.required_columns + self.optional_columns, self.precision)}"
+
+    def can_drop_row(self):
+        return self.rows > self.min_rows
+
+    def drop_row(self):
+        self.rows -= 1
+
+    def can_drop_column(self):
+        return len(self.optional_columns) > 0
+
+    def drop_column(self):
+        self.optional_columns = self.optional_columns[:-1]
+
+
+class TextSection:
+    """
+    축약하지 않는 텍스트 섹션
+    """
+    def __init__(self, title, text):
+        self.title = title
+        self.text = text
+
+    def render(self):
+        return f"{self.title}: {self.text}"
+
+
+def build_prompt(sections, token_budget, model="gpt-4o"):
+    """
+    섹션들을 하나의 프롬프트로 합치고 token_budget 을 넘지 않도록 표 섹션의 오래된 행, optional 컬럼 순으로 줄인다.
+    :param sections: TextSection / TableSection list
+    :param token_budget: 최대 토큰 수
+    :param model:
+    :return: (prompt, token_count)
+    """
+    # 전달받은 섹션은 다른 프롬프트에서도 재사용할 수 있도록 복사본을 줄인다.
+    sections = [copy.copy(section) for section in sections]
+    tables = [section for section in sections if isinstance(section, TableSection)]
+
+    def render():
+        return "\n\n".join(section.render() for section in sections)
+
+    prompt = render()
+    tokens = count_tokens(prompt, model)
+    while tokens > token_budget:
+        droppable_rows = [table for table in tables if table.can_drop_row()]
+        droppable_columns = [table for table in tables if table.can_drop_column()]
+        if droppable_rows:
+            # 행이 가장 많은 표에서 오래된 행을 제거한다. (토큰 수 재계산 횟수를 줄이기 위해 비율만큼 한번에 제거)
+            table = max(droppable_rows, key=lambda t: t.rows)
+            excess_rows = math.ceil(table.rows * (tokens - token_budget) / tokens)
+            for _ in range(max(min(excess_rows, table.rows - table.min_rows), 1)):
+                table.drop_row()
+        elif droppable_columns:
+            max(droppable_columns, key=lambda t: len(t.optional_columns)).drop_column()
+        else:
+            logger.warning(f"[Warning] Prompt exceeds token budget : {tokens} > {token_budget}")
+            break
+        prompt = render()
+        tokens = count_tokens(prompt, model)
+
+    return prompt, tokens
+
+
+def report_savings(name, legacy_payload, prompt, model="gpt-4o"):
+    """
+    기존 JSON 직렬화 방식 대비 절감된 토큰 수를 출력한다.
+    """
+    legacy_tokens = count_tokens(legacy_payload, model)
+    tokens = count_tokens(prompt, model)
+    saved = legacy_tokens - tokens
+    ratio = saved / legacy_tokens * 100 if legacy_tokens > 0 else 0
+    print(f"> Prompt tokens [{name}] : {tokens} (legacy {legacy_tokens}, saved {saved} / {ratio:.1f}%)")
+    return {'name': name, 'tokens': tokens, 'legacy_tokens': legacy_tokens, 'saved_tokens': saved}
+
+
+def to_json(value):
+    return json.dumps(value, ensure_ascii=False)
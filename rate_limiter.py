@@ -0,0 +1,71 @@
+import threading
+import time
+
+# Upbit API 초당 요청 제한 : https://docs.upbit.com/reference/rate-limits
+UPBIT_QUOTATION_RATE = 10
+UPBIT_EXCHANGE_RATE = 30
+UPBIT_ORDER_RATE = 8
+
+# 요청 그룹별 rate (프로세스 전역 공유 token bucket)
+UPBIT_RATES = {
+    'quotation': UPBIT_QUOTATION_RATE,
+    'exchange': UPBIT_EXCHANGE_RATE,
+    'order': UPBIT_ORDER_RATE,
+}
+
+_shared_limiters = {}
+_shared_limiters_lock = threading.Lock()
+
+
+class TokenBucket:
+    """
+    초당 rate 개의 token 이 capacity 까지 채워지는 token bucket
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = float(self.capacity)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    def try_acquire(self, tokens=1):
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens=1, timeout=None):
+        """
+        token 을 얻을 때까지 필요한 만큼만 기다린다.
+        :return: timeout 이내에 얻었는지 여부
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+def get_upbit_limiter(group):
+    """
+    요청 그룹(quotation / exchange / order)별로 프로세스 전역에서 공유하는 token bucket
+    여러 마켓 / 모듈이 같은 Upbit 요청 수 제한을 함께 나누어 쓴다.
+    """
+    with _shared_limiters_lock:
+        limiter = _shared_limiters.get(group)
+        if limiter is None:
+            limiter = _shared_limiters[group] = TokenBucket(UPBIT_RATES[group])
+        return limiter
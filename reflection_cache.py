@@ -0,0 +1,125 @@
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.getenv("REFLECTION_CACHE_PATH", "cache/reflection_cache.json")
+DEFAULT_TTL = 3600
+DEFAULT_MAX_ENTRIES = 128
+
+# 시장 상태 bucket 크기 (가격은 로그 기준 1%, RSI 는 10, 공포 탐욕 지수는 10 단위)
+PRICE_BUCKET_RATIO = 0.01
+RSI_BUCKET_SIZE = 10
+FEAR_GREED_BUCKET_SIZE = 10
+
+# 캐시 키에 포함할 거래 필드 (매매 판단과 그 결과 잔고)
+TRADE_KEY_FIELDS = ['decision', 'percentage', 'eth_balance', 'krw_balance', 'eth_avg_buy_price']
+
+
+def market_state_bucket(df, fear_greed_index=None):
+    """
+    시장 상태를 거친 bucket 으로 변환한다. 시장이 거의 움직이지 않았다면 같은 bucket 이 된다.
+    :param df: 보조 지표가 포함된 OHLCV DataFrame (예: 시간봉)
+    :param fear_greed_index: get_fear_and_greed_index 결과
+    :return:
+    """
+    last = df.iloc[-1]
+    bucket = {
+        'price': math.floor(math.log(last['close']) / math.log1p(PRICE_BUCKET_RATIO)),
+        'rsi': None if math.isnan(last['rsi']) else int(last['rsi'] // RSI_BUCKET_SIZE),
+        'macd_sign': None if math.isnan(last['macd_diff']) else bool(last['macd_diff'] >= 0),
+    }
+    if fear_greed_index:
+        bucket['fear_greed'] = int(fear_greed_index['value']) // FEAR_GREED_BUCKET_SIZE
+    return bucket
+
+
+def make_reflection_key(trades_df, market_bucket):
+    """
+    최근 매매(BUY / SELL) 내역과 시장 상태 bucket 으로 캐시 키를 만든다.
+    매 주기 추가되는 HOLD 기록과 기록마다 다른 timestamp / reflection 은 제외하여, 매매가 없으면 같은 키가 된다.
+    """
+    trades = trades_df[trades_df['decision'].astype(str).str.upper() != 'HOLD']
+    payload = trades.reindex(columns=TRADE_KEY_FIELDS).to_json(orient='records') + json.dumps(market_bucket, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ReflectionCache:
+    """
+    reflection 결과를 TTL / 최대 개수(LRU) 제한과 함께 로컬 JSON 파일에 저장한다.
+    """
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return OrderedDict()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return OrderedDict(json.load(f))
+        except (OSError, ValueError) as ex:
+            logger.warning(f"[Warning] Failed to load reflection cache : {ex}")
+            return OrderedDict()
+
+    def _save(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._entries, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def _evict(self, now):
+        expired = [key for key, entry in self._entries.items() if now - entry['created_at'] > self.ttl]
+        for key in expired:
+            del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if time.time() - entry['created_at'] > self.ttl:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry['reflection']
+
+    def set(self, key, reflection):
+        with self._lock:
+            now = time.time()
+            self._entries[key] = {'reflection': reflection, 'created_at': now}
+            self._entries.move_to_end(key)
+            self._evict(now)
+            try:
+                self._save()
+            except OSError as ex:
+                logger.warning(f"[Warning] Failed to save reflection cache : {ex}")
+
+
+def get_or_generate_reflection(cache, key, generate):
+    """
+    캐시에 reflection 이 있으면 재사용하고, 없으면 generate() 로 생성하여 저장한다.
+    :return: (reflection, cache_hit)
+    """
+    reflection = cache.get(key)
+    if reflection is not None:
+        return reflection, True
+    reflection = generate()
+    if reflection:
+        cache.set(key, reflection)
+    return reflection, False
@@ -0,0 +1,141 @@
+import logging
+import math
+import os
+import random
+import signal
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LOCK_PATH = os.getenv("SCHEDULER_LOCK_PATH", "cache/auto_trade.lock")
+
+
+class NonRetryableError(Exception):
+    """
+    같은 주기에 다시 실행하면 안 되는 실패 (예: 주문 이후 단계의 실패, 재시도 시 주문이 중복될 수 있음)
+    """
+
+
+class TradingScheduler:
+    """
+    wall-clock 경계(예: 매 10분 정각)에 맞춰 job 을 실행하는 스케줄러
+    - 실행 시간만큼 주기가 밀리지 않는다. (drift-free)
+    - 실행이 다음 경계를 넘기면 놓친 주기는 건너뛰고 다음 경계에서 한번만 실행한다. (coalesce)
+    - 동시에 두 번 실행되지 않는다. (프로세스 내 lock + 프로세스 간 lock 파일)
+    - 오류 시 exponential backoff 로 재시도하되 다음 경계를 넘기지 않는다. (NonRetryableError 는 재시도하지 않는다.)
+    - SIGINT / SIGTERM 수신 시 진행 중인 주기를 마치고 종료한다.
+    """
+    def __init__(self, job, interval=600, offset=0, max_retries=3, backoff_base=5, backoff_max=120,
+                 lock_path=DEFAULT_LOCK_PATH):
+        self.job = job
+        self.interval = interval
+        self.offset = offset
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.lock_path = lock_path
+        self._stop_event = threading.Event()
+        self._run_lock = threading.Lock()
+        self._lock_file = None
+
+    def next_run_at(self, now):
+        """
+        now 이후 첫 번째 실행 경계 시각(epoch seconds)
+        """
+        return (math.floor((now - self.offset) / self.interval) + 1) * self.interval + self.offset
+
+    def _acquire_process_lock(self):
+        if fcntl is None or not self.lock_path:
+            return True
+        directory = os.path.dirname(self.lock_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # "w" 로 열면 lock 을 얻기 전에 실행 중인 프로세스의 PID 가 지워지므로, lock 을 얻은 뒤에 비우고 기록한다.
+        self._lock_file = open(self.lock_path, "a+")
+        try:
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            self._lock_file.close()
+            self._lock_file = None
+            return False
+        self._lock_file.seek(0)
+        self._lock_file.truncate()
+        self._lock_file.write(str(os.getpid()))
+        self._lock_file.flush()
+        return True
+
+    def _release_process_lock(self):
+        if self._lock_file is not None:
+            fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+            self._lock_file.close()
+            self._lock_file = None
+
+    def _backoff(self, attempt):
+        delay = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+        return delay + random.uniform(0, delay / 2)
+
+    def run_once(self, deadline=None):
+        """
+        job 을 한번 실행한다. 실패 시 deadline 이전까지 backoff 재시도한다.
+        :param deadline: 재시도를 멈출 시각(epoch seconds)
+        :return: 성공 여부 (이미 실행 중이면 False)
+        """
+        if not self._run_lock.acquire(blocking=False):
+            logger.warning("[Warning] Previous trading cycle is still running, skip this cycle")
+            return False
+        try:
+            for attempt in range(self.max_retries + 1):
+                try:
+                    self.job()
+                    return True
+                except NonRetryableError as ex:
+                    logger.error(f"Auto trading error (not retried) : {ex}")
+                    break
+                except Exception as ex:
+                    logger.error(f"Auto trading error (attempt {attempt + 1}/{self.max_retries + 1}) : {ex}")
+                    if attempt == self.max_retries:
+                        break
+                    delay = self._backoff(attempt)
+                    if deadline is not None and time.time() + delay >= deadline:
+                        logger.warning("[Warning] Retry would overrun the next cycle, give up this cycle")
+                        break
+                    if self._stop_event.wait(delay):
+                        break
+            return False
+        finally:
+            self._run_lock.release()
+
+    def stop(self, *args):
+        logger.info("Stopping trading scheduler ...")
+        self._stop_event.set()
+
+    def run_forever(self):
+        if not self._acquire_process_lock():
+            logger.error(f"Another trading scheduler is already running (lock : {self.lock_path})")
+            return
+
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.stop)
+            signal.signal(signal.SIGTERM, self.stop)
+
+        try:
+            while not self._stop_event.is_set():
+                scheduled_at = self.next_run_at(time.time())
+                if self._stop_event.wait(max(scheduled_at - time.time(), 0)):
+                    break
+
+                self.run_once(deadline=scheduled_at + self.interval)
+
+                finished_at = time.time()
+                skipped = math.floor((finished_at - scheduled_at) / self.interval)
+                if skipped > 0:
+                    logger.warning(f"[Warning] Trading cycle overran by {finished_at - scheduled_at:.1f}s, {skipped} cycle(s) skipped")
+        finally:
+            self._release_process_lock()
+            logger.info("Trading scheduler stopped")
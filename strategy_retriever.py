@@ -0,0 +1,266 @@
+import argparse
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import threading
+
+from collections import Counter
+
+from analytics_resource.youtube_script import get_combined_transcript
+from prompt_encoder import count_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INDEX_PATH = os.getenv("STRATEGY_INDEX_PATH", "cache/strategy_index.json")
+# 검색 대상 문서 (파일 경로 또는 'youtube:<video_id>' : 자막은 색인을 만들 때 한 번만 가져와 색인에 함께 저장한다.)
+DEFAULT_SOURCES = ("strategy.txt",)
+
+# chunk 크기(단어 수) / 앞 chunk 와 겹치는 단어 수 : 자막에는 문장 부호가 없으므로 단어 단위로 나눈다.
+CHUNK_WORDS = 40
+CHUNK_OVERLAP = 10
+
+# BM25 parameter
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+RSI_OVERBOUGHT = 70
+RSI_OVERSOLD = 30
+
+# 지표 상태별 검색어 (자막 표현에 맞춘 한국어 키워드)
+BASE_QUERY = "차트 시장 상황 리스크 관리 자금 관리 매매 전략"
+SIGNAL_QUERIES = {
+    'rsi_overbought': "과매수 매도 수익 저항선 손절 라인 한방 욕심",
+    'rsi_oversold': "과매도 매수 지지선 분할 매수 물타기 조심",
+    'bb_upper_breakout': "상승세 추세 저항선 돌파 시장 분위기 심리",
+    'bb_lower_breakout': "하락세 지지선 이탈 손절 시나리오 멘탈",
+    'macd_golden_cross': "상승세 추세 전환 이평선 포지션 조정",
+    'macd_dead_cross': "하락세 추세 전환 이평선 포지션 조정 손절",
+}
+
+_TOKEN_PATTERN = re.compile(r"[가-힣]+|[a-z0-9]+(?:\.[0-9]+)?")
+_NOISE_PATTERN = re.compile(r"\[[^\]]*\]")
+
+
+def tokenize(text):
+    """
+    형태소 분석기 없이 검색어를 만든다. 한글 단어는 글자 bigram(조사가 붙어도 어간이 일치), 그 외는 소문자 단어.
+    """
+    terms = []
+    for word in _TOKEN_PATTERN.findall(text.lower()):
+        if not ('가' <= word[0] <= '힣') or len(word) == 1:
+            terms.append(word)
+            continue
+        terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return terms
+
+
+def chunk_text(text, chunk_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+    """
+    '[음악]' 같은 자막 표기를 제거하고 chunk_words 단어씩, overlap 단어를 겹쳐서 나눈다.
+    """
+    words = _NOISE_PATTERN.sub(" ", text).split()
+    step = max(chunk_words - overlap, 1)
+    return [" ".join(words[start:start + chunk_words])
+            for start in range(0, max(len(words) - overlap, 1), step) if words[start:start + chunk_words]]
+
+
+class BM25Index:
+    """
+    chunk 단위 BM25 색인 (문서 수가 적으므로 역색인 없이 chunk 별 term frequency 를 순회한다.)
+    """
+    def __init__(self, chunks, k1=BM25_K1, b=BM25_B):
+        """
+        :param chunks: [{'source': ..., 'text': ..., 'terms': {term: tf}}]
+        """
+        self.chunks = chunks
+        self.k1 = k1
+        self.b = b
+        self.lengths = [sum(chunk['terms'].values()) for chunk in chunks]
+        self.avg_length = sum(self.lengths) / len(chunks) if chunks else 0
+        document_frequency = Counter(term for chunk in chunks for term in chunk['terms'])
+        self.idf = {term: math.log(1 + (len(chunks) - count + 0.5) / (count + 0.5))
+                    for term, count in document_frequency.items()}
+
+    @classmethod
+    def build(cls, documents, chunk_words=CHUNK_WORDS, overlap=CHUNK_OVERLAP):
+        """
+        :param documents: {source: text}
+        """
+        chunks = [{'source': source, 'text': chunk, 'terms': dict(Counter(tokenize(chunk)))}
+                  for source, text in documents.items()
+                  for chunk in chunk_text(text, chunk_words=chunk_words, overlap=overlap)]
+        return cls(chunks)
+
+    def scores(self, query):
+        terms = Counter(term for term in tokenize(query) if term in self.idf)
+        scores = []
+        for chunk, length in zip(self.chunks, self.lengths):
+            score = 0.0
+            norm = self.k1 * (1 - self.b + self.b * length / self.avg_length)
+            for term, query_count in terms.items():
+                tf = chunk['terms'].get(term, 0)
+                if tf:
+                    score += query_count * self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+    def select(self, query, token_budget, model="gpt-4o"):
+        """
+        점수가 높은 chunk 부터 token_budget 안에서 고르고, 읽기 쉽도록 원래 순서로 이어 붙인다.
+        (검색어와 겹치는 chunk 가 없으면 앞쪽 chunk 부터 채운다.)
+        :return: (passages text, selected chunk indexes)
+        """
+        scores = self.scores(query)
+        ranked = sorted(range(len(self.chunks)), key=lambda i: (-scores[i], i))
+        selected, used = [], 0
+        for i in ranked:
+            tokens = count_tokens(self.chunks[i]['text'], model)
+            if used + tokens > token_budget:
+                continue
+            selected.append(i)
+            used += tokens
+        selected.sort()
+        return "\n".join(f"- {self.chunks[i]['text']}" for i in selected), selected
+
+
+def detect_signals(df):
+    """
+    보조 지표가 포함된 OHLCV DataFrame 의 마지막 캔들 기준 지표 상태 (RSI 극단, 볼린저 밴드 이탈, MACD 교차)
+    """
+    last = df.iloc[-1]
+    signals = []
+    if last['rsi'] >= RSI_OVERBOUGHT:
+        signals.append('rsi_overbought')
+    elif last['rsi'] <= RSI_OVERSOLD:
+        signals.append('rsi_oversold')
+    if last['close'] > last['bb_bbh']:
+        signals.append('bb_upper_breakout')
+    elif last['close'] < last['bb_bbl']:
+        signals.append('bb_lower_breakout')
+    if len(df) > 1:
+        previous = df['macd_diff'].iloc[-2]
+        if previous < 0 <= last['macd_diff']:
+            signals.append('macd_golden_cross')
+        elif previous >= 0 > last['macd_diff']:
+            signals.append('macd_dead_cross')
+    return signals
+
+
+def build_query(signals):
+    return " ".join([BASE_QUERY] + [SIGNAL_QUERIES[signal] for signal in signals])
+
+
+def _read_source(source, cached_documents):
+    if source.startswith("youtube:"):
+        # 자막은 네트워크 요청이므로 이전 색인에 있으면 재사용한다.
+        if source in cached_documents:
+            return cached_documents[source]
+        return get_combined_transcript(video_id=source.split(":", 1)[1])
+    with open(source, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+class StrategyRetriever:
+    """
+    매매 기법 문서(strategy.txt, YouTube 자막)의 BM25 색인을 디스크에 캐시하고,
+    현재 지표 상태와 관련된 구절만 토큰 예산 안에서 골라 프롬프트에 넣는다.
+    문서 내용이 바뀌면(fingerprint 불일치) 색인을 다시 만든다.
+    """
+    def __init__(self, sources=DEFAULT_SOURCES, path=DEFAULT_INDEX_PATH):
+        self.sources = list(sources)
+        self.path = path
+        self.index = None
+        self._fingerprint = None
+        self._file_stats = None
+        self._lock = threading.Lock()
+
+    def _stats(self):
+        return [(source, os.stat(source).st_mtime_ns, os.stat(source).st_size)
+                for source in self.sources if not source.startswith("youtube:")]
+
+    def _load_cache(self):
+        if not os.path.exists(self.path):
+            return {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as ex:
+            logger.warning(f"[Warning] Failed to load strategy index : {ex}")
+            return {}
+
+    def _save_cache(self, cached):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cached, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+    def load(self):
+        """
+        파일이 바뀌지 않았으면 메모리의 색인을, 내용이 같으면 디스크 캐시를 사용하고, 그 외에는 색인을 새로 만든다.
+        :return: BM25Index
+        """
+        with self._lock:
+            stats = self._stats()
+            if self.index is not None and stats == self._file_stats:
+                return self.index
+
+            cached = self._load_cache()
+            documents = {source: _read_source(source, cached.get('documents', {})) for source in self.sources}
+            payload = json.dumps([documents, CHUNK_WORDS, CHUNK_OVERLAP], sort_keys=True, ensure_ascii=False)
+            fingerprint = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+            if cached.get('fingerprint') == fingerprint:
+                self.index = BM25Index(cached['chunks'])
+            else:
+                self.index = BM25Index.build(documents)
+                logger.info(f"Built strategy index : {len(self.index.chunks)} chunks from {len(documents)} sources")
+                try:
+                    self._save_cache({'fingerprint': fingerprint, 'documents': documents, 'chunks': self.index.chunks})
+                except OSError as ex:
+                    logger.warning(f"[Warning] Failed to save strategy index : {ex}")
+            self._fingerprint = fingerprint
+            self._file_stats = stats
+            return self.index
+
+    def retrieve(self, frames, token_budget, model="gpt-4o"):
+        """
+        :param frames: 보조 지표가 포함된 OHLCV DataFrame list (예: 일봉, 시간봉)
+        :param token_budget: 구절의 최대 토큰 수
+        :return: (passages text, signals)
+        """
+        signals = list(dict.fromkeys(signal for df in frames for signal in detect_signals(df)))
+        passages, _ = self.load().select(build_query(signals), token_budget=token_budget, model=model)
+        return passages, signals
+
+
+_strategy_retriever = None
+_strategy_retriever_lock = threading.Lock()
+
+
+def get_strategy_retriever():
+    """
+    프로세스 전역 StrategyRetriever (기본 문서 : strategy.txt)
+    """
+    global _strategy_retriever
+    with _strategy_retriever_lock:
+        if _strategy_retriever is None:
+            _strategy_retriever = StrategyRetriever()
+        return _strategy_retriever
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="매매 기법 문서 검색 (색인 확인용)")
+    parser.add_argument("query", nargs="?", default=BASE_QUERY)
+    parser.add_argument("--sources", default=",".join(DEFAULT_SOURCES), help="파일 경로 또는 youtube:<video_id> (쉼표 구분)")
+    parser.add_argument("--budget", type=int, default=600)
+    args = parser.parse_args()
+
+    index = StrategyRetriever(sources=args.sources.split(",")).load()
+    text, selected = index.select(args.query, token_budget=args.budget)
+    print(f"{len(selected)} / {len(index.chunks)} chunks, {count_tokens(text)} tokens")
+    print(text)
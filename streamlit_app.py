@@ -1,24 +1,90 @@
+import threading
+import time
+
 import pandas as pd
 import plotly.express as px
 import streamlit as st
 
+from datetime import datetime, timedelta
+
+from analytics_resource.downsampling import downsample
 from mongodb_connector import get_mongodb_client
+from trade_rollups import get_rollups
+
+COLUMNS = ['timestamp', 'decision', 'percentage', 'reason', 'eth_balance', 'krw_balance', 'eth_avg_buy_price', 'eth_krw_price', 'reflection']
+
+# 새 거래 기록 조회 최소 간격(초) : 매매 주기(10분)보다 짧으면 충분하다.
+REFRESH_INTERVAL = 30
+# 차트 series 당 최대 점 개수 (LTTB downsampling)
+MAX_CHART_POINTS = 2000
+# 표에 표시할 최근 거래 수
+MAX_TABLE_ROWS = 500
+
+PERIODS = {
+    "1 day": timedelta(days=1),
+    "7 days": timedelta(days=7),
+    "30 days": timedelta(days=30),
+    "90 days": timedelta(days=90),
+    "All": None,
+}
+
+
+class TradeHistory:
+    """
+    거래 기록을 메모리에 보관하고, 마지막으로 읽은 timestamp(high-water mark) 이후의 문서만 추가로 조회한다.
+    """
+    def __init__(self, collection="trading_result"):
+        self.collection = collection
+        self.df = pd.DataFrame(columns=COLUMNS)
+        self.high_water_mark = None
+        self._refreshed_at = 0
+        self._lock = threading.Lock()
+
+    def refresh(self, mongodb_client, force=False):
+        with self._lock:
+            if not force and time.monotonic() - self._refreshed_at < REFRESH_INTERVAL:
+                return self.df
+            query = {} if self.high_water_mark is None else {'timestamp': {'$gt': self.high_water_mark}}
+            raws = list(mongodb_client.autotradedb[self.collection].find(query, {'_id': 0}).sort('timestamp', 1))
+            if raws:
+                new_rows = pd.DataFrame(raws, columns=COLUMNS)
+                new_rows['timestamp'] = pd.to_datetime(new_rows['timestamp'])
+                self.df = new_rows if self.df.empty else pd.concat([self.df, new_rows], ignore_index=True)
+                self.high_water_mark = raws[-1]['timestamp']
+            self._refreshed_at = time.monotonic()
+            return self.df
 
 
-def load_data(mongodb_client):
-    raws = list(mongodb_client.autotradedb.trading_result.find({}, {'_id': 0}).sort('timestamp', -1).limit(14))
-    columns = ['timestamp', 'decision', 'percentage', 'reason', 'eth_balance', 'krw_balance', 'eth_avg_buy_price', 'eth_krw_price', 'reflection']
-    df = pd.DataFrame(raws, columns=columns)
+@st.cache_data(ttl=REFRESH_INTERVAL)
+def load_daily_summary(days=90, collection="trading_result"):
+    return get_rollups(get_mongodb_client(), period='day', days=days, collection=collection)
+
+@st.cache_resource
+def get_trade_history(collection="trading_result"):
+    # rerun / 세션 간에 공유된다.
+    return TradeHistory(collection=collection)
+
+def load_data(mongodb_client, period=None, collection="trading_result", force=False):
+    df = get_trade_history(collection).refresh(mongodb_client, force=force)
+    if period is not None and not df.empty:
+        df = df[df['timestamp'] >= datetime.now() - period]
     return df
 
+def line_chart(df, y, title):
+    # 긴 시계열은 모양을 유지하며 점 개수를 줄여서 그린다.
+    return px.line(downsample(df, x='timestamp', y=y, threshold=MAX_CHART_POINTS), x='timestamp', y=y, title=title)
+
 def main():
     st.title("Ethereum Trades Viewer")
 
     # Get Mongodb Client
     mongodb_client = get_mongodb_client()
 
+    period = st.sidebar.selectbox("Period", list(PERIODS), index=1)
+    force = st.sidebar.button("Refresh")
+
     # 데이터 로드
-    df = load_data(mongodb_client=mongodb_client)
+    df = load_data(mongodb_client=mongodb_client, period=PERIODS[period], force=force)
 
     # 기본 통계
     st.header("Basic Statistics")
@@ -26,9 +92,9 @@ def main():
     st.write(f"First trade date: {df['timestamp'].min()}")
     st.write(f"Last trade date: {df['timestamp'].max()}")
 
-    # 거래 내역 표시
+    # 거래 내역 표시 (최근 거래 순)
     st.header("Trade History")
-    st.dataframe(df)
+    st.dataframe(df.iloc[::-1].head(MAX_TABLE_ROWS))
 
     # 거래 결정 분포
     st.header("Trade Decision Distribution")
@@ -40,20 +106,27 @@ def main():
     )
     st.plotly_chart(fig)
 
+    # 일별 요약 (rollup)
+    st.header('Daily Summary')
+    daily = load_daily_summary()
+    if not daily.empty:
+        st.dataframe(daily[['period_start', 'trades', 'buy_count', 'sell_count', 'hold_count', 'avg_position',
+                            'close_position', 'realized_pnl', 'open_equity', 'close_equity', 'min_equity',
+                            'max_equity']].iloc[::-1])
+        st.plotly_chart(px.bar(daily, x='period_start', y='realized_pnl', title='Realized PnL (KRW)'))
+        st.plotly_chart(px.line(daily, x='period_start', y='close_equity', title='Equity (KRW)'))
+
     # ETH 잔액 변화
     st.header('ETH Balance over time')
-    fig = px.line(df, x='timestamp', y='eth_balance', title='ETH Balance')
-    st.plotly_chart(fig)
+    st.plotly_chart(line_chart(df, y='eth_balance', title='ETH Balance'))
 
     # KRW 잔액 변화
     st.header('KRW Balance over time')
-    fig = px.line(df, x='timestamp', y='krw_balance', title='KRW Balance')
-    st.plotly_chart(fig)
+    st.plotly_chart(line_chart(df, y='krw_balance', title='KRW Balance'))
 
     # ETH 가격 변화
     st.header('ETH Price over time')
-    fig = px.line(df, x='timestamp', y='eth_krw_price', title='ETH Price (KRW)')
-    st.plotly_chart(fig)
+    st.plotly_chart(line_chart(df, y='eth_krw_price', title='ETH Price (KRW)'))
 
 if __name__ == '__main__':
     main()
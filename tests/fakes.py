@@ -0,0 +1,284 @@
+"""
+테스트용 고정 데이터 / MongoDB 대체 client
+- FakeMongoClient 는 테스트 대상 코드가 사용하는 pymongo 연산만 흉내 낸다.
+"""
+import random
+
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from bson import ObjectId
+from pymongo import ReplaceOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from pymongo.results import BulkWriteResult
+
+DUPLICATE_KEY_ERROR = 11000
+
+
+def make_candles(count, seed=42, start="2025-01-01", freq="h"):
+    """
+    랜덤 워크 기반 가상 캔들 (오래된 순서)
+    """
+    rng = np.random.default_rng(seed)
+    close = 4_000_000 * np.exp(np.cumsum(rng.normal(0, 0.01, count)))
+    index = pd.date_range(start, periods=count, freq=freq)
+    return pd.DataFrame({'open': close, 'high': close * 1.01, 'low': close * 0.99, 'close': close,
+                         'volume': 1.0, 'value': close}, index=index)
+
+
+def make_trade_history(count, end=None, interval=timedelta(minutes=10), seed=42):
+    """
+    trading_result collection 형식의 거래 기록 (오래된 순서)
+    """
+    rng = random.Random(seed)
+    end = end or datetime(2025, 3, 1)
+    price = 4_000_000.0
+    krw, eth = 1_000_000.0, 0.0
+    records = []
+    for i in range(count):
+        price *= 1 + rng.gauss(0, 0.005)
+        decision = rng.choice(('buy', 'sell', 'hold'))
+        percentage = 0 if decision == 'hold' else rng.randint(1, 100)
+        if decision == 'buy':
+            funds = krw * percentage / 100
+            krw, eth = krw - funds, eth + funds / price
+        elif decision == 'sell':
+            volume = eth * percentage / 100
+            krw, eth = krw + volume * price, eth - volume
+        records.append({
+            'timestamp': end - interval * (count - 1 - i),
+            'decision': decision.upper(),
+            'percentage': percentage,
+            'reason': "test",
+            'eth_balance': eth,
+            'krw_balance': krw,
+            'eth_avg_buy_price': price,
+            'eth_krw_price': price,
+            'reflection': "",
+        })
+    return records
+
+
+def _compare(value, operand, compare):
+    # MongoDB 와 같이 타입이 다른 값(예: 문자열 timestamp 와 datetime)은 비교 조건에 맞지 않는다.
+    if value is None or not isinstance(value, type(operand)) and not isinstance(operand, type(value)):
+        return False
+    return compare(value, operand)
+
+
+COMPARISONS = {
+    '$gte': lambda value, operand: value >= operand,
+    '$gt': lambda value, operand: value > operand,
+    '$lte': lambda value, operand: value <= operand,
+    '$lt': lambda value, operand: value < operand,
+}
+BSON_TYPES = {'string': str, 'date': datetime, 'double': float}
+
+
+def _condition(value, operator, operand):
+    if operator == '$type':
+        return isinstance(value, BSON_TYPES[operand])
+    return _compare(value, operand, COMPARISONS[operator])
+
+
+def matches(document, query):
+    for field, condition in query.items():
+        value = document.get(field)
+        if isinstance(condition, dict):
+            if not all(_condition(value, operator, operand) for operator, operand in condition.items()):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+def project(document, projection):
+    if not projection:
+        return dict(document)
+    included = [field for field, include in projection.items() if include and field != '_id']
+    if included:
+        projected = {field: document[field] for field in included if field in document}
+        if projection.get('_id', 1) and '_id' in document:
+            projected['_id'] = document['_id']
+        return projected
+    return {field: value for field, value in document.items() if projection.get(field, 1)}
+
+
+EXPRESSIONS = {
+    '$add': lambda *values: sum(values),
+    '$multiply': lambda first, second: first * second,
+    '$subtract': lambda first, second: first - second,
+    '$divide': lambda first, second: first / second,
+    '$eq': lambda first, second: first == second,
+    '$gt': lambda first, second: first > second,
+    '$toLower': lambda value: value.lower(),
+}
+
+
+def evaluate(expression, document):
+    """
+    aggregation 식 계산 (필드 참조 '$field', EXPRESSIONS 의 연산자, $cond)
+    """
+    if isinstance(expression, str) and expression.startswith('$'):
+        return document.get(expression[1:])
+    if isinstance(expression, dict):
+        (operator, operands), = expression.items()
+        if operator == '$cond':
+            condition, then, otherwise = operands
+            return evaluate(then if evaluate(condition, document) else otherwise, document)
+        operands = operands if isinstance(operands, list) else [operands]
+        return EXPRESSIONS[operator](*(evaluate(operand, document) for operand in operands))
+    return expression
+
+
+ACCUMULATORS = {
+    '$sum': lambda values: sum(values),
+    '$first': lambda values: values[0],
+    '$last': lambda values: values[-1],
+    '$min': lambda values: min(values),
+    '$max': lambda values: max(values),
+}
+
+
+def _project_stage(document, projection):
+    projected = {'_id': document['_id']} if '_id' in document and projection.get('_id', 1) else {}
+    for field, expression in projection.items():
+        if field == '_id':
+            continue
+        if expression in (1, True):
+            if field in document:
+                projected[field] = document[field]
+        else:
+            projected[field] = evaluate(expression, document)
+    return projected
+
+
+def _group_stage(documents, group):
+    groups = {}
+    for document in documents:
+        groups.setdefault(evaluate(group['_id'], document), []).append(document)
+    results = []
+    for key, members in groups.items():
+        result = {'_id': key}
+        for field, accumulator in group.items():
+            if field == '_id':
+                continue
+            (operator, expression), = accumulator.items()
+            result[field] = ACCUMULATORS[operator]([evaluate(expression, member) for member in members])
+        results.append(result)
+    return results
+
+
+def aggregate(documents, pipeline):
+    """
+    $match / $sort / $project / $group 만 지원한다.
+    """
+    documents = [dict(document) for document in documents]
+    for stage in pipeline:
+        (name, spec), = stage.items()
+        if name == '$match':
+            documents = [document for document in documents if matches(document, spec)]
+        elif name == '$sort':
+            for key, direction in reversed(list(spec.items())):
+                documents.sort(key=lambda document: document.get(key), reverse=direction < 0)
+        elif name == '$project':
+            documents = [_project_stage(document, spec) for document in documents]
+        elif name == '$group':
+            documents = _group_stage(documents, spec)
+        else:
+            raise NotImplementedError(f"unsupported stage : {name}")
+    return documents
+
+
+class FakeCursor:
+    def __init__(self, documents):
+        self._documents = documents
+
+    def sort(self, key, direction=1):
+        self._documents.sort(key=lambda document: document.get(key), reverse=direction < 0)
+        return self
+
+    def limit(self, count):
+        if count:
+            self._documents = self._documents[:count]
+        return self
+
+    def __iter__(self):
+        return iter(self._documents)
+
+
+class FakeCollection:
+    def __init__(self):
+        self.documents = []
+        self._ids = set()
+
+    def insert_one(self, document):
+        self.insert_many([document])
+
+    def insert_many(self, documents, ordered=True):
+        """
+        중복 _id 는 pymongo 와 같이 BulkWriteError(code 11000) 로 알린다.
+        """
+        errors = []
+        for index, document in enumerate(documents):
+            document.setdefault('_id', ObjectId())
+            if document['_id'] in self._ids:
+                errors.append({'index': index, 'code': DUPLICATE_KEY_ERROR, 'op': document})
+                if ordered:
+                    break
+                continue
+            self._ids.add(document['_id'])
+            self.documents.append(dict(document))
+        if errors:
+            raise BulkWriteError({'writeErrors': errors})
+
+    def find(self, query=None, projection=None):
+        return FakeCursor([project(document, projection) for document in self.documents
+                           if matches(document, query or {})])
+
+    def count_documents(self, query):
+        return sum(1 for document in self.documents if matches(document, query))
+
+    def aggregate(self, pipeline):
+        return iter(aggregate(self.documents, pipeline))
+
+    def bulk_write(self, requests, ordered=True):
+        modified = upserted = 0
+        for request in requests:
+            assert isinstance(request, (ReplaceOne, UpdateOne)), f"unsupported request : {request}"
+            existing = next((document for document in self.documents if matches(document, request._filter)), None)
+            if existing is not None:
+                if isinstance(request, UpdateOne):
+                    existing.update(request._doc['$set'])
+                else:
+                    replaced = {'_id': existing['_id'], **request._doc}
+                    existing.clear()
+                    existing.update(replaced)
+                modified += 1
+            elif request._upsert:
+                self.insert_one(dict(request._doc))
+                upserted += 1
+        return BulkWriteResult({'nModified': modified, 'nUpserted': upserted}, acknowledged=True)
+
+
+class FakeDatabase(dict):
+    def __missing__(self, name):
+        collection = self[name] = FakeCollection()
+        return collection
+
+
+class FakeMongoClient:
+    """
+    mongodb_client.autotradedb[collection] (또는 mongodb_client['autotradedb'][collection]) 접근만 지원한다.
+    """
+    def __init__(self):
+        self.autotradedb = FakeDatabase()
+
+    def __getitem__(self, name):
+        assert name == 'autotradedb', f"unsupported database : {name}"
+        return self.autotradedb
+
+    def close(self):
+        pass
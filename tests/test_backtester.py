@@ -0,0 +1,66 @@
+import pytest
+
+from analytics_resource.indicators import add_indicators
+from backtester import CannedDecisionPolicy, RuleBasedPolicy, expand_grid, run_backtest, run_sweep
+from exchange_adapter import SimulatedExchange
+from tests.fakes import make_candles
+from trading_decision import execute_decision
+
+DECISIONS = [
+    {'decision': 'buy', 'percentage': 40, 'reason': ""},
+    {'decision': 'hold', 'percentage': 0, 'reason': ""},
+    {'decision': 'buy', 'percentage': 100, 'reason': ""},
+    {'decision': 'sell', 'percentage': 30, 'reason': ""},
+    {'decision': 'sell', 'percentage': 100, 'reason': ""},
+]
+
+
+@pytest.fixture(scope="module")
+def candles():
+    return add_indicators(df=make_candles(300))
+
+
+def test_matches_simulated_exchange(candles):
+    result = run_backtest(candles, CannedDecisionPolicy(DECISIONS), warmup=0)
+
+    # 같은 판단을 거래소 adapter 로 실행한 결과와 같아야 한다. (주문 크기 / 수수료 규칙)
+    prices = iter(candles['close'])
+    price = None
+    exchange = SimulatedExchange(balances=[{'currency': 'KRW', 'balance': 1_000_000}],
+                                 price_source=lambda ticker: price)
+    policy = CannedDecisionPolicy(DECISIONS)
+    orders = 0
+    for price in prices:
+        order_book = {'orderbook_units': [{'ask_price': price, 'bid_price': price}]}
+        if execute_decision(exchange, policy.decide(None, None), "KRW-ETH", lambda ticker: order_book, verbose=False):
+            orders += 1
+
+    equity = exchange.get_balance("KRW") + exchange.get_balance("ETH") * candles['close'].iloc[-1]
+    assert result['final_equity'] == pytest.approx(equity)
+    assert result['trades'] == orders
+    assert result['decisions'] == {'BUY': 120, 'SELL': 120, 'HOLD': 60}
+
+
+def test_warmup_and_decision_interval(candles):
+    result = run_backtest(candles, CannedDecisionPolicy(DECISIONS), warmup=100, decision_every=10, keep_equity=True)
+    assert sum(result['decisions'].values()) == 20
+    assert len(result['equity']) == len(candles)
+    # 첫 판단 전에는 초기 자산 그대로
+    assert (result['equity'].iloc[:100] == 1_000_000).all()
+    assert result['max_drawdown_pct'] <= 0
+
+
+def test_canned_policy_without_repeat():
+    policy = CannedDecisionPolicy(DECISIONS[:2], repeat=False)
+    assert [policy.decide(None, None).decision for _ in range(4)] == ['buy', 'hold', 'hold', 'hold']
+
+
+def test_sweep_matches_serial_runs(candles):
+    grid = expand_grid({'rsi_buy': [30, 40], 'rsi_sell': [60, 70], 'use_bb': [False]})
+    assert len(grid) == 4
+    results = run_sweep(candles, RuleBasedPolicy, grid, max_workers=2)
+    returns = [result['total_return_pct'] for result in results]
+    assert returns == sorted(returns, reverse=True)
+    for result in results:
+        expected = run_backtest(candles, RuleBasedPolicy(**result['params']))
+        assert result['total_return_pct'] == pytest.approx(expected['total_return_pct'])
@@ -0,0 +1,28 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from analytics_resource.batch_indicators import add_indicators_vectorized, compute_indicators_batch, stack_closes
+from analytics_resource.incremental_indicators import INDICATOR_COLUMNS
+from analytics_resource.indicators import add_indicators
+from tests.fakes import make_candles
+
+
+@pytest.mark.parametrize("count", [24, 30, 200, 2000])
+def test_vectorized_matches_ta(count):
+    df = make_candles(count)
+    expected = add_indicators(df=df.copy())
+    actual = add_indicators_vectorized(df=df)
+    pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-9, atol=1e-9)
+    # 입력 DataFrame 은 바꾸지 않는다.
+    assert list(df.columns) == ['open', 'high', 'low', 'close', 'volume', 'value']
+
+
+def test_batch_matches_ta_for_tickers_with_short_history():
+    frames = {f"KRW-T{i}": make_candles(120, seed=i).iloc[i * 15:] for i in range(5)}
+    tickers, index, closes = stack_closes(frames)
+    indicators = compute_indicators_batch(closes)
+    for row, ticker in enumerate(tickers):
+        expected = add_indicators(df=frames[ticker].copy()).reindex(index)
+        for column in INDICATOR_COLUMNS:
+            np.testing.assert_allclose(indicators[column][row], expected[column], rtol=1e-9, atol=1e-9, equal_nan=True)
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from analytics_resource import candle_store
+from analytics_resource.candle_store import KST, CandleStore
+from tests.fakes import make_candles
+
+TICKER, INTERVAL = "KRW-ETH", "minute60"
+
+
+@pytest.fixture
+def market(monkeypatch):
+    """
+    현재 진행 중인 시간봉까지의 가상 캔들과 request_ohlcv 호출 기록
+    """
+    now = datetime.now(KST).replace(tzinfo=None, minute=0, second=0, microsecond=0)
+    candles = make_candles(300, start=now - timedelta(hours=299), freq="h")
+    calls = []
+
+    def request_ohlcv(ticker, interval, count, to=None):
+        calls.append({'count': count, 'to': to})
+        # pyupbit 의 to 는 UTC 기준이며 그 이전 캔들만 반환한다.
+        df = candles if to is None else candles[candles.index < pd.Timestamp(to) + timedelta(hours=9)]
+        return df.tail(count).copy()
+
+    monkeypatch.setattr(candle_store, "request_ohlcv", request_ohlcv)
+    return candles, calls
+
+
+def test_fetches_once_then_serves_from_store(tmp_path, market):
+    candles, calls = market
+    store = CandleStore(store_dir=str(tmp_path))
+    pd.testing.assert_frame_equal(store.get_ohlcv(TICKER, INTERVAL, count=100), candles.tail(100), check_freq=False)
+    # 진행 중인 캔들을 최근에 조회했으므로 네트워크 호출 없이 반환한다.
+    pd.testing.assert_frame_equal(store.get_ohlcv(TICKER, INTERVAL, count=100), candles.tail(100), check_freq=False)
+    assert len(calls) == 1
+    assert (tmp_path / f"{TICKER}_{INTERVAL}.parquet").exists()
+
+
+def test_fetches_only_new_candles_and_replaces_in_progress_candle(tmp_path, market):
+    candles, calls = market
+    stored = candles.iloc[-105:-5].copy()
+    # 저장할 때 진행 중이던 마지막 캔들
+    stored.iloc[-1, stored.columns.get_loc('close')] = -1.0
+    stored.to_parquet(tmp_path / f"{TICKER}_{INTERVAL}.parquet")
+
+    store = CandleStore(store_dir=str(tmp_path))
+    df = store.get_ohlcv(TICKER, INTERVAL, count=100)
+    pd.testing.assert_frame_equal(df, candles.tail(100), check_freq=False)
+    assert len(calls) == 1 and calls[0]['to'] is None
+    # 마지막 저장 캔들부터 현재 캔들까지만 조회한다.
+    assert calls[0]['count'] == 6
+    assert not store.read(TICKER, INTERVAL).index.duplicated().any()
+    assert len(store.read(TICKER, INTERVAL)) == 105
+
+
+def test_fetches_older_candles_when_store_is_short(tmp_path, market):
+    candles, calls = market
+    store = CandleStore(store_dir=str(tmp_path))
+    store.get_ohlcv(TICKER, INTERVAL, count=10)
+    df = store.get_ohlcv(TICKER, INTERVAL, count=50)
+
+    pd.testing.assert_frame_equal(df, candles.tail(50), check_freq=False)
+    assert calls[-1]['count'] == 40 and calls[-1]['to'] is not None
+    # 다시 시작해도 저장된 캔들을 사용한다.
+    restarted = CandleStore(store_dir=str(tmp_path))
+    pd.testing.assert_frame_equal(restarted.get_ohlcv(TICKER, INTERVAL, count=50), candles.tail(50), check_freq=False)
+    assert len(calls) == 2
@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+from data_collector import DataCollectionError, DataSource, collect_data
+
+
+def slow(value, seconds):
+    def fetch():
+        time.sleep(seconds)
+        return value
+    return fetch
+
+
+def failing():
+    raise ConnectionError("upstream is not available")
+
+
+def test_sources_run_concurrently():
+    sources = [DataSource(f"source{i}", slow(i, 0.2), timeout=2) for i in range(4)]
+    results, timings = collect_data(sources)
+    assert results == {f"source{i}": i for i in range(4)}
+    assert timings['total'] < 0.6
+    assert set(timings) == {f"source{i}" for i in range(4)} | {'total'}
+
+
+def test_optional_source_timeout_does_not_block_the_stage():
+    release = threading.Event()
+    sources = [
+        DataSource("candles", slow("candles", 0.05), timeout=2),
+        DataSource("news", lambda: release.wait(5) and "late", timeout=0.2, required=False),
+    ]
+    try:
+        started_at = time.perf_counter()
+        results, timings = collect_data(sources)
+        elapsed = time.perf_counter() - started_at
+    finally:
+        release.set()
+    assert results == {'candles': "candles", 'news': None}
+    # 느린 소스를 기다리지 않고 타임아웃 시점에 단계를 끝낸다.
+    assert 0.2 <= elapsed < 1
+    assert timings['news'] >= 0.2
+
+
+def test_optional_source_failure_is_missing():
+    results, _ = collect_data([DataSource("candles", lambda: "candles"),
+                               DataSource("fear_greed_index", failing, required=False)])
+    assert results == {'candles': "candles", 'fear_greed_index': None}
+
+
+def test_required_source_failure_fails_the_stage():
+    with pytest.raises(DataCollectionError, match="orderbook"):
+        collect_data([DataSource("candles", lambda: "candles"), DataSource("orderbook", failing)])
+
+    release = threading.Event()
+    try:
+        with pytest.raises(DataCollectionError, match="timeout"):
+            collect_data([DataSource("orderbook", lambda: release.wait(5), timeout=0.1)])
+    finally:
+        release.set()
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from decision_gate import DecisionGate
+
+NOW = datetime(2025, 3, 1, 12, 0)
+SNAPSHOT = {'price': 4_000_000.0, 'rsi': 50.0, 'macd_diff': 1.0, 'bb_zone': 0, 'position': 0.5}
+
+
+def changed(**values):
+    return {**SNAPSHOT, **values}
+
+
+@pytest.mark.parametrize("current, reasons", [
+    (changed(), []),
+    (changed(price=4_019_000.0), []),
+    (changed(price=4_021_000.0), ["price"]),
+    (changed(price=3_980_000.0), ["price"]),
+    (changed(rsi=54.9), []),
+    (changed(rsi=55.0), ["rsi"]),
+    (changed(macd_diff=-0.1), ["macd cross"]),
+    (changed(macd_diff=0.0), []),
+    (changed(bb_zone=1), ["bollinger band"]),
+    (changed(position=0.519), []),
+    (changed(position=0.48), ["position"]),
+    (changed(price=4_100_000.0, bb_zone=1, position=0.6), ["price", "bollinger band", "position"]),
+    (changed(rsi=float('nan')), ["missing indicator"]),
+    (changed(macd_diff=None), ["missing indicator"]),
+])
+def test_changes_thresholds(current, reasons):
+    assert DecisionGate().changes(SNAPSHOT, current) == reasons
+
+
+@pytest.mark.parametrize("previous_rsi, current_rsi, crossed", [
+    (68.0, 70.0, True),  # 과매수 진입
+    (71.0, 69.0, True),  # 과매수 이탈
+    (32.0, 30.0, True),  # 과매도 진입
+    (31.0, 33.0, False),
+    (72.0, 76.0, False),
+])
+def test_rsi_zone_crossings(previous_rsi, current_rsi, crossed):
+    reasons = DecisionGate().changes(changed(rsi=previous_rsi), changed(rsi=current_rsi))
+    assert ("rsi" in reasons) == crossed
+
+
+def last_record(decided_at, snapshot=SNAPSHOT):
+    return {'decision': 'BUY', 'reflection': "previous reflection",
+            'gate': {'skipped': False, 'reasons': [], 'snapshot': snapshot, 'decided_at': decided_at}}
+
+
+def test_check_skips_without_changes():
+    gate = DecisionGate()
+    result = gate.check(last_record(NOW - timedelta(minutes=10)), changed(rsi=52.0), now=NOW)
+    assert result.skip
+    # 직전 판단이 BUY 여도 주문을 반복하지 않는다.
+    assert result.decision.decision == 'hold' and result.decision.percentage == 0
+    assert result.reflection == "previous reflection"
+    # 비교 기준은 마지막 AI 판단의 snapshot 으로 유지한다.
+    assert result.snapshot == SNAPSHOT and result.decided_at == NOW - timedelta(minutes=10)
+    assert gate.get_stats()['skips'] == 1
+
+
+@pytest.mark.parametrize("record, enabled, reasons", [
+    (None, True, ["no previous snapshot"]),
+    (last_record(NOW - timedelta(hours=1)), True, ["max age"]),
+    (last_record(NOW - timedelta(minutes=10)), False, ["disabled"]),
+])
+def test_check_calls_llm(record, enabled, reasons):
+    result = DecisionGate(enabled=enabled).check(record, SNAPSHOT, now=NOW)
+    assert not result.skip
+    assert result.reasons == reasons
+    assert result.decided_at == NOW
@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from analytics_resource.downsampling import downsample, lttb
+
+
+def test_selects_threshold_points_in_order():
+    rng = np.random.default_rng(42)
+    y = np.cumsum(rng.normal(size=10_000))
+    selected = lttb(np.arange(len(y)), y, 500)
+    assert len(selected) == 500
+    assert selected[0] == 0 and selected[-1] == len(y) - 1
+    assert (np.diff(selected) > 0).all()
+
+
+def test_keeps_spikes():
+    y = np.zeros(1_000)
+    y[123], y[777] = 50.0, -50.0
+    selected = lttb(np.arange(len(y)), y, 20)
+    assert 123 in selected and 777 in selected
+
+
+def test_short_series_and_small_threshold_are_unchanged():
+    assert lttb([0, 1, 2], [1.0, 2.0, 3.0], 10).tolist() == [0, 1, 2]
+    assert lttb(np.arange(100), np.arange(100), 2).tolist() == list(range(100))
+
+
+def test_datetime_x_and_missing_values():
+    x = pd.date_range("2025-01-01", periods=1_000, freq="10min").values
+    y = np.sin(np.linspace(0, 20, 1_000))
+    y[100:200] = np.nan
+    selected = lttb(x, y, 50)
+    assert len(selected) == 50 and (np.diff(selected) > 0).all()
+
+
+def test_downsample_dataframe():
+    df = pd.DataFrame({'timestamp': pd.date_range("2025-01-01", periods=5_000, freq="min"),
+                       'krw_balance': np.linspace(0, 1, 5_000)})
+    assert downsample(df, 'timestamp', 'krw_balance', threshold=5_000) is df
+    sampled = downsample(df, 'timestamp', 'krw_balance', threshold=300)
+    assert len(sampled) == 300
+    assert sampled.index[0] == 0 and sampled.index[-1] == 4_999
@@ -0,0 +1,78 @@
+import pytest
+
+from exchange_adapter import Exchange, Portfolio
+
+
+def test_portfolio_average_buy_price_and_fees():
+    portfolio = Portfolio([{'currency': 'KRW', 'balance': '1000000', 'locked': '0', 'avg_buy_price': '0'}])
+    portfolio.apply_fill('bid', "KRW-ETH", volume=0.1, funds=400_000, fee=200)
+    portfolio.apply_fill('bid', "KRW-ETH", volume=0.1, funds=500_000, fee=250)
+    assert portfolio.balance("ETH") == pytest.approx(0.2)
+    assert portfolio.avg_buy_price("ETH") == pytest.approx(4_500_000)
+    assert portfolio.balance("KRW") == pytest.approx(1_000_000 - 900_000 - 450)
+
+    portfolio.apply_fill('ask', "KRW-ETH", volume=0.15, funds=750_000, fee=375)
+    assert portfolio.balance("ETH") == pytest.approx(0.05)
+    # 매도는 평균 매수가를 바꾸지 않는다.
+    assert portfolio.avg_buy_price("ETH") == pytest.approx(4_500_000)
+    assert portfolio.balance("KRW") == pytest.approx(100_000 - 450 + 750_000 - 375)
+    # pyupbit get_balances 와 같이 숫자는 문자열로 반환한다.
+    balances = {balance['currency']: balance for balance in portfolio.to_list()}
+    assert float(balances["ETH"]['balance']) == pytest.approx(0.05)
+    assert balances["ETH"]['avg_buy_price'] == "4500000.0"
+
+
+class FakeExchange(Exchange):
+    """
+    거래소 응답을 직접 지정하는 adapter
+    """
+    def __init__(self, balances, order, fills, **kwargs):
+        super().__init__(**kwargs)
+        self.balances = balances
+        self.order = order
+        self.fills = fills
+        self.fetches = 0
+
+    def _fetch_balances(self):
+        self.fetches += 1
+        return self.balances
+
+    def _place_order(self, side, ticker, amount):
+        return self.order
+
+    def _wait_for_fills(self, order):
+        return self.fills
+
+
+BALANCES = [{'currency': 'KRW', 'balance': '1000000'}]
+
+
+def test_confirmed_fill_updates_local_state_without_fetching():
+    exchange = FakeExchange(BALANCES, order={'uuid': "order-1"}, fills=(0.1, 400_000, 200))
+    assert exchange.get_balance("KRW") == 1_000_000
+    exchange.buy_market_order("KRW-ETH", 400_000)
+    assert exchange.get_balance("ETH") == pytest.approx(0.1)
+    assert exchange.get_balance("KRW") == pytest.approx(599_800)
+    assert exchange.fetches == 1
+
+
+@pytest.mark.parametrize("order, fills", [
+    ({'error': {'name': 'insufficient_funds'}}, None),  # 주문 실패
+    ({'uuid': "order-1"}, None),  # 체결 확인 실패
+])
+def test_unconfirmed_orders_reconcile_on_next_read(order, fills):
+    exchange = FakeExchange(BALANCES, order=order, fills=fills)
+    exchange.get_balance("KRW")
+    assert exchange.buy_market_order("KRW-ETH", 400_000) == order
+
+    exchange.balances = [{'currency': 'KRW', 'balance': '600000'}, {'currency': 'ETH', 'balance': '0.1'}]
+    assert exchange.get_balance("ETH") == pytest.approx(0.1)
+    assert exchange.get_balance("KRW") == pytest.approx(600_000)
+    assert exchange.fetches == 2
+
+
+def test_reconciles_after_interval():
+    exchange = FakeExchange(BALANCES, order=None, fills=None, reconcile_interval=0)
+    exchange.get_balance("KRW")
+    exchange.get_balance("KRW")
+    assert exchange.fetches == 2
@@ -0,0 +1,37 @@
+import numpy as np
+
+from analytics_resource.incremental_indicators import INDICATOR_COLUMNS, IncrementalIndicators, IndicatorStream
+from analytics_resource.indicators import add_indicators
+from tests.fakes import make_candles
+
+WINDOW = 120
+
+
+def assert_same(actual, expected):
+    np.testing.assert_allclose(actual[INDICATOR_COLUMNS], expected[INDICATOR_COLUMNS], rtol=1e-9, equal_nan=True)
+
+
+def test_first_cycle_matches_add_indicators():
+    frame = make_candles(WINDOW)
+    assert_same(IndicatorStream().update_dataframe(frame), add_indicators(df=frame.copy()))
+
+
+def test_next_cycles_only_append_closed_candles():
+    candles = make_candles(300)
+    stream = IndicatorStream()
+    expected = IncrementalIndicators().update_dataframe(candles.copy())
+    for end in (WINDOW, WINDOW, WINDOW + 1, WINDOW + 5, WINDOW + 100):
+        frame = candles.iloc[end - WINDOW:end].copy()
+        # 진행 중인 마지막 캔들 가격이 주기마다 바뀌어도 마감된 캔들의 값에는 영향이 없다.
+        frame.iloc[-1, frame.columns.get_loc('close')] *= 1.01
+        actual = stream.update_dataframe(frame)
+        assert_same(actual.iloc[:-1], expected.loc[frame.index[:-1]])
+        assert stream.last_index == frame.index[-2]
+
+
+def test_gap_reseeds_from_frame():
+    candles = make_candles(500)
+    stream = IndicatorStream()
+    stream.update_dataframe(candles.iloc[:WINDOW])
+    frame = candles.iloc[-WINDOW:]
+    assert_same(stream.update_dataframe(frame), add_indicators(df=frame.copy()))
@@ -0,0 +1,77 @@
+import pytest
+
+from auto_trade import load_paper_balances
+from exchange_adapter import DEFAULT_FEE_RATE, SimulatedExchange
+from paper_trading import PaperExchange, fill_market_order
+
+ORDER_BOOK = {'orderbook_units': [
+    {'ask_price': 1000.0, 'ask_size': 1.0, 'bid_price': 990.0, 'bid_size': 2.0},
+    {'ask_price': 1010.0, 'ask_size': 2.0, 'bid_price': 980.0, 'bid_size': 1.0},
+]}
+
+
+def test_bid_walks_the_depth():
+    fill = fill_market_order(ORDER_BOOK, 'bid', 2010.0, fee_rate=0.001)
+    assert [(trade['price'], trade['volume']) for trade in fill['trades']] == [(1000.0, 1.0), (1010.0, 1.0)]
+    assert fill['volume'] == pytest.approx(2.0)
+    assert fill['funds'] == pytest.approx(2010.0)
+    assert fill['fee'] == pytest.approx(2.01)
+    assert fill['avg_price'] == pytest.approx(1005.0)
+    assert fill['slippage_bps'] == pytest.approx(50.0)
+    assert fill['remaining'] == pytest.approx(0.0)
+
+
+def test_ask_stops_at_the_end_of_the_book():
+    fill = fill_market_order(ORDER_BOOK, 'ask', 5.0, fee_rate=0.001)
+    assert fill['volume'] == pytest.approx(3.0)
+    assert fill['funds'] == pytest.approx(990.0 * 2 + 980.0)
+    assert fill['fee'] == pytest.approx(fill['funds'] * 0.001)
+    assert fill['remaining'] == pytest.approx(2.0)
+
+
+def make_paper_exchange(krw=10_000.0, eth=0.0):
+    return PaperExchange(balances=[{'currency': 'KRW', 'balance': krw}, {'currency': 'ETH', 'balance': eth}],
+                         orderbook_source=lambda ticker: ORDER_BOOK)
+
+
+def test_partial_fill_is_cancelled_and_applied():
+    exchange = make_paper_exchange(eth=5.0)
+    order = exchange.sell_market_order("KRW-ETH", 5.0)
+    assert order['state'] == 'cancel'
+    assert exchange.get_balance("ETH") == pytest.approx(2.0)
+    assert exchange.get_balance("KRW") == pytest.approx(10_000.0 + 2960.0 * (1 - DEFAULT_FEE_RATE))
+
+
+@pytest.mark.parametrize("create", [
+    make_paper_exchange,
+    lambda krw: SimulatedExchange(balances=[{'currency': 'KRW', 'balance': krw}], price_source=lambda ticker: 1000.0),
+])
+def test_buy_fee_is_charged_on_top(create):
+    exchange = create(krw=2_000.0)
+    exchange.buy_market_order("KRW-ETH", 500.0)
+    assert exchange.get_balance("ETH") == pytest.approx(0.5)
+    assert exchange.get_balance("KRW") == pytest.approx(2_000.0 - 500.0 * (1 + DEFAULT_FEE_RATE))
+
+    # 잔고를 넘는 주문은 수수료를 포함해 잔고만큼만 체결된다.
+    exchange.buy_market_order("KRW-ETH", 1_000_000.0)
+    assert exchange.get_balance("KRW") == pytest.approx(0.0, abs=1e-6)
+    assert exchange.buy_market_order("KRW-ETH", 500.0)['error']['name'] == 'insufficient_funds'
+
+
+def test_paper_balances_continue_from_last_records():
+    records = {
+        "paper_trading_result": {'timestamp': 2, 'eth_balance': 0.5, 'eth_avg_buy_price': 4_000_000,
+                                 'krw_balance': 300_000},
+        "paper_trading_result_btc": {'timestamp': 1, 'eth_balance': 0.01, 'eth_avg_buy_price': 90_000_000,
+                                     'krw_balance': 500_000},
+    }
+    balances = {balance['currency']: balance
+                for balance in load_paper_balances(records.get, ["KRW-ETH", "KRW-BTC", "KRW-XRP"])}
+    assert set(balances) == {'KRW', 'ETH', 'BTC'}
+    # 원화는 모든 마켓이 공유하므로 가장 최근 기록을 따른다.
+    assert balances['KRW']['balance'] == 300_000
+    assert (balances['ETH']['balance'], balances['ETH']['avg_buy_price']) == (0.5, 4_000_000)
+    assert balances['BTC']['balance'] == 0.01
+
+    assert load_paper_balances(lambda collection: None, ["KRW-ETH"], initial_krw=1_000) == [
+        {'currency': 'KRW', 'balance': 1_000, 'locked': 0, 'avg_buy_price': 0}]
@@ -0,0 +1,60 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from reflection_cache import ReflectionCache, get_or_generate_reflection, make_reflection_key
+
+COLUMNS = ['timestamp', 'decision', 'percentage', 'reason', 'eth_balance', 'krw_balance', 'eth_avg_buy_price',
+           'eth_krw_price', 'reflection']
+MARKET_BUCKET = {'price': 1500, 'rsi': 5, 'macd_sign': True, 'fear_greed': 4}
+
+
+def make_record(minutes, decision, percentage=0, eth_balance=0.5, krw_balance=1_000_000):
+    return {
+        'timestamp': datetime(2025, 3, 1) + timedelta(minutes=minutes),
+        'decision': decision,
+        'percentage': percentage,
+        'reason': f"reason {minutes}",
+        'eth_balance': eth_balance,
+        'krw_balance': krw_balance,
+        'eth_avg_buy_price': 4_000_000,
+        'eth_krw_price': 4_000_000 + minutes,
+        'reflection': f"reflection {minutes}",
+    }
+
+
+def trades(records):
+    # get_recent_trades 와 같이 최신 기록부터 정렬
+    return pd.DataFrame.from_records(data=list(reversed(records)), columns=COLUMNS)
+
+
+def test_hold_only_cycle_hits_cache(tmp_path):
+    history = [make_record(0, 'BUY', 30), make_record(10, 'HOLD')]
+    cache = ReflectionCache(path=str(tmp_path / "reflection_cache.json"))
+    calls = []
+
+    def generate():
+        calls.append(1)
+        return "reflection"
+
+    _, first_hit = get_or_generate_reflection(cache, make_reflection_key(trades(history), MARKET_BUCKET), generate)
+    # 다음 주기 : 같은 시장 상태에서 HOLD 기록만 추가됨
+    history.append(make_record(20, 'HOLD'))
+    reflection, second_hit = get_or_generate_reflection(cache, make_reflection_key(trades(history), MARKET_BUCKET), generate)
+
+    assert (first_hit, second_hit) == (False, True)
+    assert reflection == "reflection"
+    assert len(calls) == 1
+
+
+def test_new_trade_changes_key():
+    history = [make_record(0, 'BUY', 30), make_record(10, 'HOLD')]
+    key = make_reflection_key(trades(history), MARKET_BUCKET)
+    history.append(make_record(20, 'SELL', 50, eth_balance=0.25, krw_balance=2_000_000))
+
+    assert make_reflection_key(trades(history), MARKET_BUCKET) != key
+    assert make_reflection_key(trades(history[:2]), {**MARKET_BUCKET, 'rsi': 6}) != key
+
+
+def test_empty_history():
+    assert make_reflection_key(trades([]), MARKET_BUCKET) == make_reflection_key(trades([]), MARKET_BUCKET)
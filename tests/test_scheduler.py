@@ -0,0 +1,90 @@
+from datetime import datetime
+
+import pytest
+
+from exchange_adapter import SimulatedExchange
+from orchestrator import MarketOrchestrator
+from scheduler import NonRetryableError, TradingScheduler
+from trading_decision import TradingDecision, build_failure_record
+
+
+def make_scheduler(job, **kwargs):
+    return TradingScheduler(job=job, backoff_base=0, backoff_max=0, lock_path=None, **kwargs)
+
+
+def test_next_run_at_aligns_to_wall_clock():
+    scheduler = make_scheduler(job=None, interval=600)
+    boundary = datetime(2025, 3, 1, 12, 10).timestamp()
+    assert scheduler.next_run_at(boundary - 0.5) == boundary
+    # 경계 시각에 실행이 끝나면 다음 경계
+    assert scheduler.next_run_at(boundary) == boundary + 600
+    assert scheduler.next_run_at(boundary + 599.9) == boundary + 600
+
+
+def test_next_run_at_with_offset():
+    scheduler = make_scheduler(job=None, interval=600, offset=30)
+    boundary = datetime(2025, 3, 1, 12, 10).timestamp()
+    assert scheduler.next_run_at(boundary) == boundary + 30
+    assert scheduler.next_run_at(boundary + 30) == boundary + 630
+
+
+def test_retries_failures_before_execution():
+    calls = []
+
+    def job():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("candles are not available")
+
+    assert make_scheduler(job, max_retries=3).run_once()
+    assert len(calls) == 3
+
+
+def test_does_not_retry_after_order():
+    calls = []
+
+    def job():
+        calls.append(1)
+        raise NonRetryableError("balance reconcile failed after order")
+
+    assert not make_scheduler(job, max_retries=3).run_once()
+    assert len(calls) == 1
+
+
+def run_orchestrator(errors):
+    def trade(ticker, shared):
+        if errors[ticker]:
+            raise errors[ticker]
+
+    orchestrator = MarketOrchestrator(tickers=list(errors), trade=trade, shared_sources=lambda: [])
+    try:
+        return orchestrator.run_cycle()
+    finally:
+        orchestrator.close()
+
+
+def test_orchestrator_keeps_order_failures_non_retryable():
+    with pytest.raises(NonRetryableError):
+        run_orchestrator({"KRW-ETH": NonRetryableError("order placed")})
+    with pytest.raises(NonRetryableError):
+        run_orchestrator({"KRW-ETH": NonRetryableError("order placed"), "KRW-BTC": ConnectionError("timeout")})
+    with pytest.raises(RuntimeError) as info:
+        run_orchestrator({"KRW-ETH": ConnectionError("timeout")})
+    assert not isinstance(info.value, NonRetryableError)
+    assert run_orchestrator({"KRW-ETH": None, "KRW-BTC": NonRetryableError("order placed")})["KRW-ETH"] is None
+
+
+def test_failure_record_uses_local_state():
+    exchange = SimulatedExchange(balances=[{'currency': 'KRW', 'balance': '100000'},
+                                           {'currency': 'ETH', 'balance': '0.5', 'avg_buy_price': '4000000'}],
+                                 price_source=lambda ticker: 4_000_000)
+    order_book = {'orderbook_units': [{'ask_price': 4_001_000, 'bid_price': 3_999_000}]}
+    record = build_failure_record(
+        trade_decision=TradingDecision(decision='sell', percentage=50, reason="test"),
+        exchange=exchange, order_book=order_book, reflection="", ticker="KRW-ETH",
+        error=TimeoutError("get_order timed out"), order={'uuid': 'order-1'}
+    )
+    assert record['decision'] == 'SELL'
+    assert (record['eth_balance'], record['krw_balance'], record['eth_krw_price']) == (0.5, 100000.0, 4_000_000)
+    assert record['execution_error'] == "TimeoutError: get_order timed out"
+    assert record['order_uuid'] == 'order-1'
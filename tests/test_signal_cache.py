@@ -0,0 +1,93 @@
+import threading
+import time
+
+from analytics_resource import signal_cache
+from analytics_resource.signal_cache import SignalCache
+
+TTL = 60
+
+
+def expire(cache, name):
+    cache._entries[name]['fetched_at'] -= TTL + 1
+
+
+def wait_for_refresh(cache, name, timeout=5):
+    deadline = time.monotonic() + timeout
+    while name in cache._refreshing and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert name not in cache._refreshing
+
+
+def test_hit_and_miss(tmp_path):
+    cache = SignalCache(path=str(tmp_path / "signal_cache.json"))
+    calls = []
+    fetch = lambda: calls.append(1) or {'value': len(calls)}
+
+    assert cache.get("fear_greed_index", fetch, ttl=TTL) == {'value': 1}
+    assert cache.get("fear_greed_index", fetch, ttl=TTL) == {'value': 1}
+    assert len(calls) == 1
+    assert cache.get_stats()["fear_greed_index"] == {'hit': 1, 'stale': 0, 'miss': 1, 'error': 0}
+
+
+def test_stale_value_is_returned_while_refreshing(tmp_path):
+    cache = SignalCache(path=str(tmp_path / "signal_cache.json"))
+    cache.get("news_headlines", lambda: ["old"], ttl=TTL)
+    expire(cache, "news_headlines")
+
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch():
+        calls.append(1)
+        release.wait(5)
+        return ["new"]
+
+    # 갱신이 끝나지 않아도 이전 값을 바로 반환하고, 갱신은 한 번만 시작한다.
+    assert cache.get("news_headlines", slow_fetch, ttl=TTL) == ["old"]
+    assert cache.get("news_headlines", slow_fetch, ttl=TTL) == ["old"]
+    release.set()
+    wait_for_refresh(cache, "news_headlines")
+
+    assert len(calls) == 1
+    assert cache.get("news_headlines", slow_fetch, ttl=TTL) == ["new"]
+    assert cache.get_stats()["news_headlines"] == {'hit': 1, 'stale': 2, 'miss': 1, 'error': 0}
+
+
+def test_failed_refresh_keeps_last_value(tmp_path):
+    cache = SignalCache(path=str(tmp_path / "signal_cache.json"))
+    cache.get("news_headlines", lambda: ["old"], ttl=TTL)
+    expire(cache, "news_headlines")
+
+    def failing_fetch():
+        raise TimeoutError("serpapi timed out")
+
+    assert cache.get("news_headlines", failing_fetch, ttl=TTL) == ["old"]
+    wait_for_refresh(cache, "news_headlines")
+    # 빈 응답도 실패로 보고 이전 값을 유지한다.
+    assert cache.get("news_headlines", lambda: [], ttl=TTL) == ["old"]
+    wait_for_refresh(cache, "news_headlines")
+    assert cache.get_stats()["news_headlines"]['error'] == 2
+    assert cache.get("missing", failing_fetch, ttl=TTL) is None
+
+
+def test_entries_survive_restart(tmp_path):
+    path = str(tmp_path / "signal_cache.json")
+    SignalCache(path=path).get("fear_greed_index", lambda: {'value': 42}, ttl=TTL)
+
+    cache = SignalCache(path=path)
+    assert cache.get("fear_greed_index", lambda: {'value': 0}, ttl=TTL) == {'value': 42}
+    assert cache.get_stats()["fear_greed_index"]['hit'] == 1
+
+
+def test_news_is_cached_per_currency(tmp_path, monkeypatch):
+    cache = SignalCache(path=str(tmp_path / "signal_cache.json"))
+    queries = []
+    monkeypatch.setattr(signal_cache, "get_signal_cache", lambda: cache)
+    monkeypatch.setattr(signal_cache, "get_news", lambda query: queries.append(query) or [{'title': query}])
+
+    assert signal_cache.get_cached_news("ETH") == [{'title': "ethereum"}]
+    assert signal_cache.get_cached_news("BTC") == [{'title': "bitcoin"}]
+    assert signal_cache.get_cached_news("XYZ") == [{'title': "XYZ crypto"}]
+    assert signal_cache.get_cached_etherium_news() == [{'title': "ethereum"}]
+    assert queries == ["ethereum", "bitcoin", "XYZ crypto"]
+    assert set(cache.get_stats()) == {"news_headlines", "news_headlines_btc", "news_headlines_xyz"}
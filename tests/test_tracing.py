@@ -0,0 +1,49 @@
+import threading
+
+from orchestrator import MarketOrchestrator
+from tests.fakes import FakeMongoClient
+from tracing import Tracer, tracer
+
+
+def test_concurrent_markets_keep_their_own_stages():
+    local_tracer = Tracer()
+    local_tracer.begin_cycle()
+    barrier = threading.Barrier(2)
+
+    def trade(ticker, seconds):
+        with local_tracer.market(ticker):
+            barrier.wait()
+            for _ in range(100):
+                local_tracer.observe("decision", seconds)
+
+    threads = [threading.Thread(target=trade, args=("KRW-ETH", 1.0)), threading.Thread(target=trade, args=("KRW-BTC", 2.0))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    local_tracer.observe("cycle", 3.0)
+
+    stages, markets = local_tracer.cycle_stages()
+    assert stages == {'cycle': 3.0}
+    assert markets == {'KRW-ETH': {'decision': 1.0}, 'KRW-BTC': {'decision': 2.0}}
+    # histogram 은 모든 마켓을 합쳐서 기록한다.
+    assert local_tracer.histograms['decision'].count == 200
+
+    mongodb_client = FakeMongoClient()
+    local_tracer.export_to_mongo(mongodb_client)
+    document, = mongodb_client.autotradedb["metrics"].find({}, {'_id': 0})
+    assert (document['stages'], document['markets']) == (stages, markets)
+
+
+def test_orchestrator_records_stages_per_market():
+    def trade(ticker, shared):
+        tracer.observe("execution", 0.5 if ticker == "KRW-ETH" else 0.7)
+
+    orchestrator = MarketOrchestrator(tickers=["KRW-ETH", "KRW-BTC"], trade=trade, shared_sources=lambda: [])
+    try:
+        orchestrator.run_cycle()
+    finally:
+        orchestrator.close()
+    stages, markets = tracer.cycle_stages()
+    assert {'shared_fetch', 'cycle'} <= set(stages) and 'execution' not in stages
+    assert markets == {'KRW-ETH': {'execution': 0.5}, 'KRW-BTC': {'execution': 0.7}}
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+import pytest
+
+from auto_trade import calculate_performance
+from mongodb_connector import migrate_datetime_fields
+from tests.fakes import FakeMongoClient, make_trade_history
+from trade_analytics import get_decision_counts, get_performance_summary
+
+COLLECTION = "trading_result"
+NOW = datetime(2025, 3, 1, 0, 5)
+
+
+def store(records):
+    mongodb_client = FakeMongoClient()
+    mongodb_client.autotradedb[COLLECTION].insert_many([dict(record) for record in records])
+    return mongodb_client
+
+
+def expected(records, days):
+    # get_recent_trades 와 같이 기간 내 기록을 최근 순서로 정렬한 DataFrame 으로 계산한다.
+    since = NOW - timedelta(days=days)
+    trades_df = pd.DataFrame([record for record in records if record['timestamp'] >= since])
+    if trades_df.empty:
+        return trades_df, 0
+    trades_df = trades_df.sort_values('timestamp', ascending=False)
+    return trades_df, calculate_performance(trades_df)
+
+
+@pytest.mark.parametrize("days", [1, 7, 30])
+def test_summary_matches_calculate_performance(days):
+    records = make_trade_history(3000, end=NOW)
+    mongodb_client = store(records)
+    trades_df, performance = expected(records, days)
+
+    summary = get_performance_summary(mongodb_client, days=days, now=NOW)
+    assert summary['trades'] == len(trades_df)
+    assert summary['performance'] == pytest.approx(performance)
+    equity = trades_df['krw_balance'] + trades_df['eth_balance'] * trades_df['eth_krw_price']
+    assert (summary['min_equity'], summary['max_equity']) == pytest.approx((equity.min(), equity.max()))
+    assert summary['first_timestamp'] == trades_df['timestamp'].min()
+    assert summary['last_timestamp'] == trades_df['timestamp'].max()
+
+    counts = trades_df['decision'].str.lower().value_counts().to_dict()
+    assert get_decision_counts(mongodb_client, days=days, now=NOW) == {
+        decision: counts.get(decision, 0) for decision in ('buy', 'sell', 'hold')}
+    assert {decision: summary[f'{decision}_count'] for decision in ('buy', 'sell', 'hold')} == \
+        get_decision_counts(mongodb_client, days=days, now=NOW)
+
+
+def test_empty_collection():
+    mongodb_client = FakeMongoClient()
+    summary = get_performance_summary(mongodb_client, now=NOW)
+    assert summary == {'trades': 0, 'performance': 0, 'buy_count': 0, 'sell_count': 0, 'hold_count': 0}
+    assert summary['performance'] == calculate_performance(pd.DataFrame())
+    assert get_decision_counts(mongodb_client, now=NOW) == {'buy': 0, 'sell': 0, 'hold': 0}
+
+
+def test_string_timestamps_are_counted_after_migration():
+    records = make_trade_history(300, end=NOW)
+    mongodb_client = store({**record, 'timestamp': record['timestamp'].isoformat()} for record in records)
+    # 문자열 timestamp 는 datetime 범위 조건에 맞지 않는다.
+    assert get_performance_summary(mongodb_client, days=1, now=NOW)['trades'] == 0
+
+    assert migrate_datetime_fields(mongodb_client, fields=[('autotradedb', COLLECTION, 'timestamp')], batch_size=64)
+    trades_df, performance = expected(records, days=1)
+    summary = get_performance_summary(mongodb_client, days=1, now=NOW)
+    assert summary['trades'] == len(trades_df) > 0
+    assert summary['performance'] == pytest.approx(performance)
@@ -0,0 +1,105 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tests.fakes import FakeMongoClient, make_trade_history
+from trade_journal import JournalLockedError, TradeJournal, process_journal_path
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLLECTION = "trading_result"
+
+
+def open_journal(path, mongodb_client=None, **kwargs):
+    return TradeJournal(path=path, get_client=lambda: mongodb_client, flush_interval=3600, retry_max=3600,
+                        **kwargs).start()
+
+
+def saved(mongodb_client):
+    return mongodb_client.autotradedb[COLLECTION].count_documents({})
+
+
+def test_replays_records_after_crash(tmp_path):
+    path = str(tmp_path / "trade_journal.jsonl")
+    # MongoDB 에 저장하기 전에 프로세스가 종료된다. (close 없이 os._exit)
+    script = (
+        "import os\n"
+        "from trade_journal import TradeJournal\n"
+        "from tests.fakes import make_trade_history\n"
+        f"journal = TradeJournal(path={path!r}, get_client=lambda: None, flush_interval=3600).start()\n"
+        "for record in make_trade_history(5):\n"
+        f"    journal.append({COLLECTION!r}, record)\n"
+        "os._exit(0)\n"
+    )
+    subprocess.run([sys.executable, "-c", script], cwd=ROOT, check=True)
+
+    mongodb_client = FakeMongoClient()
+    journal = open_journal(path, mongodb_client)
+    assert journal.replayed == 5
+    assert journal.flush(timeout=5)
+    journal.close()
+    assert saved(mongodb_client) == 5
+
+
+def test_drops_truncated_last_line(tmp_path):
+    path = str(tmp_path / "trade_journal.jsonl")
+    journal = open_journal(path)
+    for record in make_trade_history(3):
+        journal.append(COLLECTION, record)
+    journal.close()
+    # 기록 중 중단된 마지막 줄
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"seq": 4, "collection": "trading_')
+
+    mongodb_client = FakeMongoClient()
+    journal = open_journal(path, mongodb_client)
+    assert journal.replayed == 3
+    assert journal.flush(timeout=5)
+    assert journal.append(COLLECTION, make_trade_history(1)[0]) == 4
+    assert journal.flush(timeout=5)
+    journal.close()
+    assert saved(mongodb_client) == 4
+
+
+def test_ignores_duplicates_when_ack_is_lost(tmp_path):
+    path = str(tmp_path / "trade_journal.jsonl")
+    mongodb_client = FakeMongoClient()
+    journal = open_journal(path, mongodb_client)
+    for record in make_trade_history(3):
+        journal.append(COLLECTION, record)
+    assert journal.flush(timeout=5)
+    journal.close()
+    # 저장은 되었지만 ack 가 기록되기 전에 중단된 경우
+    os.remove(f"{path}.ack")
+
+    journal = open_journal(path, mongodb_client)
+    assert journal.replayed == 3
+    assert journal.flush(timeout=5)
+    journal.close()
+    assert saved(mongodb_client) == 3
+
+
+def test_journal_is_used_by_one_process(tmp_path):
+    path = str(tmp_path / "trade_journal.jsonl")
+    journal = open_journal(path)
+    with pytest.raises(JournalLockedError):
+        open_journal(path)
+    journal.close()
+    open_journal(path).close()
+
+
+def test_adopts_records_of_finished_process_journal(tmp_path):
+    path = str(tmp_path / "trade_journal.jsonl")
+    orphan_path = process_journal_path(path, pid=12345)
+    orphan = open_journal(orphan_path)
+    for record in make_trade_history(4):
+        orphan.append(COLLECTION, record)
+    orphan.close()
+
+    mongodb_client = FakeMongoClient()
+    journal = open_journal(path, mongodb_client)
+    assert journal.flush(timeout=5)
+    journal.close()
+    assert saved(mongodb_client) == 4
+    assert not os.path.exists(orphan_path) and not os.path.exists(f"{orphan_path}.ack")
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pytest
+
+from tests.fakes import FakeMongoClient, make_trade_history
+from trade_journal import TradeJournal
+from trade_rollups import compute_rollups, get_rollups, refresh_rollups, rollup_collection
+
+NOW = datetime(2025, 3, 2, 12, 0)
+
+
+def stored_rollups(mongodb_client, period):
+    return {document['period_start']: document
+            for document in mongodb_client.autotradedb[rollup_collection("trading_result", period)].find({}, {'_id': 0})}
+
+
+def expected_rollups(records, period):
+    return compute_rollups(sorted(records, key=lambda record: record['timestamp']), period)
+
+
+def test_refresh_is_idempotent():
+    records = make_trade_history(40, end=NOW)
+    mongodb_client = FakeMongoClient()
+    mongodb_client.autotradedb["trading_result"].insert_many([dict(record) for record in records])
+
+    refresh_rollups(mongodb_client, records)
+    first = stored_rollups(mongodb_client, 'hour')
+    # journal 재저장과 같이 같은 기록으로 다시 실행
+    refresh_rollups(mongodb_client, records[-5:])
+
+    assert stored_rollups(mongodb_client, 'hour') == first
+    assert first == expected_rollups(records, 'hour')
+    assert stored_rollups(mongodb_client, 'day') == expected_rollups(records, 'day')
+
+
+def failing_rollups(mongodb_client, records, collection):
+    raise ConnectionError("rollup collection is not available")
+
+
+def test_journal_acks_only_after_rollups(tmp_path):
+    records = make_trade_history(12, end=NOW)
+    mongodb_client = FakeMongoClient()
+    path = str(tmp_path / "trade_journal.jsonl")
+
+    journal = TradeJournal(path=path, get_client=lambda: mongodb_client, after_flush=failing_rollups,
+                           flush_interval=3600, retry_max=3600).start()
+    for record in records:
+        journal.append("trading_result", dict(record))
+    # 기록은 저장되었지만 rollup 갱신에 실패하여 ack 되지 않는다.
+    assert not journal.flush(timeout=0.5)
+    assert mongodb_client.autotradedb["trading_result"].count_documents({}) == len(records)
+    journal.close()
+
+    # 재시작 : 이미 저장된 기록(중복)으로 rollup 을 다시 계산하고 ack 한다.
+    journal = TradeJournal(path=path, get_client=lambda: mongodb_client, after_flush=refresh_rollups).start()
+    assert journal.replayed == len(records)
+    assert journal.flush(timeout=5)
+    journal.close()
+
+    assert mongodb_client.autotradedb["trading_result"].count_documents({}) == len(records)
+    assert stored_rollups(mongodb_client, 'hour') == expected_rollups(records, 'hour')
+
+
+def test_position_is_coin_share_of_equity():
+    records = [
+        {'timestamp': datetime(2025, 3, 1, 9, 0), 'decision': 'BUY', 'percentage': 100, 'krw_balance': 0.0,
+         'eth_balance': 0.25, 'eth_avg_buy_price': 4_000_000, 'eth_krw_price': 4_000_000},
+        {'timestamp': datetime(2025, 3, 1, 9, 10), 'decision': 'SELL', 'percentage': 50, 'krw_balance': 500_000.0,
+         'eth_balance': 0.125, 'eth_avg_buy_price': 4_000_000, 'eth_krw_price': 4_000_000},
+        {'timestamp': datetime(2025, 3, 1, 9, 20), 'decision': 'HOLD', 'percentage': 0, 'krw_balance': 500_000.0,
+         'eth_balance': 0.125, 'eth_avg_buy_price': 4_000_000, 'eth_krw_price': 4_000_000},
+    ]
+    mongodb_client = FakeMongoClient()
+    mongodb_client.autotradedb["trading_result"].insert_many([dict(record) for record in records])
+    refresh_rollups(mongodb_client, records)
+
+    daily = get_rollups(mongodb_client, period='day', days=1, now=datetime(2025, 3, 1, 12, 0))
+    assert daily['avg_position'].iloc[0] == pytest.approx((1.0 + 0.5 + 0.5) / 3)
+    assert daily['close_position'].iloc[0] == pytest.approx(0.5)
+    assert daily['avg_decision_percentage'].iloc[0] == pytest.approx(50)
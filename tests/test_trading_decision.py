@@ -0,0 +1,56 @@
+import pytest
+
+from exchange_adapter import SimulatedExchange
+from trading_decision import FEE_FACTOR, MIN_ORDER_KRW, TradingDecision, buy_amount, execute_decision, sell_volume
+
+PRICE = 4_000_000.0
+ORDER_BOOK = {'orderbook_units': [{'ask_price': PRICE, 'bid_price': PRICE}]}
+
+
+def test_buy_amount():
+    assert buy_amount(100_000, 50) == pytest.approx(50_000 * FEE_FACTOR)
+    assert buy_amount(100_000, 100) == pytest.approx(100_000 * FEE_FACTOR)
+    # 최소 주문 금액 이하
+    assert buy_amount(MIN_ORDER_KRW / FEE_FACTOR, 100) == 0
+    assert buy_amount(MIN_ORDER_KRW / FEE_FACTOR + 1, 100) > MIN_ORDER_KRW
+    assert buy_amount(100_000, 0) == 0
+
+
+def test_sell_volume():
+    assert sell_volume(0.5, 50, PRICE) == pytest.approx(0.25)
+    assert sell_volume(MIN_ORDER_KRW / PRICE, 100, PRICE) == 0
+    assert sell_volume(2 * MIN_ORDER_KRW / PRICE, 100, PRICE) == pytest.approx(2 * MIN_ORDER_KRW / PRICE)
+
+
+def make_exchange(krw, eth):
+    return SimulatedExchange(balances=[{'currency': 'KRW', 'balance': krw}, {'currency': 'ETH', 'balance': eth}],
+                             price_source=lambda ticker: PRICE)
+
+
+def execute(exchange, decision, percentage):
+    return execute_decision(exchange, TradingDecision(decision=decision, percentage=percentage, reason="test"),
+                            "KRW-ETH", lambda ticker: ORDER_BOOK, verbose=False)
+
+
+def test_buy_uses_percentage_of_krw():
+    exchange = make_exchange(krw=1_000_000, eth=0)
+    order = execute(exchange, 'buy', 30)
+    funds = 300_000 * FEE_FACTOR
+    assert order['side'] == 'bid'
+    assert sum(trade['funds'] for trade in order['trades']) == pytest.approx(funds)
+    assert exchange.get_balance("ETH") == pytest.approx(funds / PRICE)
+
+
+def test_sell_uses_percentage_of_coin():
+    exchange = make_exchange(krw=0, eth=0.4)
+    order = execute(exchange, 'SELL', 25)
+    assert order['executed_volume'] == pytest.approx(0.1)
+    assert exchange.get_balance("ETH") == pytest.approx(0.3)
+
+
+def test_no_order_below_minimum_or_on_hold():
+    exchange = make_exchange(krw=MIN_ORDER_KRW, eth=MIN_ORDER_KRW / PRICE)
+    assert execute(exchange, 'buy', 100) is None
+    assert execute(exchange, 'sell', 100) is None
+    assert execute(make_exchange(krw=1_000_000, eth=1), 'hold', 0) is None
+    assert exchange.orders == []
@@ -0,0 +1,188 @@
+import bisect
+import contextvars
+import logging
+import os
+import threading
+import time
+
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROMETHEUS_PATH = os.getenv("METRICS_PROMETHEUS_PATH", "cache/auto_trade_metrics.prom")
+METRIC_NAME = "auto_trade_stage_duration_seconds"
+
+# 1ms ~ 약 3분 구간의 지수 간격(x1.5) bucket 상한(초)
+DEFAULT_BUCKETS = tuple(round(0.001 * 1.5 ** i, 6) for i in range(31))
+
+# 현재 실행 중인 마켓 (여러 마켓을 동시에 실행할 때 주기별 단계 기록을 마켓별로 나눈다.)
+_current_market = contextvars.ContextVar("tracing_market", default=None)
+
+
+class Histogram:
+    """
+    고정 bucket 지연시간 histogram. 기록은 O(log buckets), 메모리는 bucket 수만큼만 사용한다.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 마지막은 +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        index = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.count += 1
+            self.sum += seconds
+            self.min = min(self.min, seconds)
+            self.max = max(self.max, seconds)
+
+    def percentile(self, q):
+        """
+        bucket 내 선형 보간으로 q 분위수(0~1)를 추정한다. (관측된 최소 / 최대값 범위로 제한)
+        """
+        with self._lock:
+            if self.count == 0:
+                return None
+            rank = q * self.count
+            cumulative = 0
+            for index, bucket_count in enumerate(self.counts):
+                if bucket_count and cumulative + bucket_count >= rank:
+                    lower = max(self.buckets[index - 1] if index > 0 else 0.0, self.min)
+                    upper = min(self.buckets[index] if index < len(self.buckets) else self.max, self.max)
+                    return lower + (upper - lower) * (rank - cumulative) / bucket_count
+                cumulative += bucket_count
+            return self.max
+
+
+class Tracer:
+    """
+    매매 주기의 단계별(span) 지연시간을 histogram 에 기록한다.
+    histogram 은 모든 마켓을 합쳐서 기록하고, 이번 주기의 단계별 기록(last_cycle)은 마켓별로 나누어 보관한다.
+    """
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.histograms = {}
+        # {마켓 (None 은 마켓 공통 단계): {stage: seconds}}
+        self.last_cycle = {}
+        self._lock = threading.Lock()
+
+    def _histogram(self, name):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, Histogram(self.buckets))
+        return histogram
+
+    def observe(self, name, seconds):
+        self._histogram(name).observe(seconds)
+        market = _current_market.get()
+        with self._lock:
+            self.last_cycle.setdefault(market, {})[name] = seconds
+
+    @contextmanager
+    def market(self, ticker):
+        """
+        이 context 안(같은 thread)에서 기록한 단계를 ticker 의 단계로 기록한다.
+        """
+        token = _current_market.set(ticker)
+        try:
+            yield
+        finally:
+            _current_market.reset(token)
+
+    @contextmanager
+    def span(self, name):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started_at)
+
+    def begin_cycle(self):
+        with self._lock:
+            self.last_cycle = {}
+
+    def cycle_stages(self):
+        """
+        :return: (마켓 공통 단계, {마켓: 단계}) 이번 주기의 단계별 지연시간 복사본
+        """
+        with self._lock:
+            stages = {market: dict(market_stages) for market, market_stages in self.last_cycle.items()}
+        return stages.pop(None, {}), stages
+
+    def summary(self):
+        """
+        :return: {stage: {count, sum, p50, p95, p99}}
+        """
+        return {
+            name: {
+                'count': histogram.count,
+                'sum': histogram.sum,
+                'p50': histogram.percentile(0.50),
+                'p95': histogram.percentile(0.95),
+                'p99': histogram.percentile(0.99),
+            }
+            for name, histogram in sorted(self.histograms.items())
+        }
+
+    def to_prometheus(self):
+        """
+        Prometheus text exposition format 으로 변환한다. (node_exporter textfile collector 용)
+        """
+        lines = [
+            f"# HELP {METRIC_NAME} Duration of each auto trade cycle stage.",
+            f"# TYPE {METRIC_NAME} histogram",
+        ]
+        for name, histogram in sorted(self.histograms.items()):
+            with histogram._lock:
+                counts = list(histogram.counts)
+                total, count = histogram.sum, histogram.count
+            cumulative = 0
+            for upper, bucket_count in zip(list(histogram.buckets) + ["+Inf"], counts):
+                cumulative += bucket_count
+                lines.append(f'{METRIC_NAME}_bucket{{stage="{name}",le="{upper}"}} {cumulative}')
+            lines.append(f'{METRIC_NAME}_sum{{stage="{name}"}} {total}')
+            lines.append(f'{METRIC_NAME}_count{{stage="{name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path=DEFAULT_PROMETHEUS_PATH):
+        try:
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.to_prometheus())
+            os.replace(tmp_path, path)
+        except OSError as ex:
+            logger.warning(f"[Warning] Failed to write prometheus metrics : {ex}")
+
+    def export_to_mongo(self, mongodb_client, collection="metrics"):
+        """
+        이번 주기의 단계별 지연시간을 MongoDB metrics collection 에 저장한다.
+        (stages : 마켓 공통 단계 / 단일 마켓 실행 시 전체 단계, markets : 여러 마켓 실행 시 마켓별 단계)
+        """
+        stages, markets = self.cycle_stages()
+        try:
+            mongodb_client.autotradedb[collection].insert_one({
+                "timestamp": datetime.now(),
+                "stages": stages,
+                "markets": markets,
+            })
+        except Exception as ex:
+            logger.warning(f"[Warning] Failed to export metrics to mongodb : {ex}")
+
+    def print_summary(self):
+        print("> Stage latency (p50 / p95 / p99 ms)")
+        for name, stats in self.summary().items():
+            print(f"  - {name:<24} {stats['p50'] * 1000:9.1f} {stats['p95'] * 1000:9.1f} {stats['p99'] * 1000:9.1f}  (n={stats['count']})")
+
+
+tracer = Tracer()
+span = tracer.span
@@ -0,0 +1,97 @@
+"""
+거래 기록(trading_result) 통계를 MongoDB aggregation pipeline 으로 서버에서 계산한다.
+기간 내 모든 문서를 가져오지 않고 집계 결과(몇 개의 숫자)만 전송한다.
+(timestamp 는 BSON datetime 이어야 한다 : mongodb_connector.migrate_datetime_fields)
+"""
+from datetime import datetime, timedelta
+
+DECISIONS = ('buy', 'sell', 'hold')
+
+# KRW + ETH x 현재가
+EQUITY_EXPRESSION = {'$add': ['$krw_balance', {'$multiply': ['$eth_balance', '$eth_krw_price']}]}
+
+
+def _since(days, now=None):
+    return (now or datetime.now()) - timedelta(days=days)
+
+
+def build_performance_pipeline(since):
+    """
+    기간 수익률 / 판단 횟수 / 잔고 극값을 한 번에 계산하는 pipeline
+    수익률은 calculate_performance 와 같이 기간 내 가장 오래된 기록과 최근 기록의 평가 금액(KRW + ETH x 가격)으로 계산한다.
+    """
+    group = {
+        '_id': None,
+        'trades': {'$sum': 1},
+        'first_timestamp': {'$first': '$timestamp'},
+        'last_timestamp': {'$last': '$timestamp'},
+        'initial_equity': {'$first': '$equity'},
+        'final_equity': {'$last': '$equity'},
+        'min_equity': {'$min': '$equity'},
+        'max_equity': {'$max': '$equity'},
+        'min_krw_balance': {'$min': '$krw_balance'},
+        'max_krw_balance': {'$max': '$krw_balance'},
+        'min_eth_balance': {'$min': '$eth_balance'},
+        'max_eth_balance': {'$max': '$eth_balance'},
+        'min_eth_krw_price': {'$min': '$eth_krw_price'},
+        'max_eth_krw_price': {'$max': '$eth_krw_price'},
+    }
+    for decision in DECISIONS:
+        group[f'{decision}_count'] = {'$sum': {'$cond': [{'$eq': ['$decision', decision]}, 1, 0]}}
+
+    return [
+        {'$match': {'timestamp': {'$gte': since}}},
+        {'$sort': {'timestamp': 1}},
+        {'$project': {
+            '_id': 0,
+            'timestamp': 1,
+            'decision': {'$toLower': '$decision'},
+            'krw_balance': 1,
+            'eth_balance': 1,
+            'eth_krw_price': 1,
+            'equity': EQUITY_EXPRESSION,
+        }},
+        {'$group': group},
+        {'$project': {
+            '_id': 0,
+            **{field: 1 for field in group if field != '_id'},
+            'performance': {'$cond': [
+                {'$gt': ['$initial_equity', 0]},
+                {'$multiply': [{'$divide': [{'$subtract': ['$final_equity', '$initial_equity']}, '$initial_equity']}, 100]},
+                0
+            ]},
+        }},
+    ]
+
+
+def get_performance_summary(mongodb_client, days=7, collection="trading_result", now=None):
+    """
+    최근 days 일 거래 통계 (수익률, 판단 횟수, 잔고 / 평가 금액 / 가격의 최소 / 최대)
+    :return: dict (기간 내 거래가 없으면 trades = 0, performance = 0)
+    """
+    pipeline = build_performance_pipeline(_since(days, now))
+    result = next(iter(mongodb_client.autotradedb[collection].aggregate(pipeline)), None)
+    if result is None:
+        return {'trades': 0, 'performance': 0, **{f'{decision}_count': 0 for decision in DECISIONS}}
+    return result
+
+
+def get_performance(mongodb_client, days=7, collection="trading_result", now=None):
+    """
+    최근 days 일 수익률(%)
+    """
+    return get_performance_summary(mongodb_client, days=days, collection=collection, now=now)['performance']
+
+
+def get_decision_counts(mongodb_client, days=7, collection="trading_result", now=None):
+    """
+    최근 days 일 판단(buy / sell / hold)별 횟수
+    """
+    pipeline = [
+        {'$match': {'timestamp': {'$gte': _since(days, now)}}},
+        {'$group': {'_id': {'$toLower': '$decision'}, 'count': {'$sum': 1}}},
+    ]
+    counts = {decision: 0 for decision in DECISIONS}
+    for row in mongodb_client.autotradedb[collection].aggregate(pipeline):
+        counts[row['_id']] = row['count']
+    return counts
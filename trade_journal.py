@@ -0,0 +1,408 @@
+"""
+거래 기록 write-behind 저장
+- 거래 기록은 먼저 로컬 append-only journal(JSON Lines)에 기록하고 (fsync 는 묶어서 수행)
+- 백그라운드 thread 가 MongoDB 에 bulk insert 한 뒤 ack 위치를 갱신한다.
+- 프로세스 재시작 / MongoDB 장애 후에는 ack 되지 않은 기록을 다시 저장한다. (_id 를 journal 에 함께 기록하므로 중복 저장되지 않는다.)
+하나의 journal 파일은 하나의 프로세스만 사용한다. (start 에서 파일 lock, 사용 중이면 JournalLockedError)
+get_trade_journal 은 기본 journal 이 사용 중이면 프로세스별 journal 을 사용하고, 기본 journal 을 연 프로세스가
+종료된 프로세스별 journal 의 남은 기록을 가져와 저장한다.
+"""
+import glob
+import logging
+import os
+import re
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from collections import deque
+
+from bson import ObjectId, json_util
+from pymongo.errors import BulkWriteError
+
+from mongodb_connector import get_mongodb_client
+from trade_rollups import refresh_rollups
+from tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_PATH = os.getenv("TRADE_JOURNAL_PATH", "cache/trade_journal.jsonl")
+# 한 번에 저장할 최대 기록 수 / 저장 주기(초) / 실패 시 최대 재시도 간격(초)
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_RETRY_MAX = 60.0
+# fsync 묶음 단위 : 마지막 fsync 후 이 개수 / 시간(초)을 넘기면 append 에서 fsync (나머지는 백그라운드 thread 가 수행)
+DEFAULT_FSYNC_BATCH = 16
+DEFAULT_FSYNC_INTERVAL = 0.05
+# 모든 기록이 저장된 상태에서 journal 이 이 크기를 넘으면 비운다.
+DEFAULT_COMPACT_BYTES = 1024 * 1024
+
+DUPLICATE_KEY_ERROR = 11000
+# datetime 은 naive(로컬 시간) 그대로, ObjectId / NaN 도 손실 없이 기록한다.
+JSON_OPTIONS = json_util.JSONOptions(json_mode=json_util.JSONMode.RELAXED, tz_aware=False)
+
+
+class JournalLockedError(RuntimeError):
+    """
+    다른 프로세스가 같은 journal 파일을 사용 중이다.
+    """
+
+
+def process_journal_path(path, pid=None):
+    """
+    :return: cache/trade_journal.jsonl -> cache/trade_journal.<pid>.jsonl
+    """
+    root, ext = os.path.splitext(path)
+    return f"{root}.{pid or os.getpid()}{ext}"
+
+
+def _try_lock(file):
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+class TradeJournal:
+    def __init__(self, path=DEFAULT_JOURNAL_PATH, get_client=get_mongodb_client, after_flush=None,
+                 batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL, retry_max=DEFAULT_RETRY_MAX,
+                 fsync_batch=DEFAULT_FSYNC_BATCH, fsync_interval=DEFAULT_FSYNC_INTERVAL,
+                 compact_bytes=DEFAULT_COMPACT_BYTES):
+        """
+        :param get_client: MongoClient 를 반환하는 함수 (None 이면 저장 실패로 보고 재시도)
+        :param after_flush: (mongodb_client, records, collection=...) : 저장된 기록에 대한 후처리 (예: rollup 갱신)
+                            재저장된 기록에도 다시 호출되므로 여러 번 실행해도 결과가 같아야 하며, 실패하면 ack 하지 않고 재시도한다.
+        """
+        self.path = path
+        self.ack_path = f"{path}.ack"
+        self.get_client = get_client
+        self.after_flush = after_flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_max = retry_max
+        self.fsync_batch = fsync_batch
+        self.fsync_interval = fsync_interval
+        self.compact_bytes = compact_bytes
+
+        self._pending = deque()
+        self._next_seq = 1
+        self._acked_seq = 0
+        self._unsynced = 0
+        self._last_sync = 0.0
+        self._file = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._flushed = threading.Condition(self._lock)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+
+        self.appended = 0
+        self.flushed = 0
+        self.replayed = 0
+        self.failures = 0
+        self.last_error = None
+
+    ####################################################################################################################
+    # journal 파일
+    ####################################################################################################################
+    @staticmethod
+    def _read_ack(ack_path):
+        try:
+            with open(ack_path, "r", encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as ex:
+            logger.warning(f"[Warning] Failed to read trade journal ack, replaying whole journal : {ex}")
+            return 0
+
+    def _write_ack(self, seq):
+        tmp_path = f"{self.ack_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(str(seq))
+        os.replace(tmp_path, self.ack_path)
+
+    @staticmethod
+    def _read_entries(path):
+        """
+        journal 의 기록을 읽는다. 기록 중 중단되어 잘린 마지막 줄은 버린다.
+        """
+        with open(path, "rb+") as f:
+            data = f.read()
+            end = data.rfind(b"\n") + 1
+            if end != len(data):
+                logger.warning(f"[Warning] Dropping truncated trade journal entry ({len(data) - end} bytes)")
+                f.truncate(end)
+
+        entries = []
+        for line in data[:end].decode("utf-8").splitlines():
+            try:
+                entries.append(json_util.loads(line, json_options=JSON_OPTIONS))
+            except ValueError as ex:
+                logger.warning(f"[Warning] Skipping unreadable trade journal entry : {ex}")
+        return entries
+
+    def _replay(self):
+        """
+        ack 이후의 기록을 저장 대기열에 다시 넣는다.
+        """
+        if not os.path.exists(self.path):
+            return
+        max_seq = self._acked_seq
+        for entry in self._read_entries(self.path):
+            max_seq = max(max_seq, entry['seq'])
+            if entry['seq'] > self._acked_seq:
+                self._pending.append(entry)
+        self._next_seq = max_seq + 1
+        self.replayed = len(self._pending)
+        if self.replayed:
+            logger.info(f"Replaying {self.replayed} unacknowledged trade records from {self.path}")
+
+    def _adopt_orphans(self):
+        """
+        종료된 프로세스의 프로세스별 journal 에 남은 기록을 이 journal 에 다시 기록하고 파일을 지운다.
+        (lock 이 걸려 있는 journal 은 실행 중인 프로세스의 것이므로 건너뛴다.)
+        """
+        root, ext = os.path.splitext(self.path)
+        pattern = re.compile(rf"{re.escape(root)}\.\d+{re.escape(ext)}")
+        for path in glob.glob(f"{glob.escape(root)}.*{ext}"):
+            if not pattern.fullmatch(path):
+                continue
+            with open(path, "a") as orphan:
+                if not _try_lock(orphan):
+                    continue
+                acked = self._read_ack(f"{path}.ack")
+                entries = [entry for entry in self._read_entries(path) if entry['seq'] > acked]
+                for entry in entries:
+                    self._append_locked(entry['collection'], entry['record'])
+                self._sync_locked()
+                for leftover in (f"{path}.ack", path):
+                    if os.path.exists(leftover):
+                        os.remove(leftover)
+            if entries:
+                logger.info(f"Adopted {len(entries)} unsaved trade records from {path}")
+
+    def _sync_locked(self):
+        if self._unsynced:
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def _compact_locked(self):
+        """
+        모든 기록이 저장되었고 journal 이 커졌으면 비운다. (seq 는 ack 파일로 이어진다.)
+        """
+        if self._pending or self._file.tell() < self.compact_bytes:
+            return
+        self._file.truncate(0)
+        self._file.seek(0)
+        os.fsync(self._file.fileno())
+
+    ####################################################################################################################
+    # 시작 / 종료
+    ####################################################################################################################
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return self
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # 다른 프로세스가 사용 중인 journal 을 열면 seq 가 겹치고, ack / compaction 이 서로의 기록을 지울 수 있다.
+            self._file = open(self.path, "a", encoding="utf-8")
+            if not _try_lock(self._file):
+                self._file.close()
+                self._file = None
+                raise JournalLockedError(f"Trade journal is used by another process : {self.path}")
+            self._acked_seq = self._read_ack(self.ack_path)
+            self._replay()
+            self._adopt_orphans()
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="trade-journal", daemon=True)
+            self._thread.start()
+        if self._pending:
+            self._wakeup.set()
+        return self
+
+    def close(self, timeout=10):
+        """
+        남은 기록 저장을 시도하고 종료한다. (저장하지 못한 기록은 다음 시작 시 다시 저장)
+        """
+        with self._lock:
+            thread = self._thread
+        if thread is None:
+            return
+        self._stopping.set()
+        self._wakeup.set()
+        thread.join(timeout)
+        with self._lock:
+            self._sync_locked()
+            if not thread.is_alive():
+                self._file.close()
+                self._thread = None
+        if self._pending:
+            logger.warning(f"[Warning] {len(self._pending)} trade records are left in {self.path} for replay")
+
+    ####################################################################################################################
+    # 기록 / 저장
+    ####################################################################################################################
+    def append(self, collection, record):
+        """
+        거래 기록을 journal 에 추가한다. (MongoDB 저장은 백그라운드에서 수행)
+        :return: journal 순번
+        """
+        record.setdefault('_id', ObjectId())
+        with self._lock:
+            entry = self._append_locked(collection, record)
+            if self._unsynced >= self.fsync_batch or time.monotonic() - self._last_sync >= self.fsync_interval:
+                self._sync_locked()
+            pending = len(self._pending)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+        return entry['seq']
+
+    def _append_locked(self, collection, record):
+        entry = {'seq': self._next_seq, 'collection': collection, 'record': dict(record)}
+        self._file.write(json_util.dumps(entry, json_options=JSON_OPTIONS) + "\n")
+        self._file.flush()
+        self._next_seq += 1
+        self._pending.append(entry)
+        self.appended += 1
+        self._unsynced += 1
+        return entry
+
+    def last_pending(self, collection):
+        """
+        아직 MongoDB 에 저장되지 않은 가장 최근 기록 (없으면 None)
+        """
+        with self._lock:
+            for entry in reversed(self._pending):
+                if entry['collection'] == collection:
+                    return dict(entry['record'])
+        return None
+
+    def flush(self, timeout=None):
+        """
+        대기 중인 기록이 모두 저장될 때까지 기다린다.
+        :return: 모두 저장되었으면 True
+        """
+        self._wakeup.set()
+        with self._flushed:
+            return self._flushed.wait_for(lambda: not self._pending, timeout)
+
+    def _insert(self, mongodb_client, collection, records):
+        """
+        :return: 새로 저장된 기록 (이전에 저장되었지만 ack 되지 않은 중복 기록은 제외)
+        """
+        try:
+            mongodb_client.autotradedb[collection].insert_many(records, ordered=False)
+            return records
+        except BulkWriteError as ex:
+            errors = ex.details.get('writeErrors', [])
+            if any(error.get('code') != DUPLICATE_KEY_ERROR for error in errors):
+                raise
+            duplicated = {error['index'] for error in errors}
+            return [record for index, record in enumerate(records) if index not in duplicated]
+
+    def _flush_batch(self, batch):
+        mongodb_client = self.get_client()
+        if mongodb_client is None:
+            raise ConnectionError("MongoDB client is not available")
+
+        collections = {}
+        for entry in batch:
+            collections.setdefault(entry['collection'], []).append(entry['record'])
+        for collection, records in collections.items():
+            self._insert(mongodb_client, collection, records)
+            # 이전에 저장되었지만 후처리 전에 중단된 기록이 있을 수 있으므로 중복 기록을 포함한 batch 전체로 후처리한다.
+            if self.after_flush:
+                self.after_flush(mongodb_client, records, collection=collection)
+
+    def _flush_pending(self):
+        """
+        :return: 대기 중인 기록을 모두 저장했으면 True
+        """
+        while True:
+            with self._lock:
+                batch = [self._pending[i] for i in range(min(self.batch_size, len(self._pending)))]
+                self._sync_locked()
+            if not batch:
+                return True
+
+            started_at = time.perf_counter()
+            try:
+                self._flush_batch(batch)
+            except Exception as ex:
+                self.failures += 1
+                self.last_error = str(ex)
+                logger.warning(f"[Warning] Failed to flush {len(batch)} trade records, will retry : {ex}")
+                return False
+            tracer.observe("journal_flush", time.perf_counter() - started_at)
+
+            with self._lock:
+                for _ in batch:
+                    self._pending.popleft()
+                self._acked_seq = batch[-1]['seq']
+                self.flushed += len(batch)
+                try:
+                    self._write_ack(self._acked_seq)
+                    self._compact_locked()
+                except OSError as ex:
+                    logger.warning(f"[Warning] Failed to update trade journal ack : {ex}")
+                self._flushed.notify_all()
+
+    def _run(self):
+        delay = self.flush_interval
+        while not self._stopping.is_set():
+            self._wakeup.wait(delay)
+            self._wakeup.clear()
+            # 실패 시 exponential backoff (MongoDB 장애 중 재시도 간격)
+            delay = self.flush_interval if self._flush_pending() else min(delay * 2, self.retry_max)
+        self._flush_pending()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'appended': self.appended,
+                'flushed': self.flushed,
+                'pending': len(self._pending),
+                'replayed': self.replayed,
+                'failures': self.failures,
+                'last_error': self.last_error,
+            }
+
+
+_trade_journal = None
+_trade_journal_lock = threading.Lock()
+
+
+def get_trade_journal():
+    """
+    프로세스 전역 TradeJournal (MongoDB 저장 후 시간 / 일 rollup 갱신)
+    기본 journal 을 다른 프로세스(예: 실행 중인 --daemon)가 사용 중이면 프로세스별 journal 을 사용한다.
+    """
+    global _trade_journal
+    with _trade_journal_lock:
+        if _trade_journal is None:
+            try:
+                _trade_journal = TradeJournal(after_flush=refresh_rollups).start()
+            except JournalLockedError as ex:
+                path = process_journal_path(DEFAULT_JOURNAL_PATH)
+                logger.warning(f"[Warning] {ex}, using {path}")
+                _trade_journal = TradeJournal(path=path, after_flush=refresh_rollups).start()
+        return _trade_journal
+
+
+def close_trade_journal():
+    global _trade_journal
+    with _trade_journal_lock:
+        if _trade_journal is not None:
+            _trade_journal.close()
+            _trade_journal = None
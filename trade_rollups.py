@@ -0,0 +1,205 @@
+"""
+거래 기록의 시간 / 일 단위 요약(rollup) collection 관리
+- 거래 기록이 journal 에서 MongoDB 로 저장될 때마다 해당 시간 / 일 구간을 다시 계산하여 교체한다. (refresh_rollups)
+- 기존 기록이나 누락된 구간은 backfill 로 다시 계산한다. (rebuild_rollups)
+
+    $ python trade_rollups.py --collection trading_result --days 30
+
+rollup 문서 : period_start, trades, buy_count, sell_count, hold_count, percentage_sum, position_sum, realized_pnl,
+             open_equity, close_equity, min_equity, max_equity, close_position, first_timestamp, last_timestamp
+(position_sum / close_position 이 없는 기존 rollup 은 rebuild_rollups 로 다시 계산한다.)
+"""
+import argparse
+
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from pymongo import ReplaceOne
+
+PERIODS = ('hour', 'day')
+# rollup 계산에 필요한 거래 기록 필드
+RECORD_PROJECTION = {'_id': 0, 'timestamp': 1, 'decision': 1, 'percentage': 1,
+                     'eth_balance': 1, 'krw_balance': 1, 'eth_avg_buy_price': 1, 'eth_krw_price': 1}
+
+
+def rollup_collection(collection, period):
+    """
+    :return: trading_result_hourly / trading_result_daily
+    """
+    return f"{collection}_{'hourly' if period == 'hour' else 'daily'}"
+
+
+def period_start(timestamp, period):
+    if period == 'hour':
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def period_end(start, period):
+    return start + (timedelta(hours=1) if period == 'hour' else timedelta(days=1))
+
+
+def equity(record):
+    """
+    평가 금액 (KRW + ETH x 가격)
+    """
+    return float(record['krw_balance']) + float(record['eth_balance']) * float(record['eth_krw_price'] or 0)
+
+
+def position(record):
+    """
+    평가 금액 중 코인 비중 (decision_gate.position_ratio 와 같음)
+    """
+    value = equity(record)
+    return float(record['eth_balance']) * float(record['eth_krw_price'] or 0) / value if value > 0 else 0.0
+
+
+def realized_pnl(record, previous):
+    """
+    매도로 실현된 손익 : 직전 기록 대비 줄어든 ETH 수량 x (매도 시 가격 - 직전 평균 매수가)
+    (수수료는 잔고 변화에만 반영되어 있으며 여기서는 제외한다.)
+    """
+    if previous is None or str(record['decision']).lower() != 'sell':
+        return 0.0
+    sold = float(previous['eth_balance']) - float(record['eth_balance'])
+    if sold <= 0:
+        return 0.0
+    return sold * (float(record['eth_krw_price'] or 0) - float(previous['eth_avg_buy_price']))
+
+
+def _changes(record, previous):
+    decision = str(record['decision']).lower()
+    return {
+        'trades': 1,
+        'buy_count': int(decision == 'buy'),
+        'sell_count': int(decision == 'sell'),
+        'hold_count': int(decision == 'hold'),
+        'percentage_sum': int(record['percentage']),
+        'position_sum': position(record),
+        'realized_pnl': realized_pnl(record, previous),
+    }
+
+
+def compute_rollups(records, period):
+    """
+    시간 순서로 정렬된 거래 기록으로 rollup 문서를 계산한다.
+    :param records: 거래 기록 iterable (오래된 순서)
+    :return: {period_start: rollup 문서}
+    """
+    rollups = {}
+    previous = None
+    for record in records:
+        value = equity(record)
+        start = period_start(record['timestamp'], period)
+        rollup = rollups.get(start)
+        if rollup is None:
+            rollup = rollups[start] = {
+                'period_start': start, 'trades': 0, 'buy_count': 0, 'sell_count': 0, 'hold_count': 0,
+                'percentage_sum': 0, 'position_sum': 0.0, 'realized_pnl': 0.0,
+                'open_equity': value, 'min_equity': value, 'max_equity': value,
+                'first_timestamp': record['timestamp'],
+            }
+        for field, change in _changes(record, previous).items():
+            rollup[field] += change
+        rollup['close_equity'] = value
+        rollup['close_position'] = position(record)
+        rollup['min_equity'] = min(rollup['min_equity'], value)
+        rollup['max_equity'] = max(rollup['max_equity'], value)
+        rollup['last_timestamp'] = record['timestamp']
+        previous = record
+    return rollups
+
+
+def _previous_record(mongodb_client, collection, before):
+    """
+    before 직전 거래 기록 (구간 첫 매도의 실현 손익 계산용)
+    """
+    return next(iter(mongodb_client.autotradedb[collection].find(
+        {'timestamp': {'$lt': before}}, RECORD_PROJECTION).sort('timestamp', -1).limit(1)), None)
+
+
+def refresh_rollups(mongodb_client, records, collection="trading_result"):
+    """
+    저장된 거래 기록이 속한 시간 / 일 구간의 rollup 을 그 구간의 거래 기록으로 다시 계산하여 교체한다.
+    누적($inc)하지 않으므로 같은 기록으로 여러 번 실행해도 결과가 같다. (journal 재저장 / 중간 실패 후 재시도에도 안전)
+    :param records: 저장된 거래 기록 (timestamp 만 사용)
+    :return: {period: 교체한 rollup 문서 수}
+    """
+    source = mongodb_client.autotradedb[collection]
+    saved = {}
+    for period in PERIODS:
+        operations = []
+        for start in sorted({period_start(record['timestamp'], period) for record in records}):
+            previous = _previous_record(mongodb_client, collection, start)
+            period_records = list(source.find(
+                {'timestamp': {'$gte': start, '$lt': period_end(start, period)}}, RECORD_PROJECTION).sort('timestamp', 1))
+            rollup = compute_rollups(([previous] if previous else []) + period_records, period).get(start)
+            if rollup:
+                operations.append(ReplaceOne({'period_start': start}, rollup, upsert=True))
+        if operations:
+            mongodb_client.autotradedb[rollup_collection(collection, period)].bulk_write(operations, ordered=False)
+        saved[period] = len(operations)
+    return saved
+
+
+def rebuild_rollups(mongodb_client, collection="trading_result", days=None, now=None):
+    """
+    거래 기록으로 rollup collection 을 다시 계산한다. (같은 구간을 여러 번 실행해도 결과가 같다.)
+    :param days: 최근 days 일만 다시 계산 (None 이면 전체)
+    :return: {period: 저장한 rollup 문서 수}
+    """
+    since = None
+    if days is not None:
+        since = period_start((now or datetime.now()) - timedelta(days=days), 'day')
+    query = {} if since is None else {'timestamp': {'$gte': since}}
+    # 구간 시작 직전 기록은 첫 매도의 실현 손익 계산에 사용한다.
+    previous = None if since is None else _previous_record(mongodb_client, collection, since)
+    records = list(mongodb_client.autotradedb[collection].find(query, RECORD_PROJECTION).sort('timestamp', 1))
+    saved = {}
+    for period in PERIODS:
+        rollups = compute_rollups(([previous] if previous else []) + records, period)
+        if previous:
+            rollups.pop(period_start(previous['timestamp'], period), None)
+        target = mongodb_client.autotradedb[rollup_collection(collection, period)]
+        target.delete_many({} if since is None else {'period_start': {'$gte': since}})
+        if rollups:
+            target.bulk_write([ReplaceOne({'period_start': start}, rollup, upsert=True)
+                               for start, rollup in rollups.items()], ordered=False)
+        saved[period] = len(rollups)
+    return saved
+
+
+def get_rollups(mongodb_client, period='day', days=30, collection="trading_result", now=None):
+    """
+    최근 days 일 rollup
+    - avg_position : 구간 내 기록의 평균 코인 비중 (평가 금액 중 코인 가치, 0-1)
+    - avg_decision_percentage : 매수 / 매도 판단 비율(percentage)의 평균 (hold 는 0 으로 포함)
+    :return: DataFrame (period_start 오름차순)
+    """
+    since = period_start((now or datetime.now()) - timedelta(days=days), period)
+    raws = list(mongodb_client.autotradedb[rollup_collection(collection, period)]
+                .find({'period_start': {'$gte': since}}, {'_id': 0}).sort('period_start', 1))
+    df = pd.DataFrame(raws)
+    if not df.empty:
+        for field in ('position_sum', 'close_position'):
+            if field not in df:
+                # rebuild 전에 저장된 rollup
+                df[field] = float('nan')
+        df['avg_decision_percentage'] = df['percentage_sum'] / df['trades']
+        df['avg_position'] = df['position_sum'] / df['trades']
+    return df
+
+
+if __name__ == "__main__":
+    from mongodb_connector import close_mongodb_client, get_mongodb_client
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--collection", default="trading_result")
+    parser.add_argument("--days", type=int, default=None, help="최근 days 일만 다시 계산 (기본 전체)")
+    args = parser.parse_args()
+
+    try:
+        print(f"> Rebuilt rollups : {rebuild_rollups(get_mongodb_client(), collection=args.collection, days=args.days)}")
+    finally:
+        close_mongodb_client()
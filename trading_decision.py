@@ -0,0 +1,140 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+# Upbit 최소 주문 금액(원)
+MIN_ORDER_KRW = 5000
+# 수수료를 고려하여 매수 시 사용할 원화 비율
+FEE_FACTOR = 0.99
+
+# Structured Output : https://platform.openai.com/docs/guides/structured-outputs
+# OpenAI Playground : https://platform.openai.com/playground/chat?models=gpt-4o
+class TradingDecision(BaseModel):
+    decision: str
+    percentage: int
+    reason: str
+
+TRADING_DECISION_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "trading_decision",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "decision": {
+                    "type": "string",
+                    "enum": ["buy", "sell", "hold"]
+                },
+                "percentage": {
+                    "type": "integer"
+                },
+                "reason": {
+                    "type": "string"
+                }
+            },
+            "required": ["decision", "percentage",  "reason"],
+            "additionalProperties": False
+        }
+    }
+}
+
+def buy_amount(krw_balance, percentage):
+    """
+    매수에 사용할 원화 금액을 계산한다. 최소 주문 금액 이하이면 0.
+    :param krw_balance: 보유 원화
+    :param percentage: 사용할 원화 비율(1-100)
+    :return:
+    """
+    trading_quantity = krw_balance * (percentage / 100) * FEE_FACTOR
+    return trading_quantity if trading_quantity > MIN_ORDER_KRW else 0
+
+def sell_volume(eth_balance, percentage, price):
+    """
+    매도할 ETH 수량을 계산한다. 주문 금액(수량 x 매도 호가)이 최소 주문 금액 이하이면 0.
+    :param eth_balance: 보유 ETH
+    :param percentage: 매도할 ETH 비율(1-100)
+    :param price: 현재 매도 호가
+    :return:
+    """
+    trading_quantity = eth_balance * (percentage / 100)
+    return trading_quantity if trading_quantity * price > MIN_ORDER_KRW else 0
+
+def execute_decision(exchange, trade_decision, ticker, get_orderbook, verbose=True):
+    """
+    AI 판단에 따라 주문을 실행한다.
+    :param exchange: 거래소 adapter (exchange_adapter.Exchange)
+    :param trade_decision: TradingDecision
+    :param ticker: KRW-ETH
+    :param get_orderbook: ticker -> 현재 호가 (pyupbit.get_orderbook 형식)
+    :param verbose: 실행 내역 출력 여부
+    :return: 주문 응답 (주문하지 않았으면 None)
+    """
+    log = print if verbose else (lambda *args: None)
+    quote, base = ticker.split('-')
+    decision = trade_decision.decision.upper()
+
+    if decision == 'BUY':
+        trading_quantity = buy_amount(exchange.get_balance(quote), trade_decision.percentage)
+        if trading_quantity:  # Upbit 매수 최소 금액 5,000원 확인
+            log(f"> Buy order executed : {trade_decision.percentage}% of available {quote}")
+            order = exchange.buy_market_order(ticker, trading_quantity)
+            log(order)
+            return order
+        log("[Warning] 매수 최소 금액 미충족 (원화 잔액이 5,000원 이하)")
+
+    elif decision == 'SELL':
+        current_price = get_orderbook(ticker)['orderbook_units'][0]['ask_price']  # 현재 매도 호가 조회
+        trading_quantity = sell_volume(exchange.get_balance(base), trade_decision.percentage, current_price)
+        if trading_quantity:
+            log(f"> Sell order executed : {trade_decision.percentage}% of held {base}")
+            order = exchange.sell_market_order(ticker, trading_quantity)
+            log(order)
+            return order
+        log("[Warning] 매도 최소 금액 미충족 (5,000원 미만)")
+
+    elif decision == 'HOLD':
+        log(f"> HOLD Position")
+
+    return None
+
+def build_trade_record(trade_decision, exchange, current_price, reflection, timestamp=None, ticker="KRW-ETH"):
+    """
+    trading_result collection 에 저장할 거래 기록을 만든다.
+    (기존 스키마를 유지하기 위해 마켓과 관계없이 eth_* 필드에 해당 마켓 통화의 잔고 / 가격을 저장한다.)
+    """
+    currency = ticker.split('-')[1]
+    return {
+        "timestamp": timestamp or datetime.now(),
+        "decision": trade_decision.decision.upper(),
+        "percentage": trade_decision.percentage,
+        "reason": trade_decision.reason,
+        "eth_balance": exchange.get_balance(currency),
+        "krw_balance": exchange.get_balance("KRW"),
+        "eth_avg_buy_price": exchange.get_avg_buy_price(currency),
+        "eth_krw_price": current_price,
+        "reflection": reflection,
+        "ticker": ticker
+    }
+
+def build_failure_record(trade_decision, exchange, order_book, reflection, ticker, error, order=None):
+    """
+    주문 단계에서 실패했을 때 남기는 거래 기록 (build_trade_record 와 같은 스키마 + execution_error)
+    거래소를 다시 조회하지 않고 로컬 잔고와 주기 시작 시의 호가 중간 가격을 사용한다.
+    """
+    currency = ticker.split('-')[1]
+    best = order_book['orderbook_units'][0]
+    return {
+        "timestamp": datetime.now(),
+        "decision": trade_decision.decision.upper(),
+        "percentage": trade_decision.percentage,
+        "reason": trade_decision.reason,
+        "eth_balance": exchange.portfolio.balance(currency),
+        "krw_balance": exchange.portfolio.balance("KRW"),
+        "eth_avg_buy_price": exchange.portfolio.avg_buy_price(currency),
+        "eth_krw_price": (best['ask_price'] + best['bid_price']) / 2,
+        "reflection": reflection,
+        "ticker": ticker,
+        "execution_error": f"{type(error).__name__}: {error}",
+        "order_uuid": (order or {}).get('uuid'),
+    }